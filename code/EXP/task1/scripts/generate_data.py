@@ -4,62 +4,130 @@ Generate text data for WordCount testing.
 Generates approximately 1GB of random text data.
 """
 
-import random
-import string
+import argparse
+import os
 import sys
 
-def generate_random_text(file_path, size_gb=0.5):
+# Shared block-based generator lives in EXP/tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+import datagen
+import dataset_cache
+
+# Common English words to make it more realistic
+COMMON_WORDS = [
+    'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
+    'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
+    'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
+    'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
+    'what', 'so', 'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go',
+    'me', 'when', 'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know',
+    'take', 'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
+    'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its', 'over',
+    'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first',
+    'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day',
+    'most', 'us', 'hadoop', 'mapreduce', 'data', 'processing', 'cluster', 'node',
+    'compute', 'storage', 'distributed', 'system', 'task', 'job', 'reduce', 'map'
+]
+
+def generate_random_text(file_path, size_gb=0.5, seed=None, shards=1, workers=None,
+                         align_blocks=False, hdfs_dir=None, compression=None, keys=None,
+                         small_files=None, file_sizes=None):
     """
     Generate a text file with random words.
     
     Args:
         file_path: Path to output file
         size_gb: Target file size in GB
+        seed: Seed for the NumPy random generator (None for fresh entropy)
+        shards: Number of part files; >1 writes them in parallel into a directory
+            named after file_path without its extension
+        workers: Process pool size for sharded generation
+        align_blocks: Size part files as whole HDFS blocks
+        hdfs_dir: Stream the dataset into this HDFS directory instead of
+            writing file_path; a local pointer file records where it went
+        compression: Compress the output with this codec (gzip, bzip2, zstd)
+        keys: Draw from this many synthesised keys instead of COMMON_WORDS
+        small_files: Spread the dataset over this many small part files in
+            the shard directory (one map task per file)
+        file_sizes: datagen.FileSizeDistribution of the small files
     """
     target_size = size_gb * 1024 * 1024 * 1024  # Convert to bytes
+    output = datagen.output_path(file_path, small_files or shards, hdfs_dir, compression)
+    counts_path = datagen.counts_path_for(file_path)
+    
+    print(f"Generating {size_gb}GB of text data to {output}...")
+    
+    profile = datagen.UniformProfile(keys=keys) if keys else datagen.UniformProfile(COMMON_WORDS)
+    if keys:
+        print(f"Vocabulary: {keys:,} synthesised keys")
     
-    # Common English words to make it more realistic
-    common_words = [
-        'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
-        'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
-        'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
-        'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
-        'what', 'so', 'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go',
-        'me', 'when', 'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know',
-        'take', 'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
-        'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its', 'over',
-        'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first',
-        'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day',
-        'most', 'us', 'hadoop', 'mapreduce', 'data', 'processing', 'cluster', 'node',
-        'compute', 'storage', 'distributed', 'system', 'task', 'job', 'reduce', 'map'
-    ]
+    if small_files:
+        print(f"Small-files mode: {small_files:,} part files in {output}")
+        current_size, words_written = datagen.generate_small_files(
+            output, target_size, small_files, profile, file_sizes=file_sizes, seed=seed,
+            workers=workers, progress_prefix='', compression=compression,
+            counts_path=counts_path
+        )
+    elif shards > 1:
+        print(f"Sharded mode: {shards} part files in {output}")
+        current_size, words_written = datagen.generate_profile_shards(
+            output, target_size, profile, shards, seed=seed, workers=workers,
+            align_blocks=align_blocks, progress_prefix='', compression=compression,
+            counts_path=counts_path
+        )
+    else:
+        current_size, words_written = datagen.generate_profile_file(
+            output, target_size, profile, seed=seed, progress_prefix='',
+            counts_path=counts_path
+        )
     
-    words_per_line = 10
-    current_size = 0
+    if keys:
+        print(f"Distinct keys: ~{profile.expected_distinct(words_written):,.0f} of {keys:,} "
+              f"expected in {words_written:,} words")
     
-    print(f"Generating {size_gb}GB of text data to {file_path}...")
+    if os.path.exists(counts_path):
+        print(f"Count manifest: {counts_path}")
     
-    with open(file_path, 'w') as f:
-        while current_size < target_size:
-            # Generate a line with random words
-            line_words = [random.choice(common_words) for _ in range(words_per_line)]
-            line = ' '.join(line_words) + '\n'
-            f.write(line)
-            current_size += len(line)
-            
-            # Print progress every 100MB
-            if current_size % (100 * 1024 * 1024) < len(line):
-                progress = current_size / target_size * 100
-                print(f"Progress: {progress:.1f}% ({current_size / (1024*1024*1024):.2f}GB)")
+    if hdfs_dir:
+        pointer = datagen.write_hdfs_pointer(file_path, output, current_size)
+        print(f"HDFS pointer: {pointer}")
     
     final_size_gb = current_size / (1024 * 1024 * 1024)
     print(f"Data generation complete! Final size: {final_size_gb:.2f}GB")
+    return current_size
 
 if __name__ == '__main__':
-    output_file = '/root/Exp-hadoop/EXP/task1/data/input_500mb.txt'
-    if len(sys.argv) > 1:
-        output_file = sys.argv[1]
+    parser = argparse.ArgumentParser(description='Generate random text data for Task 1.')
+    parser.add_argument('output_file', nargs='?',
+                        default='/root/Exp-hadoop/EXP/task1/data/input_500mb.txt',
+                        help='Output file (with --shards, its extension-less name becomes the directory)')
+    parser.add_argument('--size-gb', type=float, default=0.5, help='Target size in GB')
+    datagen.add_shard_arguments(parser)
+    datagen.add_key_arguments(parser)
+    datagen.add_small_files_arguments(parser)
+    dataset_cache.add_cache_arguments(parser)
+    args = parser.parse_args()
+    dataset_cache.check_cache_arguments(parser, args)
+    datagen.check_small_files_arguments(parser, args)
     
-    generate_random_text(output_file, size_gb=0.5)
+    if args.cache:
+        vocabulary = f"keys:{args.keys}" if args.keys else dataset_cache.vocabulary_digest(COMMON_WORDS)
+        params = dataset_cache.dataset_params(
+            'text', args.size_gb * 1024 * 1024 * 1024, args.seed, args.shards, args.align_blocks,
+            compression=args.compression, vocabulary=vocabulary
+        )
+        dataset_cache.generate_cached(
+            args.output_file, params, args.shards,
+            lambda path: generate_random_text(path, size_gb=args.size_gb, seed=args.seed,
+                                              shards=args.shards, workers=args.workers,
+                                              align_blocks=args.align_blocks,
+                                              compression=args.compression, keys=args.keys)
+        )
+    else:
+        generate_random_text(args.output_file, size_gb=args.size_gb, seed=args.seed,
+                             shards=args.shards, workers=args.workers,
+                             align_blocks=args.align_blocks, hdfs_dir=args.hdfs_dir,
+                             compression=args.compression, keys=args.keys,
+                             small_files=args.small_files, file_sizes=args.file_sizes)
 
 
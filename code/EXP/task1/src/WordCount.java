@@ -10,6 +10,7 @@ import org.apache.hadoop.mapreduce.Mapper;
 import org.apache.hadoop.mapreduce.Reducer;
 import org.apache.hadoop.mapreduce.lib.input.FileInputFormat;
 import org.apache.hadoop.mapreduce.lib.output.FileOutputFormat;
+import org.apache.hadoop.util.GenericOptionsParser;
 
 public class WordCount {
 
@@ -44,8 +45,11 @@ public class WordCount {
         }
     }
 
-    public static void main(String[] args) throws Exception {
-        Configuration conf = new Configuration();
+    // Configures the job without running it; main waits for it, and the
+    // resident submitter (tools/submitter) calls this and Job.submit()
+    public static Job createJob(Configuration conf, String[] args) throws IOException {
+        // Generic options (-Dkey=value) go into conf; the rest are positional
+        args = new GenericOptionsParser(conf, args).getRemainingArgs();
         
         // Get slowstart parameter from command line arguments
         String slowstart = "0.50"; // default
@@ -90,10 +94,14 @@ public class WordCount {
         String jobName = String.format("Task1_%s_%s_slowstart%s_reducers%d", 
                                        taskType, dataSize, slowstart, numReducers);
         
-        Job job = Job.getInstance(conf, jobName);
+        // A name given with -Dmapreduce.job.name takes precedence
+        Job job = Job.getInstance(conf, conf.get("mapreduce.job.name", jobName));
         job.setJarByClass(WordCount.class);
         job.setMapperClass(TokenizerMapper.class);
-        job.setCombinerClass(IntSumReducer.class);
+        // -Dwordcount.combiner=false runs without the map-side combiner
+        if (conf.getBoolean("wordcount.combiner", true)) {
+            job.setCombinerClass(IntSumReducer.class);
+        }
         job.setReducerClass(IntSumReducer.class);
         job.setOutputKeyClass(Text.class);
         job.setOutputValueClass(IntWritable.class);
@@ -104,6 +112,11 @@ public class WordCount {
         FileInputFormat.addInputPath(job, new Path(args[0]));
         FileOutputFormat.setOutputPath(job, new Path(args[1]));
         
+        return job;
+    }
+
+    public static void main(String[] args) throws Exception {
+        Job job = createJob(new Configuration(), args);
         System.exit(job.waitForCompletion(true) ? 0 : 1);
     }
 }
@@ -4,66 +4,179 @@ Generate text data for Task 2 scalability testing.
 Generates 500MB, 1GB, and 2GB text files.
 """
 
-import random
+import argparse
 import os
 import sys
 
-def generate_random_text(file_path, size_gb=1.0):
+# Shared block-based generator lives in EXP/tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+import datagen
+import dataset_cache
+
+# Common English words to make it more realistic
+COMMON_WORDS = [
+    'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
+    'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
+    'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
+    'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
+    'what', 'so', 'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go',
+    'me', 'when', 'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know',
+    'take', 'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
+    'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its', 'over',
+    'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first',
+    'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day',
+    'most', 'us', 'hadoop', 'mapreduce', 'data', 'processing', 'cluster', 'node',
+    'compute', 'storage', 'distributed', 'system', 'task', 'job', 'reduce', 'map',
+    'parallel', 'scale', 'performance', 'throughput', 'latency', 'network', 'disk'
+]
+
+def generate_random_text(file_path, size_gb=1.0, seed=None, shards=1, workers=None,
+                         align_blocks=False, hdfs_dir=None, compression=None, keys=None,
+                         small_files=None, file_sizes=None):
     """
     Generate a text file with random words.
     
     Args:
         file_path: Path to output file
         size_gb: Target file size in GB
+        seed: Seed for the NumPy random generator (None for fresh entropy)
+        shards: Number of part files; >1 writes them in parallel into a directory
+            named after file_path without its extension
+        workers: Process pool size for sharded generation
+        align_blocks: Size part files as whole HDFS blocks
+        hdfs_dir: Stream the dataset into this HDFS directory instead of
+            writing file_path; a local pointer file records where it went
+        compression: Compress the output with this codec (gzip, bzip2, zstd)
+        keys: Draw from this many synthesised keys instead of COMMON_WORDS
+        small_files: Spread the dataset over this many small part files in
+            the shard directory (one map task per file)
+        file_sizes: datagen.FileSizeDistribution of the small files
     """
     target_size = int(size_gb * 1024 * 1024 * 1024)  # Convert to bytes
+    output = datagen.output_path(file_path, small_files or shards, hdfs_dir, compression)
+    counts_path = datagen.counts_path_for(file_path)
     
-    # Common English words to make it more realistic
-    common_words = [
-        'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
-        'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
-        'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
-        'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
-        'what', 'so', 'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go',
-        'me', 'when', 'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know',
-        'take', 'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
-        'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its', 'over',
-        'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first',
-        'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day',
-        'most', 'us', 'hadoop', 'mapreduce', 'data', 'processing', 'cluster', 'node',
-        'compute', 'storage', 'distributed', 'system', 'task', 'job', 'reduce', 'map',
-        'parallel', 'scale', 'performance', 'throughput', 'latency', 'network', 'disk'
-    ]
-    
-    words_per_line = 10
-    current_size = 0
-    
-    print(f"Generating {size_gb:.2f}GB of text data to {file_path}...")
+    print(f"Generating {size_gb:.2f}GB of text data to {output}...")
     print(f"Target size: {target_size:,} bytes")
     
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     
-    with open(file_path, 'w') as f:
-        while current_size < target_size:
-            # Generate a line with random words
-            line_words = [random.choice(common_words) for _ in range(words_per_line)]
-            line = ' '.join(line_words) + '\n'
-            f.write(line)
-            current_size += len(line)
-            
-            # Print progress every 100MB
-            if current_size % (100 * 1024 * 1024) < len(line):
-                progress = current_size / target_size * 100
-                print(f"  Progress: {progress:.1f}% ({current_size / (1024*1024*1024):.2f}GB)")
+    profile = datagen.UniformProfile(keys=keys) if keys else datagen.UniformProfile(COMMON_WORDS)
+    if keys:
+        print(f"  Vocabulary: {keys:,} synthesised keys")
+    
+    if small_files:
+        print(f"  Small-files mode: {small_files:,} part files in {output}")
+        current_size, words_written = datagen.generate_small_files(
+            output, target_size, small_files, profile, file_sizes=file_sizes, seed=seed,
+            workers=workers, progress_prefix='  ', compression=compression,
+            counts_path=counts_path
+        )
+    elif shards > 1:
+        print(f"  Sharded mode: {shards} part files in {output}")
+        current_size, words_written = datagen.generate_profile_shards(
+            output, target_size, profile, shards, seed=seed, workers=workers,
+            align_blocks=align_blocks, progress_prefix='  ', compression=compression,
+            counts_path=counts_path
+        )
+    else:
+        current_size, words_written = datagen.generate_profile_file(
+            output, target_size, profile, seed=seed, progress_prefix='  ',
+            counts_path=counts_path
+        )
+    
+    if keys:
+        print(f"  Distinct keys: ~{profile.expected_distinct(words_written):,.0f} of {keys:,} "
+              f"expected in {words_written:,} words")
+    
+    if os.path.exists(counts_path):
+        print(f"  Count manifest: {counts_path}")
+    
+    if hdfs_dir:
+        print(f"  HDFS pointer: {datagen.write_hdfs_pointer(file_path, output, current_size)}")
     
     final_size_gb = current_size / (1024 * 1024 * 1024)
     final_size_mb = current_size / (1024 * 1024)
     print(f"✓ Data generation complete! Final size: {final_size_gb:.2f}GB ({final_size_mb:.1f}MB)")
-    print(f"  File: {file_path}")
+    print(f"  File: {output}")
+    return current_size
+
+def generate_dataset(file_path, size_gb, args):
+    """Generate one dataset, through the shared dataset cache with --cache."""
+    if not args.cache:
+        return generate_random_text(file_path, size_gb, seed=args.seed, shards=args.shards,
+                                    workers=args.workers, align_blocks=args.align_blocks,
+                                    hdfs_dir=args.hdfs_dir, compression=args.compression,
+                                    keys=args.keys, small_files=args.small_files,
+                                    file_sizes=args.file_sizes)
+    vocabulary = f"keys:{args.keys}" if args.keys else dataset_cache.vocabulary_digest(COMMON_WORDS)
+    params = dataset_cache.dataset_params(
+        'text', int(size_gb * 1024 * 1024 * 1024), args.seed, args.shards, args.align_blocks,
+        compression=args.compression, vocabulary=vocabulary
+    )
+    dataset_cache.generate_cached(
+        file_path, params, args.shards,
+        lambda path: generate_random_text(path, size_gb, seed=args.seed, shards=args.shards,
+                                          workers=args.workers, align_blocks=args.align_blocks,
+                                          compression=args.compression, keys=args.keys)
+    )
+
+def generate_incremental(data_files, args):
+    """
+    Generate every size as a nested dataset that extends the next smaller one.
+    
+    Only the increments are written (1.5GB instead of 3GB for 500MB/1GB/1500MB),
+    and run_experiment.py uploads each increment once and reuses it for all
+    larger sizes; the sizes are statistically nested prefixes of one stream.
+    """
+    data_files = sorted(data_files, key=lambda item: item[1])
+    file_paths = [path for path, _ in data_files]
+    output_dirs = [datagen.shard_output_dir(path, args.hdfs_dir) for path in file_paths]
+    sizes = [int(size_gb * 1024 * 1024 * 1024) for _, size_gb in data_files]
+    profile = datagen.UniformProfile(keys=args.keys) if args.keys else datagen.UniformProfile(COMMON_WORDS)
+    
+    print(f"Generating nested datasets: {', '.join(f'{s / (1024 ** 3):.2f}GB' for s in sizes)}")
+    print(f"  Writing {sizes[-1] / (1024 ** 3):.2f}GB in total "
+          f"({args.shards} part file(s) per increment)")
+    
+    totals = datagen.generate_nested_shards(
+        output_dirs, sizes, profile, shards_per_step=args.shards, seed=args.seed,
+        workers=args.workers, progress_prefix='  ', compression=args.compression,
+        counts_paths=[datagen.counts_path_for(path) for path in file_paths]
+    )
+    
+    for k, (file_path, (current_size, words_written)) in enumerate(zip(file_paths, totals)):
+        base = f" = {os.path.basename(output_dirs[k - 1])} + increment" if k else ""
+        print(f"  ✓ {os.path.basename(output_dirs[k])}: {current_size / (1024 ** 3):.2f}GB, "
+              f"{words_written:,} words{base}")
+        if args.hdfs_dir:
+            datagen.write_hdfs_pointer(file_path, output_dirs[k], current_size,
+                                       extends=output_dirs[:k])
+
+def local_dataset_path(file_path, args):
+    """What this script leaves locally for a dataset: file, shard directory or HDFS pointer."""
+    if args.incremental and not args.hdfs_dir:
+        return datagen.shard_dir_for(file_path)
+    return datagen.local_output_path(file_path, args.small_files or args.shards, args.hdfs_dir,
+                                     args.compression)
 
 def main():
     """Generate all required data files for Task 2."""
+    parser = argparse.ArgumentParser(description='Generate text data for Task 2 scalability testing.')
+    datagen.add_shard_arguments(parser)
+    datagen.add_key_arguments(parser)
+    datagen.add_small_files_arguments(parser)
+    dataset_cache.add_cache_arguments(parser)
+    parser.add_argument('--incremental', action='store_true',
+                        help='Build each size as the next smaller dataset plus a deterministic '
+                             'continuation, so every byte is written and uploaded once')
+    args = parser.parse_args()
+    dataset_cache.check_cache_arguments(parser, args)
+    datagen.check_small_files_arguments(parser, args)
+    if args.incremental and (args.cache or args.align_blocks):
+        parser.error('--incremental cannot be combined with --cache or --align-blocks')
+    
     print("="*80)
     print("Task 2: Data Generation for Scalability Testing")
     print("="*80)
@@ -79,23 +192,35 @@ def main():
         # ('input_2gb.txt', 2.0),
     ]
     
-    for filename, size_gb in data_files:
-        file_path = os.path.join(data_dir, filename)
-        
-        # Check if file already exists
-        if os.path.exists(file_path):
-            existing_size_gb = os.path.getsize(file_path) / (1024 * 1024 * 1024)
-            print(f"File {filename} already exists ({existing_size_gb:.2f}GB)")
-            user_input = input(f"  Regenerate? (y/N): ").strip().lower()
+    if args.incremental:
+        existing = [filename for filename, _ in data_files
+                    if os.path.exists(local_dataset_path(os.path.join(data_dir, filename), args))]
+        if existing:
+            print(f"Existing datasets: {', '.join(existing)}")
+            user_input = input("  Regenerate all as nested datasets? (y/N): ").strip().lower()
             if user_input != 'y':
-                print(f"  Skipping {filename}")
-                print()
-                continue
-        
-        print(f"\nGenerating {filename} ({size_gb:.2f}GB)...")
-        print("-"*80)
-        generate_random_text(file_path, size_gb)
-        print()
+                return
+        generate_incremental([(os.path.join(data_dir, filename), size_gb)
+                              for filename, size_gb in data_files], args)
+    else:
+        for filename, size_gb in data_files:
+            file_path = os.path.join(data_dir, filename)
+            output_path = local_dataset_path(file_path, args)
+            
+            # Check if file already exists
+            if os.path.exists(output_path):
+                existing_size_gb = datagen.dataset_size(output_path) / (1024 * 1024 * 1024)
+                print(f"File {filename} already exists ({existing_size_gb:.2f}GB)")
+                user_input = input(f"  Regenerate? (y/N): ").strip().lower()
+                if user_input != 'y':
+                    print(f"  Skipping {filename}")
+                    print()
+                    continue
+            
+            print(f"\nGenerating {filename} ({size_gb:.2f}GB)...")
+            print("-"*80)
+            generate_dataset(file_path, size_gb, args)
+            print()
     
     print("="*80)
     print("✓ All data files generated successfully!")
@@ -103,11 +228,11 @@ def main():
     print()
     print("Generated files:")
     for filename, _ in data_files:
-        file_path = os.path.join(data_dir, filename)
+        file_path = local_dataset_path(os.path.join(data_dir, filename), args)
         if os.path.exists(file_path):
-            size_gb = os.path.getsize(file_path) / (1024 * 1024 * 1024)
-            size_mb = os.path.getsize(file_path) / (1024 * 1024)
-            print(f"  - {filename}: {size_gb:.2f}GB ({size_mb:.1f}MB)")
+            size_gb = datagen.dataset_size(file_path) / (1024 * 1024 * 1024)
+            size_mb = datagen.dataset_size(file_path) / (1024 * 1024)
+            print(f"  - {os.path.basename(file_path)}: {size_gb:.2f}GB ({size_mb:.1f}MB)")
     print()
 
 if __name__ == '__main__':
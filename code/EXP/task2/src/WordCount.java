@@ -10,6 +10,7 @@ import org.apache.hadoop.mapreduce.Mapper;
 import org.apache.hadoop.mapreduce.Reducer;
 import org.apache.hadoop.mapreduce.lib.input.FileInputFormat;
 import org.apache.hadoop.mapreduce.lib.output.FileOutputFormat;
+import org.apache.hadoop.util.GenericOptionsParser;
 
 public class WordCount {
 
@@ -44,8 +45,11 @@ public class WordCount {
         }
     }
 
-    public static void main(String[] args) throws Exception {
-        Configuration conf = new Configuration();
+    // Configures the job without running it; main waits for it, and the
+    // resident submitter (tools/submitter) calls this and Job.submit()
+    public static Job createJob(Configuration conf, String[] args) throws IOException {
+        // Generic options (-Dkey=value) go into conf; the rest are positional
+        args = new GenericOptionsParser(conf, args).getRemainingArgs();
         
         // Get slowstart parameter from command line arguments
         String slowstart = "0.50"; // default
@@ -62,10 +66,11 @@ public class WordCount {
         
         // Extract task type and data size from input path
         // Input path format: /user/root/task2/input_wordcount_500MB or input_terasort_1GB
+        // Nested datasets list their directories comma-separated, largest last
         String taskType = "WordCount";
         String dataSize = "unknown";
         if (args.length >= 1) {
-            String inputPath = args[0];
+            String inputPath = args[0].substring(args[0].lastIndexOf(',') + 1);
             // Extract task type and data size from path
             int lastSlash = inputPath.lastIndexOf('/');
             String pathPart = lastSlash >= 0 ? inputPath.substring(lastSlash + 1) : inputPath;
@@ -88,19 +93,17 @@ public class WordCount {
         
         // Build job name with experiment information
         // Task2: Data scalability testing with different data sizes
-        // Priority: Use job name from configuration if set (via -Dmapreduce.job.name),
-        // otherwise build from parameters
-        String jobName = conf.get("mapreduce.job.name");
-        if (jobName == null || jobName.isEmpty()) {
-            // Fallback: build job name from parameters
-            jobName = String.format("Task2_%s_%s_slowstart%s_reducers%d", 
-                                   taskType, dataSize, slowstart, numReducers);
-        }
+        String jobName = String.format("Task2_%s_%s_slowstart%s_reducers%d", 
+                                       taskType, dataSize, slowstart, numReducers);
         
-        Job job = Job.getInstance(conf, jobName);
+        // A name given with -Dmapreduce.job.name takes precedence
+        Job job = Job.getInstance(conf, conf.get("mapreduce.job.name", jobName));
         job.setJarByClass(WordCount.class);
         job.setMapperClass(TokenizerMapper.class);
-        job.setCombinerClass(IntSumReducer.class);
+        // -Dwordcount.combiner=false runs without the map-side combiner
+        if (conf.getBoolean("wordcount.combiner", true)) {
+            job.setCombinerClass(IntSumReducer.class);
+        }
         job.setReducerClass(IntSumReducer.class);
         job.setOutputKeyClass(Text.class);
         job.setOutputValueClass(IntWritable.class);
@@ -108,9 +111,14 @@ public class WordCount {
         // Set number of reduce tasks
         job.setNumReduceTasks(numReducers);
         
-        FileInputFormat.addInputPath(job, new Path(args[0]));
+        FileInputFormat.addInputPaths(job, args[0]);
         FileOutputFormat.setOutputPath(job, new Path(args[1]));
         
+        return job;
+    }
+
+    public static void main(String[] args) throws Exception {
+        Job job = createJob(new Configuration(), args);
         System.exit(job.waitForCompletion(true) ? 0 : 1);
     }
 }
@@ -19,6 +19,14 @@ sns.set_palette("husl")
 RESULTS_FILE = '../results/raw_results_20251127_043910_enhanced.json'
 OUTPUT_DIR = Path('.')
 
+# Legend labels of the workloads (the WordCount-Seq variants read pre-tokenized SequenceFiles)
+WORKLOAD_LABELS = {
+    'TeraSort': 'TeraSort (IO-intensive)',
+    'WordCount': 'WordCount (CPU-intensive)',
+    'WordCount-Seq': 'WordCount-Seq (pre-tokenized)',
+    'WordCount-SeqIds': 'WordCount-SeqIds (pre-tokenized ids)',
+}
+
 def load_data(filename):
     """Load experimental results from JSON file."""
     with open(filename, 'r') as f:
@@ -56,7 +64,7 @@ def plot_workload_comparison(stats, output_file='fig1_workload_comparison.png'):
     
     for job_type in job_types:
         subset = stats[stats['job_type'] == job_type]
-        label = 'TeraSort (IO-intensive)' if job_type == 'TeraSort' else 'WordCount (CPU-intensive)'
+        label = WORKLOAD_LABELS.get(job_type, job_type)
         ax.plot(subset['slowstart'], subset['total_time_from_api_mean'], 
                marker='o', linewidth=2.5, markersize=10, label=label)
         
@@ -88,7 +96,7 @@ def plot_shuffle_comparison(stats, output_file='fig2_shuffle_comparison.png'):
     # Left: Shuffle time
     for job_type in job_types:
         subset = stats[stats['job_type'] == job_type]
-        label = 'TeraSort' if job_type == 'TeraSort' else 'WordCount'
+        label = job_type
         ax1.plot(subset['slowstart'], subset['avg_shuffle_time_mean'], 
                 marker='s', linewidth=2, markersize=8, label=label)
     
@@ -102,7 +110,7 @@ def plot_shuffle_comparison(stats, output_file='fig2_shuffle_comparison.png'):
     for job_type in job_types:
         subset = stats[stats['job_type'] == job_type]
         shuffle_gb = subset['reduce_shuffle_bytes_mean'] / (1024**3)
-        label = 'TeraSort' if job_type == 'TeraSort' else 'WordCount'
+        label = job_type
         ax2.plot(subset['slowstart'], shuffle_gb, 
                 marker='o', linewidth=2, markersize=8, label=label)
     
@@ -130,7 +138,7 @@ def plot_sensitivity_comparison(stats, output_file='fig3_sensitivity_comparison.
         # Normalize to show relative sensitivity
         values = subset['total_time_from_api_mean']
         normalized = (values - values.min()) / (values.max() - values.min()) * 100
-        label = 'TeraSort' if job_type == 'TeraSort' else 'WordCount'
+        label = job_type
         ax.plot(subset['slowstart'], normalized, 
                marker='o', linewidth=2.5, markersize=10, label=label)
     
@@ -157,7 +165,7 @@ def plot_io_vs_cpu(stats, output_file='fig4_io_vs_cpu.png'):
     # Left: CPU time
     for job_type in job_types:
         subset = stats[stats['job_type'] == job_type]
-        label = 'TeraSort' if job_type == 'TeraSort' else 'WordCount'
+        label = job_type
         ax1.plot(subset['slowstart'], subset['cpu_time_mean'], 
                 marker='o', linewidth=2, markersize=8, label=label)
     
@@ -171,7 +179,7 @@ def plot_io_vs_cpu(stats, output_file='fig4_io_vs_cpu.png'):
     for job_type in job_types:
         subset = stats[stats['job_type'] == job_type]
         io_ratio = (subset['reduce_shuffle_bytes_mean'] / (1024**2)) / subset['cpu_time_mean']
-        label = 'TeraSort' if job_type == 'TeraSort' else 'WordCount'
+        label = job_type
         ax2.plot(subset['slowstart'], io_ratio, 
                 marker='s', linewidth=2, markersize=8, label=label)
     
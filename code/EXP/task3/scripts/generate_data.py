@@ -1,82 +1,177 @@
 #!/usr/bin/env python3
 """
 Generate text data for Task 3: Different Workload Comparison.
-Generates 1GB text file for WordCount testing.
+Generates 1GB text file for WordCount testing, or with --sequence-file the same
+words as pre-tokenized SequenceFile records for the WordCount-Seq workload.
 TeraSort data will be generated using TeraGen directly in the experiment script.
 """
 
-import random
+import argparse
 import os
 import sys
 
-def generate_random_text(file_path, size_gb=1.0):
+# Shared block-based generator lives in EXP/tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+import datagen
+import dataset_cache
+
+# Common English words to make it more realistic
+COMMON_WORDS = [
+    'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
+    'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
+    'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
+    'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
+    'what', 'so', 'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go',
+    'me', 'when', 'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know',
+    'take', 'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
+    'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its', 'over',
+    'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first',
+    'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day',
+    'most', 'us', 'hadoop', 'mapreduce', 'data', 'processing', 'cluster', 'node',
+    'compute', 'storage', 'distributed', 'system', 'task', 'job', 'reduce', 'map',
+    'parallel', 'scale', 'performance', 'throughput', 'latency', 'network', 'disk',
+    'shuffle', 'sort', 'partition', 'combine', 'aggregate', 'filter', 'transform'
+]
+
+# SequenceFile variants of the WordCount input, by key encoding (--sequence-file);
+# experiments.json declares the same names
+SEQUENCE_FILES = {
+    'text': 'input_wordcount_seq_1gb.seq',
+    'ids': 'input_wordcount_seqids_1gb.seq',
+}
+
+def generate_random_text(file_path, size_gb=1.0, seed=None, shards=1, workers=None,
+                         align_blocks=False, hdfs_dir=None, compression=None, keys=None,
+                         small_files=None, file_sizes=None, sequence=None):
     """
     Generate a text file with random words for WordCount.
     
     Args:
         file_path: Path to output file
         size_gb: Target file size in GB
+        seed: Seed for the NumPy random generator (None for fresh entropy)
+        shards: Number of part files; >1 writes them in parallel into a directory
+            named after file_path without its extension
+        workers: Process pool size for sharded generation
+        align_blocks: Size part files as whole HDFS blocks
+        hdfs_dir: Stream the dataset into this HDFS directory instead of
+            writing file_path; a local pointer file records where it went
+        compression: Compress the output with this codec (gzip, bzip2, zstd)
+        keys: Draw from this many synthesised keys instead of COMMON_WORDS
+        small_files: Spread the dataset over this many small part files in
+            the shard directory (one map task per file)
+        file_sizes: datagen.FileSizeDistribution of the small files
+        sequence: Write SequenceFile (word, 1) records with Text ('text') or
+            VIntWritable id ('ids') keys instead of text; with the same seed
+            they hold exactly the words of the text dataset
     """
     target_size = int(size_gb * 1024 * 1024 * 1024)  # Convert to bytes
+    output = datagen.output_path(file_path, small_files or shards, hdfs_dir, compression)
+    counts_path = datagen.counts_path_for(file_path)
     
-    # Common English words to make it more realistic
-    common_words = [
-        'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
-        'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at',
-        'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she',
-        'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their',
-        'what', 'so', 'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go',
-        'me', 'when', 'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know',
-        'take', 'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
-        'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its', 'over',
-        'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first',
-        'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day',
-        'most', 'us', 'hadoop', 'mapreduce', 'data', 'processing', 'cluster', 'node',
-        'compute', 'storage', 'distributed', 'system', 'task', 'job', 'reduce', 'map',
-        'parallel', 'scale', 'performance', 'throughput', 'latency', 'network', 'disk',
-        'shuffle', 'sort', 'partition', 'combine', 'aggregate', 'filter', 'transform'
-    ]
-    
-    words_per_line = 10
-    current_size = 0
-    
-    print(f"Generating {size_gb:.2f}GB of text data to {file_path}...")
+    print(f"Generating {size_gb:.2f}GB of text data to {output}...")
     print(f"Target size: {target_size:,} bytes")
     
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     
-    with open(file_path, 'w') as f:
-        while current_size < target_size:
-            # Generate a line with random words
-            line_words = [random.choice(common_words) for _ in range(words_per_line)]
-            line = ' '.join(line_words) + '\n'
-            f.write(line)
-            current_size += len(line)
-            
-            # Print progress every 100MB
-            if current_size % (100 * 1024 * 1024) < len(line):
-                progress = current_size / target_size * 100
-                print(f"  Progress: {progress:.1f}% ({current_size / (1024*1024*1024):.2f}GB)")
+    profile = datagen.UniformProfile(keys=keys) if keys else datagen.UniformProfile(COMMON_WORDS)
+    if keys:
+        print(f"  Vocabulary: {keys:,} synthesised keys")
+    if sequence:
+        print(f"  SequenceFile records with {datagen.SEQ_KEY_CLASSES[sequence]} keys "
+              f"(the target counts the equivalent text; the file is larger)")
+    
+    if small_files:
+        print(f"  Small-files mode: {small_files:,} part files in {output}")
+        current_size, words_written = datagen.generate_small_files(
+            output, target_size, small_files, profile, file_sizes=file_sizes, seed=seed,
+            workers=workers, progress_prefix='  ', compression=compression,
+            counts_path=counts_path
+        )
+    elif shards > 1:
+        print(f"  Sharded mode: {shards} part files in {output}")
+        current_size, words_written = datagen.generate_profile_shards(
+            output, target_size, profile, shards, seed=seed, workers=workers,
+            align_blocks=align_blocks, progress_prefix='  ', compression=compression,
+            counts_path=counts_path, sequence=sequence
+        )
+    else:
+        current_size, words_written = datagen.generate_profile_file(
+            output, target_size, profile, seed=seed, progress_prefix='  ',
+            counts_path=counts_path, sequence=sequence
+        )
+    
+    if keys:
+        print(f"  Distinct keys: ~{profile.expected_distinct(words_written):,.0f} of {keys:,} "
+              f"expected in {words_written:,} words")
+    
+    if os.path.exists(counts_path):
+        print(f"  Count manifest: {counts_path}")
+    
+    if hdfs_dir:
+        print(f"  HDFS pointer: {datagen.write_hdfs_pointer(file_path, output, current_size)}")
     
     final_size_gb = current_size / (1024 * 1024 * 1024)
     final_size_mb = current_size / (1024 * 1024)
-    print(f"✓ Data generation complete! Final size: {final_size_gb:.2f}GB ({final_size_mb:.1f}MB)")
-    print(f"  File: {file_path}")
+    print(f"✓ Data generation complete! Final size: {final_size_gb:.2f}GB ({final_size_mb:.1f}MB)"
+          + (f" on disk, from {target_size / (1024 * 1024):.1f}MB of equivalent text" if sequence else ''))
+    print(f"  File: {output}")
+    return current_size
+
+def generate_dataset(file_path, size_gb, args):
+    """Generate one dataset, through the shared dataset cache with --cache."""
+    if not args.cache:
+        return generate_random_text(file_path, size_gb, seed=args.seed, shards=args.shards,
+                                    workers=args.workers, align_blocks=args.align_blocks,
+                                    hdfs_dir=args.hdfs_dir, compression=args.compression,
+                                    keys=args.keys, small_files=args.small_files,
+                                    file_sizes=args.file_sizes, sequence=args.sequence_file)
+    vocabulary = f"keys:{args.keys}" if args.keys else dataset_cache.vocabulary_digest(COMMON_WORDS)
+    extra = {'sequence': args.sequence_file} if args.sequence_file else {}
+    params = dataset_cache.dataset_params(
+        'text', int(size_gb * 1024 * 1024 * 1024), args.seed, args.shards,
+        args.align_blocks and not args.sequence_file, compression=args.compression,
+        vocabulary=vocabulary, **extra
+    )
+    dataset_cache.generate_cached(
+        file_path, params, args.shards,
+        lambda path: generate_random_text(path, size_gb, seed=args.seed, shards=args.shards,
+                                          workers=args.workers, align_blocks=args.align_blocks,
+                                          compression=args.compression, keys=args.keys,
+                                          sequence=args.sequence_file)
+    )
 
 def main():
     """Generate WordCount input data for Task 3."""
+    parser = argparse.ArgumentParser(description='Generate WordCount input data for Task 3.')
+    datagen.add_shard_arguments(parser)
+    datagen.add_key_arguments(parser)
+    datagen.add_small_files_arguments(parser)
+    dataset_cache.add_cache_arguments(parser)
+    parser.add_argument('--sequence-file', choices=sorted(datagen.SEQ_KEY_CLASSES),
+                        help='Write the words as pre-tokenized SequenceFile (word, 1) records with '
+                             'Text (text) or VIntWritable id (ids) keys, for the WordCount-Seq workload')
+    args = parser.parse_args()
+    dataset_cache.check_cache_arguments(parser, args)
+    datagen.check_small_files_arguments(parser, args)
+    if args.sequence_file and (args.small_files or args.compression):
+        parser.error('--sequence-file cannot be combined with --small-files or --compression')
+    
     print("="*80)
     print("Task 3: Data Generation for Workload Comparison")
     print("="*80)
     print()
     
     data_dir = '/root/Exp-hadoop/EXP/task3/data'
-    file_path = os.path.join(data_dir, 'input_wordcount_1gb.txt')
+    file_path = os.path.join(data_dir, SEQUENCE_FILES[args.sequence_file] if args.sequence_file
+                             else 'input_wordcount_1gb.txt')
+    output_path = datagen.local_output_path(file_path, args.small_files or args.shards,
+                                            args.hdfs_dir, args.compression)
     
     # Check if file already exists
-    if os.path.exists(file_path):
-        existing_size_gb = os.path.getsize(file_path) / (1024 * 1024 * 1024)
+    if os.path.exists(output_path):
+        existing_size_gb = datagen.dataset_size(output_path) / (1024 * 1024 * 1024)
         print(f"File already exists ({existing_size_gb:.2f}GB)")
         user_input = input(f"  Regenerate? (y/N): ").strip().lower()
         if user_input != 'y':
@@ -84,9 +179,9 @@ def main():
             print()
             return
     
-    print("Generating WordCount input data (1GB)...")
+    print(f"Generating WordCount input data (1GB{', SequenceFile' if args.sequence_file else ''})...")
     print("-"*80)
-    generate_random_text(file_path, size_gb=1.0)
+    generate_dataset(file_path, 1.0, args)
     print()
     
     print("="*80)
@@ -94,10 +189,10 @@ def main():
     print("="*80)
     print()
     print("Generated file:")
-    if os.path.exists(file_path):
-        size_gb = os.path.getsize(file_path) / (1024 * 1024 * 1024)
-        size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        print(f"  - {os.path.basename(file_path)}: {size_gb:.2f}GB ({size_mb:.1f}MB)")
+    if os.path.exists(output_path):
+        size_gb = datagen.dataset_size(output_path) / (1024 * 1024 * 1024)
+        size_mb = datagen.dataset_size(output_path) / (1024 * 1024)
+        print(f"  - {os.path.basename(output_path)}: {size_gb:.2f}GB ({size_mb:.1f}MB)")
     print()
     print("Note: TeraSort data will be generated using TeraGen during experiment runtime.")
     print()
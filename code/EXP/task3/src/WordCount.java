@@ -5,11 +5,14 @@ import org.apache.hadoop.conf.Configuration;
 import org.apache.hadoop.fs.Path;
 import org.apache.hadoop.io.IntWritable;
 import org.apache.hadoop.io.Text;
+import org.apache.hadoop.io.VIntWritable;
 import org.apache.hadoop.mapreduce.Job;
 import org.apache.hadoop.mapreduce.Mapper;
 import org.apache.hadoop.mapreduce.Reducer;
 import org.apache.hadoop.mapreduce.lib.input.FileInputFormat;
+import org.apache.hadoop.mapreduce.lib.input.SequenceFileInputFormat;
 import org.apache.hadoop.mapreduce.lib.output.FileOutputFormat;
+import org.apache.hadoop.util.GenericOptionsParser;
 
 public class WordCount {
 
@@ -29,11 +32,23 @@ public class WordCount {
         }
     }
 
-    public static class IntSumReducer
-            extends Reducer<Text, IntWritable, Text, IntWritable> {
+    // Pre-tokenized SequenceFile input (generate_data.py --sequence-file):
+    // the (word, 1) records go straight to the shuffle, so the map spends
+    // no CPU on toString() and StringTokenizer
+    public static class PairMapper<K>
+            extends Mapper<K, IntWritable, K, IntWritable> {
+
+        public void map(K key, IntWritable value, Context context)
+                throws IOException, InterruptedException {
+            context.write(key, value);
+        }
+    }
+
+    public static class IntSumReducer<K>
+            extends Reducer<K, IntWritable, K, IntWritable> {
         private IntWritable result = new IntWritable();
 
-        public void reduce(Text key, Iterable<IntWritable> values,
+        public void reduce(K key, Iterable<IntWritable> values,
                 Context context) throws IOException, InterruptedException {
             int sum = 0;
             for (IntWritable val : values) {
@@ -44,8 +59,11 @@ public class WordCount {
         }
     }
 
-    public static void main(String[] args) throws Exception {
-        Configuration conf = new Configuration();
+    // Configures the job without running it; main waits for it, and the
+    // resident submitter (tools/submitter) calls this and Job.submit()
+    public static Job createJob(Configuration conf, String[] args) throws IOException {
+        // Generic options (-Dkey=value) go into conf; the rest are positional
+        args = new GenericOptionsParser(conf, args).getRemainingArgs();
         
         // Get slowstart parameter from command line arguments
         String slowstart = "0.50"; // default
@@ -60,6 +78,13 @@ public class WordCount {
             numReducers = Integer.parseInt(args[3]);
         }
         
+        // Get input format from command line arguments: text (default),
+        // seq (Text word, IntWritable 1) or seqids (VIntWritable id, IntWritable 1)
+        String inputFormat = "text";
+        if (args.length >= 5) {
+            inputFormat = args[4];
+        }
+        
         // Extract workload type from input path if possible
         // Input path format: /user/root/task3/input_wordcount or input_terasort
         String workloadType = "WordCount";
@@ -71,18 +96,36 @@ public class WordCount {
                 workloadType = "WordCount";
             }
         }
+        if (inputFormat.equals("seq")) {
+            workloadType = "WordCountSeq";
+        } else if (inputFormat.equals("seqids")) {
+            workloadType = "WordCountSeqIds";
+        }
         
         // Build job name with experiment information
         // Task3: Workload type comparison (IO-intensive vs CPU-intensive)
         String jobName = String.format("Task3_%s_slowstart%s_reducers%d", 
                                        workloadType, slowstart, numReducers);
         
-        Job job = Job.getInstance(conf, jobName);
+        // A name given with -Dmapreduce.job.name takes precedence
+        Job job = Job.getInstance(conf, conf.get("mapreduce.job.name", jobName));
         job.setJarByClass(WordCount.class);
-        job.setMapperClass(TokenizerMapper.class);
-        job.setCombinerClass(IntSumReducer.class);
+        if (inputFormat.equals("text")) {
+            job.setMapperClass(TokenizerMapper.class);
+            job.setOutputKeyClass(Text.class);
+        } else if (inputFormat.equals("seq") || inputFormat.equals("seqids")) {
+            job.setInputFormatClass(SequenceFileInputFormat.class);
+            job.setMapperClass(PairMapper.class);
+            job.setOutputKeyClass(inputFormat.equals("seq") ? Text.class : VIntWritable.class);
+        } else {
+            throw new IllegalArgumentException(
+                "Unknown input format: " + inputFormat + " (expected text, seq or seqids)");
+        }
+        // -Dwordcount.combiner=false runs without the map-side combiner
+        if (conf.getBoolean("wordcount.combiner", true)) {
+            job.setCombinerClass(IntSumReducer.class);
+        }
         job.setReducerClass(IntSumReducer.class);
-        job.setOutputKeyClass(Text.class);
         job.setOutputValueClass(IntWritable.class);
         
         // Set number of reduce tasks
@@ -91,6 +134,18 @@ public class WordCount {
         FileInputFormat.addInputPath(job, new Path(args[0]));
         FileOutputFormat.setOutputPath(job, new Path(args[1]));
         
+        return job;
+    }
+
+    public static void main(String[] args) throws Exception {
+        Job job;
+        try {
+            job = createJob(new Configuration(), args);
+        } catch (IllegalArgumentException e) {
+            System.err.println(e.getMessage());
+            System.exit(2);
+            return;
+        }
         System.exit(job.waitForCompletion(true) ? 0 : 1);
     }
 }
@@ -7,29 +7,63 @@ This script generates two types of datasets:
 2. Uniform Data: Words are uniformly distributed (control group)
 
 Both datasets are 1GB in size for fair comparison.
+
+Additional skew shapes (Zipf, several hot keys, heavy-tailed key spaces) can be
+generated with --profile, e.g. --profile zipf:alpha=1.2 --profile topk:weights=0.3/0.2/0.1.
+
+Map-side skew (the hotkey packed into a few HDFS blocks, so only their map
+tasks see it) is generated with --clustered N, e.g. --clustered 2 --placement last.
 """
 
-import random
+import argparse
+import functools
 import os
 import sys
 
-def generate_skewed_data(file_path, size_gb=1.0, hotkey_ratio=0.6):
+# Shared block-based generator lives in EXP/tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+import datagen
+import dataset_cache
+
+# Background vocabulary shared by the skewed and uniform datasets
+NORMAL_WORDS = [f"word{i:05d}" for i in range(10000)]
+HOTKEY = "hotkey"
+
+def generate_skewed_data(file_path, size_gb=1.0, hotkey_ratio=0.6, seed=None, shards=1,
+                         workers=None, hdfs_dir=None, compression=None):
     """
     Generate a text file with skewed key distribution.
     
+    Words are streamed block by block, so memory use does not grow with the
+    dataset size; the hotkey count of every block is drawn hypergeometrically
+    from the words that remain, which keeps the overall ratio exact.
+    
     Args:
         file_path: Path to output file
         size_gb: Target file size in GB
         hotkey_ratio: Ratio of the hotkey (e.g., 0.6 means 60%)
+        seed: Seed for the NumPy random generator (None for fresh entropy)
+        shards: Number of part files; >1 writes them in parallel into a directory
+            named after file_path without its extension
+        workers: Process pool size for sharded generation
+        hdfs_dir: Stream the dataset into this HDFS directory instead of
+            writing file_path; a local pointer file records where it went
+        compression: Compress the output with this codec (gzip, bzip2, zstd)
     """
     target_size = int(size_gb * 1024 * 1024 * 1024)  # Convert to bytes
     
     # Generate a pool of normal words
-    normal_words = [f"word{i:05d}" for i in range(10000)]
-    hotkey = "hotkey"
+    normal_words = NORMAL_WORDS
+    hotkey = HOTKEY
     
-    print(f"Generating {size_gb:.2f}GB of SKEWED data to {file_path}...")
+    output = datagen.output_path(file_path, shards, hdfs_dir, compression)
+    counts_path = datagen.counts_path_for(file_path)
+    
+    print(f"Generating {size_gb:.2f}GB of SKEWED data to {output}...")
     print(f"  Hotkey: '{hotkey}' (ratio: {hotkey_ratio*100:.0f}%)")
+    hot_reducer = datagen.hash_partitions(datagen.Vocabulary([hotkey]).hash_codes(),
+                                          datagen.DEFAULT_REDUCERS)[0]
+    print(f"  Hotkey partition: reducer {hot_reducer} of {datagen.DEFAULT_REDUCERS}")
     print(f"  Normal words: {len(normal_words)} unique words")
     print(f"  Target size: {target_size:,} bytes")
     
@@ -46,90 +80,129 @@ def generate_skewed_data(file_path, size_gb=1.0, hotkey_ratio=0.6):
     print(f"    - Hotkey occurrences: {hotkey_count:,}")
     print(f"    - Normal words: {normal_count:,}")
     
-    current_size = 0
-    words_written = 0
-    hotkey_written = 0
-    
-    # Pre-generate a shuffled list to ensure proper distribution
-    word_list = [hotkey] * hotkey_count + [random.choice(normal_words) for _ in range(normal_count)]
-    random.shuffle(word_list)
-    
     print("\n  Writing data...")
-    with open(file_path, 'w') as f:
-        words_per_line = 10
-        line_words = []
-        
-        for word in word_list:
-            line_words.append(word)
-            if word == hotkey:
-                hotkey_written += 1
-            words_written += 1
-            
-            if len(line_words) >= words_per_line:
-                line = ' '.join(line_words) + '\n'
-                f.write(line)
-                current_size += len(line)
-                line_words = []
-                
-                # Print progress every 100MB
-                if current_size % (100 * 1024 * 1024) < 200:
-                    progress = current_size / target_size * 100
-                    print(f"    Progress: {progress:.1f}% ({current_size / (1024*1024*1024):.2f}GB)")
-        
-        # Write remaining words
-        if line_words:
-            line = ' '.join(line_words) + '\n'
-            f.write(line)
-            current_size += len(line)
+    current_size, words_written, hotkey_written = datagen.generate_hotkey_file(
+        output, total_words, hotkey_count, normal_words, hotkey, seed=seed,
+        shards=shards, workers=workers, progress_prefix='    ', compression=compression,
+        counts_path=counts_path
+    )
     
     final_size_gb = current_size / (1024 * 1024 * 1024)
     final_size_mb = current_size / (1024 * 1024)
     actual_hotkey_ratio = hotkey_written / words_written if words_written > 0 else 0
+    if hdfs_dir:
+        datagen.write_hdfs_pointer(file_path, output, current_size)
     
     print(f"\n  ✓ Skewed data generation complete!")
     print(f"    File size: {final_size_gb:.2f}GB ({final_size_mb:.1f}MB)")
     print(f"    Total words: {words_written:,}")
     print(f"    Hotkey occurrences: {hotkey_written:,} ({actual_hotkey_ratio*100:.1f}%)")
-    print(f"    File: {file_path}")
+    print(f"    File: {output}")
+    if os.path.exists(counts_path):
+        print(f"    Count manifest: {counts_path}")
+    return current_size
 
-def generate_uniform_data(file_path, size_gb=1.0):
+def generate_clustered_data(file_path, size_gb=1.0, hot_blocks=1, hot_block_ratio=0.9,
+                            placement='spread', seed=None, shards=1, workers=None, hdfs_dir=None):
+    """
+    Generate a text file whose hotkey is clustered into a few HDFS blocks.
+    
+    Every block is exactly one 64MB split; only the hot blocks contain the
+    hotkey, so the skew hits hot_blocks map tasks instead of all of them.
+    
+    Args:
+        file_path: Path to output file
+        size_gb: Target file size in GB
+        hot_blocks: Number of HDFS blocks (map tasks) that carry the hotkey
+        hot_block_ratio: Fraction of the words in a hot block that are the hotkey
+        placement: Where the hot blocks sit: spread, first or last
+        seed: Seed for the NumPy random generator (None for fresh entropy)
+        shards: Number of part files; >1 writes them in parallel into a directory
+            named after file_path without its extension
+        workers: Process pool size for sharded generation
+        hdfs_dir: Stream the dataset into this HDFS directory instead of
+            writing file_path; a local pointer file records where it went
+    """
+    target_size = int(size_gb * 1024 * 1024 * 1024)  # Convert to bytes
+    num_blocks = -(-target_size // datagen.HDFS_BLOCK_SIZE)
+    
+    output = datagen.output_path(file_path, shards, hdfs_dir)
+    counts_path = datagen.counts_path_for(file_path)
+    
+    print(f"Generating {size_gb:.2f}GB of CLUSTERED data to {output}...")
+    print(f"  Hotkey: '{HOTKEY}' ({hot_block_ratio*100:.0f}% of the words in "
+          f"{hot_blocks} of {num_blocks} blocks, placement: {placement})")
+    print(f"  Block size: {datagen.HDFS_BLOCK_SIZE // (1024 * 1024)}MB (one map task per block)")
+    print(f"  Target size: {target_size:,} bytes")
+    
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    
+    print("\n  Writing data...")
+    current_size, words_written, hotkey_written, hot_indices = datagen.generate_clustered_file(
+        output, target_size, hot_blocks, hot_block_ratio, NORMAL_WORDS, HOTKEY,
+        placement=placement, seed=seed, shards=shards, workers=workers,
+        progress_prefix='    ', counts_path=counts_path
+    )
+    if hdfs_dir:
+        datagen.write_hdfs_pointer(file_path, output, current_size)
+    
+    actual_hotkey_ratio = hotkey_written / words_written if words_written > 0 else 0
+    print(f"\n  ✓ Clustered data generation complete!")
+    print(f"    File size: {current_size / (1024 * 1024 * 1024):.2f}GB ({current_size / (1024 * 1024):.1f}MB)")
+    print(f"    Total words: {words_written:,}")
+    print(f"    Hotkey occurrences: {hotkey_written:,} ({actual_hotkey_ratio*100:.1f}% overall)")
+    print(f"    Hot blocks: {', '.join(str(i) for i in hot_indices)}")
+    print(f"    File: {output}")
+    if os.path.exists(counts_path):
+        print(f"    Count manifest: {counts_path}")
+    return current_size
+
+def generate_uniform_data(file_path, size_gb=1.0, seed=None, shards=1, workers=None,
+                          align_blocks=False, hdfs_dir=None, compression=None):
     """
     Generate a text file with uniform key distribution (control group).
     
     Args:
         file_path: Path to output file
         size_gb: Target file size in GB
+        seed: Seed for the NumPy random generator (None for fresh entropy)
+        shards: Number of part files; >1 writes them in parallel into a directory
+            named after file_path without its extension
+        workers: Process pool size for sharded generation
+        align_blocks: Size part files as whole HDFS blocks
+        hdfs_dir: Stream the dataset into this HDFS directory instead of
+            writing file_path; a local pointer file records where it went
+        compression: Compress the output with this codec (gzip, bzip2, zstd)
     """
     target_size = int(size_gb * 1024 * 1024 * 1024)  # Convert to bytes
     
     # Generate a pool of words - same size as skewed version
-    words_pool = [f"word{i:05d}" for i in range(10000)]
+    words_pool = NORMAL_WORDS
+    
+    output = datagen.output_path(file_path, shards, hdfs_dir, compression)
+    counts_path = datagen.counts_path_for(file_path)
     
-    print(f"Generating {size_gb:.2f}GB of UNIFORM data to {file_path}...")
+    print(f"Generating {size_gb:.2f}GB of UNIFORM data to {output}...")
     print(f"  Word pool: {len(words_pool)} unique words")
     print(f"  Target size: {target_size:,} bytes")
     
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     
-    current_size = 0
-    words_written = 0
-    words_per_line = 10
-    
     print("\n  Writing data...")
-    with open(file_path, 'w') as f:
-        while current_size < target_size:
-            # Generate a line with random words (uniformly distributed)
-            line_words = [random.choice(words_pool) for _ in range(words_per_line)]
-            line = ' '.join(line_words) + '\n'
-            f.write(line)
-            current_size += len(line)
-            words_written += words_per_line
-            
-            # Print progress every 100MB
-            if current_size % (100 * 1024 * 1024) < 200:
-                progress = current_size / target_size * 100
-                print(f"    Progress: {progress:.1f}% ({current_size / (1024*1024*1024):.2f}GB)")
+    if shards > 1:
+        current_size, words_written = datagen.generate_text_shards(
+            output, target_size, words_pool, shards, seed=seed, workers=workers,
+            align_blocks=align_blocks, progress_prefix='    ', compression=compression,
+            counts_path=counts_path
+        )
+    else:
+        current_size, words_written = datagen.generate_text_file(
+            output, target_size, words_pool, seed=seed, progress_prefix='    ',
+            counts_path=counts_path
+        )
+    if hdfs_dir:
+        datagen.write_hdfs_pointer(file_path, output, current_size)
     
     final_size_gb = current_size / (1024 * 1024 * 1024)
     final_size_mb = current_size / (1024 * 1024)
@@ -137,28 +210,138 @@ def generate_uniform_data(file_path, size_gb=1.0):
     print(f"\n  ✓ Uniform data generation complete!")
     print(f"    File size: {final_size_gb:.2f}GB ({final_size_mb:.1f}MB)")
     print(f"    Total words: {words_written:,}")
-    print(f"    File: {file_path}")
+    print(f"    File: {output}")
+    if os.path.exists(counts_path):
+        print(f"    Count manifest: {counts_path}")
+    return current_size
+
+def generate_profile_data(file_path, profile, size_gb=1.0, seed=None, shards=1, workers=None,
+                          align_blocks=False, hdfs_dir=None, compression=None):
+    """
+    Generate a text file whose keys follow a skew profile (see datagen.parse_profile).
+    
+    Args:
+        file_path: Path to output file
+        profile: Skew profile built by datagen.parse_profile
+        size_gb: Target file size in GB
+        seed: Seed for the NumPy random generator (None for fresh entropy)
+        shards: Number of part files; >1 writes them in parallel into a directory
+            named after file_path without its extension
+        workers: Process pool size for sharded generation
+        align_blocks: Size part files as whole HDFS blocks
+        hdfs_dir: Stream the dataset into this HDFS directory instead of
+            writing file_path; a local pointer file records where it went
+        compression: Compress the output with this codec (gzip, bzip2, zstd)
+    """
+    target_size = int(size_gb * 1024 * 1024 * 1024)  # Convert to bytes
+    
+    output = datagen.output_path(file_path, shards, hdfs_dir, compression)
+    counts_path = datagen.counts_path_for(file_path)
+    
+    print(f"Generating {size_gb:.2f}GB of '{profile.label}' data to {output}...")
+    for key, value in profile.describe().items():
+        print(f"  {key}: {value}")
+    print(f"  Target size: {target_size:,} bytes")
+    
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    
+    print("\n  Writing data...")
+    if shards > 1:
+        current_size, words_written = datagen.generate_profile_shards(
+            output, target_size, profile, shards, seed=seed, workers=workers,
+            align_blocks=align_blocks, progress_prefix='    ', compression=compression,
+            counts_path=counts_path
+        )
+    else:
+        current_size, words_written = datagen.generate_profile_file(
+            output, target_size, profile, seed=seed, progress_prefix='    ',
+            counts_path=counts_path
+        )
+    if hdfs_dir:
+        datagen.write_hdfs_pointer(file_path, output, current_size)
+    
+    print(f"\n  ✓ Profile data generation complete!")
+    print(f"    File size: {current_size / (1024 * 1024 * 1024):.2f}GB ({current_size / (1024 * 1024):.1f}MB)")
+    print(f"    Total words: {words_written:,}")
+    print(f"    File: {output}")
+    if os.path.exists(counts_path):
+        print(f"    Count manifest: {counts_path}")
+    return current_size
+
+def generate_dataset(generate, file_path, args, params):
+    """
+    Run generate(path, hdfs_dir=...) for file_path, or through the shared
+    dataset cache (keyed by params) with --cache.
+    """
+    if not args.cache:
+        return generate(file_path, hdfs_dir=args.hdfs_dir)
+    dataset_cache.generate_cached(file_path, params, args.shards, generate)
 
 def main():
     """Generate both skewed and uniform datasets for Task 4."""
+    parser = argparse.ArgumentParser(description='Generate skewed and uniform data for Task 4.')
+    parser.add_argument('--size-gb', type=float, default=1.0,
+                        help='Target size of each dataset in GB (streamed, so 10-100GB is fine)')
+    parser.add_argument('--hotkey-ratio', type=float, default=0.6,
+                        help='Exact fraction of words that are the hotkey in the skewed dataset')
+    parser.add_argument('--profile', action='append', metavar='SPEC',
+                        help='Generate a dataset for a skew profile instead of the skewed/uniform '
+                             'pair (repeatable), e.g. zipf:alpha=1.2, topk:weights=0.3/0.2/0.1, '
+                             'heavytail, partition:weights=0.2/0.2,on=3')
+    parser.add_argument('--clustered', type=int, default=None, metavar='N',
+                        help='Generate a map-side skew dataset instead of the skewed/uniform pair: '
+                             'the hotkey only appears in N block-aligned 64MB splits')
+    parser.add_argument('--hot-block-ratio', type=float, default=0.9,
+                        help='Fraction of the words in each hot block that are the hotkey '
+                             '(with --clustered)')
+    parser.add_argument('--placement', choices=datagen.CLUSTER_PLACEMENTS, default='spread',
+                        help='Where the hot blocks sit in the input (with --clustered)')
+    datagen.add_shard_arguments(parser)
+    dataset_cache.add_cache_arguments(parser)
+    args = parser.parse_args()
+    dataset_cache.check_cache_arguments(parser, args)
+    if args.clustered is not None:
+        if args.profile:
+            parser.error('--clustered cannot be combined with --profile')
+        if args.compression:
+            parser.error('--clustered lays out plain-text blocks and cannot be compressed')
+        if not 0 < args.hot_block_ratio <= 1:
+            parser.error('--hot-block-ratio must be in (0, 1]')
+        num_blocks = -(-int(args.size_gb * 1024 * 1024 * 1024) // datagen.HDFS_BLOCK_SIZE)
+        if not 0 < args.clustered <= num_blocks:
+            parser.error(f'--clustered must be between 1 and the {num_blocks} blocks of --size-gb')
+        generate_clustered(args)
+        return
+    
+    if args.profile:
+        try:
+            profiles = [datagen.parse_profile(spec) for spec in args.profile]
+        except ValueError as e:
+            parser.error(str(e))
+        generate_profiles(profiles, args)
+        return
+    
     print("="*80)
     print("Task 4: Data Skew Testing - Data Generation")
     print("="*80)
     print()
     print("This script will generate two datasets:")
-    print("  1. Skewed Data:  1GB with 60% hotkey concentration")
-    print("  2. Uniform Data: 1GB with uniform distribution (control)")
+    print(f"  1. Skewed Data:  {args.size_gb:g}GB with {args.hotkey_ratio*100:.0f}% hotkey concentration")
+    print(f"  2. Uniform Data: {args.size_gb:g}GB with uniform distribution (control)")
     print()
     
     data_dir = '/root/Exp-hadoop/EXP/task4/data'
     skewed_file = os.path.join(data_dir, 'input_skewed_1gb.txt')
     uniform_file = os.path.join(data_dir, 'input_uniform_1gb.txt')
     
+    output_paths = [datagen.local_output_path(p, args.shards, args.hdfs_dir, args.compression)
+                    for p in (skewed_file, uniform_file)]
+    
     # Check existing files
     existing_files = []
-    for file_path in [skewed_file, uniform_file]:
+    for file_path in output_paths:
         if os.path.exists(file_path):
-            size_gb = os.path.getsize(file_path) / (1024 * 1024 * 1024)
+            size_gb = datagen.dataset_size(file_path) / (1024 * 1024 * 1024)
             existing_files.append((os.path.basename(file_path), size_gb))
     
     if existing_files:
@@ -176,13 +359,39 @@ def main():
     print("-"*80)
     print("STEP 1: Generating Skewed Data")
     print("-"*80)
-    generate_skewed_data(skewed_file, size_gb=1.0, hotkey_ratio=0.6)
+    # Skewed shards are split by whole lines to keep hotkey counts exact, so
+    # --align-blocks only applies to the uniform dataset
+    target_size = int(args.size_gb * 1024 * 1024 * 1024)
+    generate_dataset(
+        functools.partial(generate_skewed_data, size_gb=args.size_gb,
+                          hotkey_ratio=args.hotkey_ratio, seed=args.seed,
+                          shards=args.shards, workers=args.workers,
+                          compression=args.compression),
+        skewed_file, args,
+        args.cache and dataset_cache.dataset_params(
+            'hotkey', target_size, args.seed, args.shards, compression=args.compression,
+            hotkey=HOTKEY,
+            hotkey_ratio=args.hotkey_ratio,
+            vocabulary=dataset_cache.vocabulary_digest(NORMAL_WORDS)
+        )
+    )
     
     print()
     print("-"*80)
     print("STEP 2: Generating Uniform Data (Control)")
     print("-"*80)
-    generate_uniform_data(uniform_file, size_gb=1.0)
+    # Offset the seed so the control group does not reuse the skewed stream
+    uniform_seed = None if args.seed is None else args.seed + 1
+    generate_dataset(
+        functools.partial(generate_uniform_data, size_gb=args.size_gb, seed=uniform_seed,
+                          shards=args.shards, workers=args.workers,
+                          align_blocks=args.align_blocks, compression=args.compression),
+        uniform_file, args,
+        args.cache and dataset_cache.dataset_params(
+            'text', target_size, uniform_seed, args.shards, args.align_blocks,
+            compression=args.compression, vocabulary=dataset_cache.vocabulary_digest(NORMAL_WORDS)
+        )
+    )
     
     print()
     print("="*80)
@@ -190,10 +399,10 @@ def main():
     print("="*80)
     print()
     print("Generated files:")
-    for file_path in [skewed_file, uniform_file]:
+    for file_path in output_paths:
         if os.path.exists(file_path):
-            size_gb = os.path.getsize(file_path) / (1024 * 1024 * 1024)
-            size_mb = os.path.getsize(file_path) / (1024 * 1024)
+            size_gb = datagen.dataset_size(file_path) / (1024 * 1024 * 1024)
+            size_mb = datagen.dataset_size(file_path) / (1024 * 1024)
             print(f"  - {os.path.basename(file_path)}: {size_gb:.2f}GB ({size_mb:.1f}MB)")
     print()
     print("Next step: Compile WordCount and run experiments")
@@ -201,6 +410,81 @@ def main():
     print("  python3 scripts/run_experiment.py")
     print()
 
+def generate_clustered(args):
+    """Generate one map-side skew dataset; its experiments.json entry is printed."""
+    print("="*80)
+    print("Task 4: Data Skew Testing - Map-side Skew Data Generation")
+    print("="*80)
+    print()
+    
+    data_dir = '/root/Exp-hadoop/EXP/task4/data'
+    size_label = f"{args.size_gb:g}gb".replace('.', 'p')
+    data_type = f"clustered_b{args.clustered}_{args.placement}_p{args.hot_block_ratio * 100:g}"
+    filename = f"input_{data_type}_{size_label}.txt"
+    # Offset the seed so the dataset does not share the skewed stream
+    seed = None if args.seed is None else args.seed + 2
+    generate_dataset(
+        functools.partial(generate_clustered_data, size_gb=args.size_gb,
+                          hot_blocks=args.clustered, hot_block_ratio=args.hot_block_ratio,
+                          placement=args.placement, seed=seed, shards=args.shards,
+                          workers=args.workers),
+        os.path.join(data_dir, filename), args,
+        args.cache and dataset_cache.dataset_params(
+            'clustered', int(args.size_gb * 1024 * 1024 * 1024), seed, args.shards,
+            hotkey=HOTKEY, hot_blocks=args.clustered, hot_block_ratio=args.hot_block_ratio,
+            placement=args.placement, block_size=datagen.HDFS_BLOCK_SIZE,
+            vocabulary=dataset_cache.vocabulary_digest(NORMAL_WORDS)
+        )
+    )
+    
+    print()
+    print("="*80)
+    print("✓ Data generation complete!")
+    print("="*80)
+    print()
+    print("Add this dataset to experiments.json (and its key to a sweep's datasets):")
+    print(f'    "{data_type}": {{"file": "{filename}"}},')
+    print()
+
+def generate_profiles(profiles, args):
+    """Generate one dataset per skew profile; experiments.json entries are printed."""
+    print("="*80)
+    print("Task 4: Data Skew Testing - Profile Data Generation")
+    print("="*80)
+    print()
+    
+    data_dir = '/root/Exp-hadoop/EXP/task4/data'
+    size_label = f"{args.size_gb:g}gb".replace('.', 'p')
+    data_types = []
+    for idx, profile in enumerate(profiles, 1):
+        filename = f"input_{profile.label}_{size_label}.txt"
+        print("-"*80)
+        print(f"PROFILE {idx}/{len(profiles)}: {profile.label}")
+        print("-"*80)
+        # Offset the seed per profile so datasets do not share a stream
+        seed = None if args.seed is None else args.seed + idx
+        generate_dataset(
+            functools.partial(generate_profile_data, profile=profile, size_gb=args.size_gb,
+                              seed=seed, shards=args.shards, workers=args.workers,
+                              align_blocks=args.align_blocks, compression=args.compression),
+            os.path.join(data_dir, filename), args,
+            args.cache and dataset_cache.dataset_params(
+                'profile', int(args.size_gb * 1024 * 1024 * 1024), seed, args.shards,
+                args.align_blocks, compression=args.compression, profile=profile.describe()
+            )
+        )
+        data_types.append((profile.label, filename))
+        print()
+    
+    print("="*80)
+    print("✓ Data generation complete!")
+    print("="*80)
+    print()
+    print("Add these datasets to experiments.json (and their keys to a sweep's datasets):")
+    for data_type, filename in data_types:
+        print(f'    "{data_type}": {{"file": "{filename}"}},')
+    print()
+
 if __name__ == '__main__':
     main()
 
@@ -10,6 +10,7 @@ import org.apache.hadoop.mapreduce.Mapper;
 import org.apache.hadoop.mapreduce.Reducer;
 import org.apache.hadoop.mapreduce.lib.input.FileInputFormat;
 import org.apache.hadoop.mapreduce.lib.output.FileOutputFormat;
+import org.apache.hadoop.util.GenericOptionsParser;
 
 public class WordCount {
 
@@ -44,8 +45,11 @@ public class WordCount {
         }
     }
 
-    public static void main(String[] args) throws Exception {
-        Configuration conf = new Configuration();
+    // Configures the job without running it; main waits for it, and the
+    // resident submitter (tools/submitter) calls this and Job.submit()
+    public static Job createJob(Configuration conf, String[] args) throws IOException {
+        // Generic options (-Dkey=value) go into conf; the rest are positional
+        args = new GenericOptionsParser(conf, args).getRemainingArgs();
         
         // Get slowstart parameter from command line arguments
         String slowstart = "0.50"; // default
@@ -61,7 +65,8 @@ public class WordCount {
         }
         
         // Extract data distribution type from input path
-        // Input path format: /user/root/task4/input_skewed or input_uniform
+        // Input path format: /user/root/task4/input_skewed, input_uniform,
+        // or input_<profile> (e.g. input_zipf_a1.2_k10000)
         String dataType = "unknown";
         if (args.length >= 1) {
             String inputPath = args[0];
@@ -69,6 +74,11 @@ public class WordCount {
                 dataType = "Skewed";
             } else if (inputPath.toLowerCase().contains("uniform")) {
                 dataType = "Uniform";
+            } else {
+                String dirName = new Path(inputPath).getName();
+                if (dirName.startsWith("input_")) {
+                    dataType = dirName.substring("input_".length());
+                }
             }
         }
         
@@ -77,9 +87,14 @@ public class WordCount {
         String jobName = String.format("Task4_DataSkew_%s_slowstart%s_reducers%d", 
                                        dataType, slowstart, numReducers);
         
-        Job job = Job.getInstance(conf, jobName);
+        // A name given with -Dmapreduce.job.name takes precedence
+        Job job = Job.getInstance(conf, conf.get("mapreduce.job.name", jobName));
         job.setJarByClass(WordCount.class);
         job.setMapperClass(TokenizerMapper.class);
+        // -Dwordcount.combiner=true runs with the map-side combiner
+        if (conf.getBoolean("wordcount.combiner", false)) {
+            job.setCombinerClass(IntSumReducer.class);
+        }
         job.setReducerClass(IntSumReducer.class);
         job.setOutputKeyClass(Text.class);
         job.setOutputValueClass(IntWritable.class);
@@ -90,6 +105,11 @@ public class WordCount {
         FileInputFormat.addInputPath(job, new Path(args[0]));
         FileOutputFormat.setOutputPath(job, new Path(args[1]));
         
+        return job;
+    }
+
+    public static void main(String[] args) throws Exception {
+        Job job = createJob(new Configuration(), args);
         System.exit(job.waitForCompletion(true) ? 0 : 1);
     }
 }
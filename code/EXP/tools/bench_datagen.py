@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Measure how fast the data generators produce input, and catch slowdowns.
+
+Every generator mode behind the task generate_data.py scripts is run at
+each requested size and worker count, each case in a fresh Python process
+so its peak RSS and CPU time are its own:
+
+    python3 bench_datagen.py --sizes 256MB,1GB --workers 1,4 --json bench.json
+    python3 bench_datagen.py --baseline bench_baseline.json
+
+The report lists MB/s, the peak resident set of the largest process
+(the generator or one of its pool workers) and CPU utilization in busy
+cores. A case whose peak RSS exceeds its mode's RSS_LIMITS_MB fails the
+run. With --baseline the run is compared case by case against a stored
+report and exits 1 when any case got slower than --tolerance allows; a
+missing baseline file is created from the current run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import datagen
+
+# Generator modes: a skew profile spec (see datagen.parse_profile) or TeraGen
+MODES = {
+    'uniform': 'uniform',
+    'skewed': 'zipf:alpha=1.2',
+    'high-cardinality': 'uniform:keys=1e8',
+    'hot-high-cardinality': 'topk:weights=0.1,keys=1e7',
+    'teragen': None,
+}
+
+# Peak RSS ceilings in MB: key spaces of millions must never be materialised
+# as Python strings, so these modes fail when their memory stops being bounded
+RSS_LIMITS_MB = {
+    'high-cardinality': 512,
+    'hot-high-cardinality': 512,
+}
+
+DEFAULT_SIZES = '256MB'
+DEFAULT_WORKERS = '1,4'
+
+# A case is a regression when its MB/s drops below (1 - tolerance) x baseline
+DEFAULT_TOLERANCE = 0.15
+
+
+def parse_sizes(text):
+    """Byte sizes from a list such as 64MB,256MB,1GB (a bare number is MB)."""
+    sizes = []
+    for item in filter(None, text.split(',')):
+        item = item.strip().upper()
+        unit = datagen.GB if item.endswith('GB') else datagen.MB
+        try:
+            value = float(item[:-2] if item.endswith(('GB', 'MB')) else item)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid size '{item}'") from None
+        if value <= 0:
+            raise argparse.ArgumentTypeError(f"Size must be positive, got '{item}'")
+        sizes.append(int(value * unit))
+    return sizes
+
+
+def parse_workers(text):
+    """Worker counts from a list such as 1,4,8."""
+    try:
+        counts = [int(item) for item in filter(None, text.split(','))]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid worker counts '{text}'") from None
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError(f"Worker counts must be positive, got '{text}'")
+    return counts
+
+
+def parse_modes(text):
+    """Generator modes from a list such as uniform,teragen."""
+    modes = [item.strip() for item in filter(None, text.split(','))]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown mode(s): {', '.join(unknown)} "
+                                         f"(choose from {', '.join(MODES)})")
+    return modes
+
+
+def size_label(size):
+    """Short label of a byte size: 256MB, 1GB, 1.5GB."""
+    if size >= datagen.GB:
+        return f"{size / datagen.GB:g}GB"
+    return f"{size / datagen.MB:g}MB"
+
+
+def case_key(mode, size, workers):
+    """Name that matches a case across reports, e.g. skewed/1GB/4w."""
+    return f"{mode}/{size_label(size)}/{workers}w"
+
+
+def host_info():
+    """Machine facts a baseline only makes sense on."""
+    return {
+        'hostname': platform.node(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+    }
+
+
+def generate(mode, size, workers, output_dir):
+    """
+    Generate one case quietly into output_dir.
+
+    Returns:
+        (bytes_written, records_written); records are words, or TeraGen rows
+    """
+    if MODES[mode] is None:
+        return datagen.generate_teragen(output_dir, size // datagen.TERA_RECORD, shards=workers,
+                                        workers=workers, progress_prefix=None)
+    profile = datagen.parse_profile(MODES[mode])
+    if workers == 1:
+        return datagen.generate_profile_file(os.path.join(output_dir, 'part-00000'), size, profile,
+                                             seed=0, progress_prefix=None)
+    return datagen.generate_profile_shards(output_dir, size, profile, workers, seed=0,
+                                           workers=workers, progress_prefix=None)
+
+
+def run_case(mode, size, workers, output_dir):
+    """
+    Time one case in this process; called in a child by measure_case.
+
+    CPU time and peak RSS cover this process and its reaped pool workers.
+    """
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    start = time.perf_counter()
+    bytes_written, records = generate(mode, size, workers, output_dir)
+    elapsed = time.perf_counter() - start
+    after = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+
+    cpu_seconds = sum(a.ru_utime + a.ru_stime - b.ru_utime - b.ru_stime for a, b in zip(after, usage))
+    return {
+        'bytes': int(bytes_written),
+        'records': int(records),
+        'seconds': elapsed,
+        'mb_per_s': bytes_written / datagen.MB / max(elapsed, 1e-9),
+        'cpu_seconds': cpu_seconds,
+        'cpu_util': cpu_seconds / max(elapsed, 1e-9),
+        # ru_maxrss is in KB on Linux
+        'peak_rss_mb': max(a.ru_maxrss for a in after) / 1024,
+    }
+
+
+def measure_case(mode, size, workers, work_dir, repeat=1):
+    """
+    Run a case in fresh processes, `repeat` times, and keep the fastest run.
+
+    Returns:
+        Case result dict, or None when the generator failed
+    """
+    runs = []
+    for _ in range(repeat):
+        output_dir = tempfile.mkdtemp(prefix='bench_', dir=work_dir)
+        result_path = os.path.join(output_dir, '_result.json')
+        cmd = [sys.executable, os.path.abspath(__file__), '--run-case',
+               json.dumps([mode, size, workers, output_dir, result_path])]
+        try:
+            proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            if proc.returncode != 0:
+                print(f"  ✗ {case_key(mode, size, workers)} failed: {proc.stderr.strip().splitlines()[-1:]}")
+                return None
+            with open(result_path) as f:
+                runs.append(json.load(f))
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    best = max(runs, key=lambda run: run['mb_per_s'])
+    best.update({'mode': mode, 'size': size, 'workers': workers, 'repeat': repeat,
+                 'mb_per_s_runs': [run['mb_per_s'] for run in runs]})
+    return best
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """
+    Compare MB/s case by case; cases missing from either report are skipped.
+
+    Returns:
+        List of (key, current, baseline, ratio, regressed) tuples
+    """
+    base_cases = baseline.get('cases', {})
+    rows = []
+    for key, case in report['cases'].items():
+        if key not in base_cases:
+            continue
+        ratio = case['mb_per_s'] / max(base_cases[key]['mb_per_s'], 1e-9)
+        rows.append((key, case, base_cases[key], ratio, ratio < 1 - tolerance))
+    return rows
+
+
+def print_comparison(rows, report, baseline, tolerance):
+    """Print the baseline comparison table."""
+    print(f"\nComparison with baseline (tolerance {tolerance:.0%}):")
+    if baseline.get('host', {}).get('cpu_count') != report['host']['cpu_count'] or \
+            baseline.get('host', {}).get('machine') != report['host']['machine']:
+        print("  ⚠ Warning: baseline was recorded on a different machine "
+              f"({baseline.get('host', {}).get('hostname', 'unknown')})")
+    if not rows:
+        print("  ⚠ Warning: no case in common with the baseline")
+        return
+    print(f"  {'Case':<28} {'MB/s':>9} {'Baseline':>9} {'Change':>8} {'RSS MB':>8} {'Base RSS':>9}")
+    for key, case, base, ratio, regressed in rows:
+        mark = '✗' if regressed else '✓'
+        print(f"{mark} {key:<28} {case['mb_per_s']:>9.1f} {base['mb_per_s']:>9.1f} "
+              f"{(ratio - 1) * 100:>+7.1f}% {case['peak_rss_mb']:>8.0f} {base['peak_rss_mb']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark data generator throughput.')
+    parser.add_argument('--modes', type=parse_modes, default=list(MODES),
+                        help=f'Generator modes to run (default: {",".join(MODES)})')
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes(DEFAULT_SIZES),
+                        help=f'Dataset sizes, e.g. 64MB,1GB (default: {DEFAULT_SIZES})')
+    parser.add_argument('--workers', type=parse_workers, default=parse_workers(DEFAULT_WORKERS),
+                        help=f'Worker counts; N>1 writes N shards in parallel (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs per case; the fastest is reported (default: 1)')
+    parser.add_argument('--dir', default=None,
+                        help='Scratch directory for generated data (default: system temp)')
+    parser.add_argument('--json', metavar='PATH', help='Write the report as JSON')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='Compare against this report; created from this run if missing')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed MB/s drop before a case counts as a regression '
+                             f'(default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Overwrite the baseline with this run after comparing')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        mode, size, workers, output_dir, result_path = json.loads(args.run_case)
+        result = run_case(mode, size, workers, output_dir)
+        with open(result_path, 'w') as f:
+            json.dump(result, f)
+        return
+
+    report = {'host': host_info(), 'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+              'tolerance': args.tolerance, 'cases': {}}
+    cases = [(mode, size, workers) for mode in args.modes for size in args.sizes for workers in args.workers]
+    print(f"Benchmarking {len(cases)} generator case(s) on {report['host']['cpu_count']} CPUs...")
+    print(f"  {'Case':<28} {'MB/s':>9} {'Seconds':>8} {'CPU cores':>9} {'Peak RSS MB':>11}")
+
+    failed = False
+    for mode, size, workers in cases:
+        result = measure_case(mode, size, workers, args.dir, repeat=max(args.repeat, 1))
+        if result is None:
+            failed = True
+            continue
+        key = case_key(mode, size, workers)
+        report['cases'][key] = result
+        print(f"  {key:<28} {result['mb_per_s']:>9.1f} {result['seconds']:>8.2f} "
+              f"{result['cpu_util']:>9.2f} {result['peak_rss_mb']:>11.0f}")
+        limit = RSS_LIMITS_MB.get(mode)
+        if limit is not None and result['peak_rss_mb'] > limit:
+            print(f"  ✗ {key} peaked at {result['peak_rss_mb']:.0f} MB RSS (limit {limit} MB)")
+            failed = True
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            with open(args.baseline, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n✓ No baseline found; stored this run as {args.baseline}")
+        else:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            rows = compare_to_baseline(report, baseline, args.tolerance)
+            print_comparison(rows, report, baseline, args.tolerance)
+            regressions = [row[0] for row in rows if row[4]]
+            if regressions:
+                print(f"\n✗ {len(regressions)} case(s) slower than the baseline: {', '.join(regressions)}")
+                failed = True
+            else:
+                print(f"\n✓ No throughput regressions ({len(rows)} case(s) compared)")
+            if args.update_baseline:
+                with open(args.baseline, 'w') as f:
+                    json.dump(report, f, indent=2)
+                print(f"✓ Baseline updated: {args.baseline}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
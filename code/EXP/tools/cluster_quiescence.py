@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Wait until the cluster has settled after a job instead of sleeping blindly.
+
+A finished job leaves work behind for a few seconds: containers being
+cleaned up, shuffle handlers still serving map output, DataNodes flushing
+replicas. The probe polls
+
+  - the ResourceManager's /ws/v1/cluster/metrics (no running or pending
+    applications, no allocated containers or memory),
+  - every running NodeManager's /ws/v1/node/containers (no container short
+    of DONE) and its ShuffleMetrics JMX bean (no open shuffle connections),
+  - optionally the DataNodes' DataNodeActivity JMX byte counters (disk and
+    network traffic below a threshold),
+
+and returns once all of them have been idle for a whole window:
+
+    python3 cluster_quiescence.py --window 3 --io-counters
+"""
+
+import argparse
+import time
+
+import requests
+
+import yarn_capacity
+
+# DataNode web port (dfs.datanode.http.address)
+DATANODE_HTTP_PORT = "9864"
+
+SHUFFLE_BEAN = 'Hadoop:service=NodeManager,name=ShuffleMetrics'
+DATANODE_BEAN = 'Hadoop:service=DataNode,name=DataNodeActivity-*'
+
+# Container states after which nothing of the container is left on the node
+FINISHED_CONTAINER_STATES = ('DONE',)
+
+
+def fetch_node(url):
+    """JSON document of a NodeManager or DataNode endpoint; raises OSError when unreachable."""
+    try:
+        response = requests.get(url, timeout=5)
+        response.raise_for_status()
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise OSError(f"Request {url} failed: {e}") from None
+
+
+def active_containers(http_address):
+    """Containers on a NodeManager that are not finished yet (including ones being cleaned up)."""
+    containers = fetch_node(f"http://{http_address}/ws/v1/node/containers").get('containers') or {}
+    return sum(1 for container in containers.get('container', [])
+               if container.get('state') not in FINISHED_CONTAINER_STATES)
+
+
+def shuffle_connections(http_address):
+    """Open connections of a NodeManager's shuffle handler."""
+    beans = fetch_node(f"http://{http_address}/jmx?qry={SHUFFLE_BEAN}").get('beans', [])
+    return beans[0].get('ShuffleConnections', 0) if beans else 0
+
+
+def datanode_bytes(host):
+    """Bytes a DataNode has read and written since it started."""
+    beans = fetch_node(f"http://{host}:{DATANODE_HTTP_PORT}/jmx?qry={DATANODE_BEAN}").get('beans', [])
+    return sum(bean.get('BytesRead', 0) + bean.get('BytesWritten', 0) for bean in beans)
+
+
+class QuiescenceProbe:
+    """
+    Polls the cluster until it has been idle for `window` seconds.
+
+    With io_counters the DataNodes' traffic must also stay below
+    io_threshold_mb_s on every node.
+    """
+
+    def __init__(self, window=3.0, poll=1.0, timeout=180.0, io_counters=False, io_threshold_mb_s=1.0):
+        self.window = window
+        self.poll = poll
+        self.timeout = timeout
+        self.io_counters = io_counters
+        self.io_threshold = io_threshold_mb_s * 1024 * 1024
+        self.io_samples = {}
+
+    def busy(self):
+        """
+        Why the cluster is not idle right now.
+
+        Returns:
+            List of reasons; empty when idle. Raises OSError when the RM or a
+            node cannot be asked.
+        """
+        reasons = []
+        metrics = yarn_capacity.cluster_metrics()
+        if metrics['apps_running'] or metrics['apps_pending']:
+            reasons.append(f"{metrics['apps_running']} running / {metrics['apps_pending']} pending apps")
+        if metrics['containers_allocated'] or metrics['allocated_mb']:
+            reasons.append(f"{metrics['containers_allocated']} containers, {metrics['allocated_mb']} MB allocated")
+
+        now = time.time()
+        for node in yarn_capacity.running_nodes():
+            containers = active_containers(node['http_address'])
+            if containers:
+                reasons.append(f"{node['host']}: {containers} containers not done")
+            connections = shuffle_connections(node['http_address'])
+            if connections:
+                reasons.append(f"{node['host']}: {connections} shuffle connections")
+            if self.io_counters:
+                total = datanode_bytes(node['host'])
+                previous = self.io_samples.get(node['host'])
+                self.io_samples[node['host']] = (now, total)
+                if previous is None:
+                    reasons.append(f"{node['host']}: measuring I/O")
+                else:
+                    rate = (total - previous[1]) / max(now - previous[0], 1e-3)
+                    if rate > self.io_threshold:
+                        reasons.append(f"{node['host']}: {rate / 1024 / 1024:.1f} MB/s DataNode I/O")
+        return reasons
+
+    def wait(self):
+        """
+        Block until the cluster has been idle for a whole window, or the timeout passes.
+
+        Returns:
+            Dict with waited (seconds), timed_out, and the last busy reasons
+        """
+        start = time.time()
+        idle_since = None
+        reasons = []
+        self.io_samples = {}
+        while True:
+            current = self.busy()
+            now = time.time()
+            if current:
+                reasons = current
+                idle_since = None
+            elif idle_since is None:
+                idle_since = now
+            if idle_since is not None and now - idle_since >= self.window:
+                return {'waited': now - start, 'timed_out': False, 'busy': reasons}
+            if now - start >= self.timeout:
+                return {'waited': now - start, 'timed_out': True, 'busy': reasons}
+            time.sleep(self.poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wait until the cluster is idle.')
+    parser.add_argument('--window', type=float, default=3.0,
+                        help='Seconds the cluster must stay idle (default: 3)')
+    parser.add_argument('--poll', type=float, default=1.0, help='Seconds between probes (default: 1)')
+    parser.add_argument('--timeout', type=float, default=180.0, help='Give up after this many seconds')
+    parser.add_argument('--io-counters', action='store_true',
+                        help='Also wait for DataNode disk/network traffic to drop')
+    parser.add_argument('--io-threshold', type=float, default=1.0,
+                        help='DataNode traffic (MB/s per node) that still counts as idle (default: 1)')
+    args = parser.parse_args()
+
+    probe = QuiescenceProbe(args.window, args.poll, args.timeout, args.io_counters, args.io_threshold)
+    try:
+        result = probe.wait()
+    except OSError as e:
+        print(f"✗ {e}")
+        raise SystemExit(2)
+    if result['timed_out']:
+        print(f"✗ Cluster still busy after {result['waited']:.1f} seconds: {'; '.join(result['busy'])}")
+        raise SystemExit(1)
+    print(f"✓ Cluster idle after {result['waited']:.1f} seconds"
+          + (f" (was: {'; '.join(result['busy'])})" if result['busy'] else ''))
+
+
+if __name__ == '__main__':
+    main()
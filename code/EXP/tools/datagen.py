@@ -0,0 +1,2395 @@
+#!/usr/bin/env python3
+"""
+Shared block-based data generation helpers for the EXP generate_data.py scripts.
+
+Word indices are drawn millions at a time with numpy.random.Generator and
+rendered into multi-megabyte byte buffers from a pre-encoded vocabulary, so a
+1GB input is produced at close to disk bandwidth instead of being bound by
+per-word random.choice() and per-line f.write() calls.
+
+The on-disk format is unchanged: lines of WORDS_PER_LINE words separated by a
+single space and terminated by '\\n', written until the file reaches the target
+size (the last line may overshoot it, exactly like the original loop).
+Local files go through BlockWriter, which preallocates them when the final
+size is known and hands whole blocks to the kernel in single write() calls.
+"""
+
+import argparse
+import bz2
+import collections
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+GB = 1024 * 1024 * 1024
+MB = 1024 * 1024
+
+WORDS_PER_LINE = 10
+
+# Bump whenever the bytes generated for the same parameters change; it is part
+# of every dataset_cache key, so stale cached datasets are never reused
+FORMAT_VERSION = 1
+
+# Number of lines rendered per block (~5-10MB of text for typical vocabularies)
+BLOCK_LINES = 100000
+
+# Print progress every 100MB, like the original per-line generators
+PROGRESS_STEP = 100 * MB
+
+# Reusable buffer of a BlockWriter: smaller writes are gathered into one
+# write() of this size, larger ones are passed straight through
+WRITE_BUFFER = 8 * MB
+
+# HDFS block size of the experiment cluster (dfs.blocksize)
+HDFS_BLOCK_SIZE = 64 * MB
+
+# Sidecar written next to sharded part files. The leading underscore makes
+# FileInputFormat skip it, so the whole directory can be used as job input.
+SHARD_MANIFEST = '_SHARDS.json'
+
+# Output paths with this prefix are streamed into HDFS instead of the local disk
+HDFS_SCHEME = 'hdfs://'
+
+# HDFS client used by the pipe sink
+HDFS_COMMAND = os.environ.get('HDFS_COMMAND', 'hdfs')
+
+# When set, HDFS outputs are written below this local directory instead of
+# being piped to the cluster (a stand-in for testing without Hadoop)
+HDFS_STANDIN_ENV = 'DATAGEN_HDFS_ROOT'
+
+# Local pointer left in the data directory for datasets streamed into HDFS
+HDFS_POINTER_EXT = '.hdfs'
+
+# Output compression codecs: name -> (file extension, splittable by Hadoop).
+# Hadoop picks the codec from the extension; only bzip2 input can be split
+# into several map tasks per file, gzip and zstd files get one map each.
+CODECS = {
+    'gzip': ('.gz', False),
+    'bzip2': ('.bz2', True),
+    'zstd': ('.zst', False),
+}
+
+# Uncompressed bytes per independently compressed chunk. Every chunk becomes a
+# complete gzip member / bzip2 stream / zstd frame, and the concatenation is a
+# valid file for each codec, so chunks can be compressed on parallel threads.
+COMPRESS_CHUNK = 8 * MB
+
+# Threads compressing chunks of one output file
+COMPRESS_THREADS = min(4, os.cpu_count() or 1)
+
+# numpy's hypergeometric sampler requires ngood and nbad below this bound
+HYPERGEOMETRIC_LIMIT = 10 ** 9
+
+# Largest Zipf key space sampled by inverse CDF (8 bytes per key); larger
+# spaces fall back to rejection sampling, which needs alpha > 1
+ZIPF_CDF_LIMIT = 20 * 1000 * 1000
+
+# Background key space of the task4 datasets (word00000 ... word09999)
+DEFAULT_KEYS = 10000
+
+# Reduce task count of the task4 experiments (NUM_REDUCERS in run_experiment.py)
+DEFAULT_REDUCERS = 8
+
+# Candidate hot key names hashed per batch when searching for partition collisions
+PARTITION_SEARCH_BATCH = 4096
+
+# Ground-truth counts are kept for vocabularies up to this many keys (8 bytes
+# per key); larger key spaces are generated without a count manifest
+COUNT_LIMIT = 10 ** 7
+
+# Local manifest of exact per-key counts, written next to a dataset
+COUNTS_EXT = '.counts.npz'
+
+# TeraGen record layout (GenSort.generateRecord): 10-byte key + 90-byte value
+TERA_RECORD = 100
+TERA_KEY = 10
+
+# Hadoop's Random16: 128-bit LCG state = state * A + C (mod 2^128); row r is
+# generated from the state after r + 1 steps from 0
+TERA_LCG_A = 0x2360ED051FC65DA44385DF649FCCF645
+TERA_LCG_C = 1
+TERA_MODULUS = 1 << 128
+
+# Records rendered per block (10MB of output)
+TERA_BLOCK_ROWS = 100000
+
+# TeraGen names its outputs after map tasks
+TERA_PART_NAME = 'part-m-{:05d}'
+
+# Small files written by one pool task (one task per file would spend more
+# time on inter-process overhead than on writing a few kilobytes)
+SMALL_FILES_PER_TASK = 256
+
+# File size shape of a small-files dataset when none is given
+DEFAULT_FILE_SIZES = 'lognormal:sigma=1.0'
+
+# Where the hot blocks of a clustered dataset sit among all blocks
+CLUSTER_PLACEMENTS = ('spread', 'first', 'last')
+
+# SequenceFile output (see SequenceFileEncoder): header magic with format
+# version 6, the Writable class of each key encoding and of the value, and
+# the record bytes between sync markers (Hadoop's SequenceFile.SYNC_INTERVAL)
+SEQ_MAGIC = b'SEQ\x06'
+SEQ_KEY_CLASSES = {
+    'text': 'org.apache.hadoop.io.Text',
+    'ids': 'org.apache.hadoop.io.VIntWritable',
+}
+SEQ_VALUE_CLASS = 'org.apache.hadoop.io.IntWritable'
+SEQ_SYNC_INTERVAL = 100 * 1024
+
+# Sync marker of generated SequenceFiles. Hadoop draws a random one per file,
+# but readers only compare it within a file, and a fixed marker keeps the
+# output reproducible for a given seed
+SEQ_SYNC = hashlib.md5(b'EXP datagen SequenceFile').digest()
+
+# Vocabularies up to this size get every record pre-encoded once, so blocks
+# render with a single gather; larger key spaces are encoded block by block
+SEQ_TABLE_LIMIT = 10 ** 6
+
+# Top-k vocabularies up to this size keep a gather table like Vocabulary;
+# larger ones render their numbered background arithmetically
+TOPK_TABLE_LIMIT = 10 ** 6
+
+
+class Vocabulary:
+    """
+    Pre-encoded vocabulary that renders index arrays into text bytes.
+
+    Each word is stored once as a padded uint8 row followed by a separator
+    byte, so rendering a block is a single gather plus a boolean mask.
+    """
+
+    def __init__(self, words):
+        encoded = [w.encode('utf-8') for w in words]
+        if not encoded:
+            raise ValueError("Vocabulary must contain at least one word")
+
+        width = max(len(w) for w in encoded) + 1
+        self.words = list(words)
+        self.size = len(encoded)
+        self.table = np.zeros((self.size, width), dtype=np.uint8)
+        self.lengths = np.empty(self.size, dtype=np.int64)
+        for i, w in enumerate(encoded):
+            self.table[i, :len(w)] = np.frombuffer(w, dtype=np.uint8)
+            self.table[i, len(w)] = ord(' ')
+            self.lengths[i] = len(w) + 1
+        self.mask = np.arange(width) < self.lengths[:, None]
+
+    def word(self, index):
+        """The word for an index."""
+        return self.words[index]
+
+    def hash_codes(self):
+        """Hadoop Text.hashCode() of every word."""
+        return text_hash_codes(self.table, self.lengths - 1)
+
+    def rows(self, indices):
+        """(n, width) uint8 rows of the given words and their byte lengths (separator excluded)."""
+        flat = np.ravel(indices)
+        return self.table[flat], self.lengths[flat] - 1
+
+    def render(self, indices, words_per_line=WORDS_PER_LINE):
+        """
+        Render word indices into text bytes, words_per_line words per line.
+
+        Args:
+            indices: (lines, words_per_line) array, or a flat array whose
+                trailing partial line is terminated like any other line
+
+        Returns:
+            (buffer, line_ends): uint8 array with the rendered lines, and the
+            cumulative byte offset of the end of every line.
+        """
+        flat = np.ravel(indices)
+        buffer = self.table[flat][self.mask[flat]]
+        word_ends = np.cumsum(self.lengths[flat])
+        line_ends = word_ends[words_per_line - 1::words_per_line]
+        if flat.size % words_per_line:
+            line_ends = np.append(line_ends, word_ends[-1])
+        # The separator after the last word of each line becomes a newline
+        buffer[line_ends - 1] = ord('\n')
+        return buffer, line_ends
+
+
+class NumberedVocabulary:
+    """
+    Synthesised vocabulary prefix + zero-padded id (word00000, word00001, ...).
+
+    Keys are rendered arithmetically from their ids, so key spaces of millions
+    of words never exist as Python strings. With the default prefix and width
+    it renders exactly the task4 "word%05d" keys.
+    """
+
+    def __init__(self, size, prefix='word', width=None):
+        self.size = int(size)
+        self.prefix = prefix
+        self.width = width or max(5, len(str(self.size - 1)))
+        self.token_length = len(prefix) + self.width + 1
+        self.prefix_bytes = np.frombuffer(prefix.encode('ascii'), dtype=np.uint8)
+        self.powers = 10 ** np.arange(self.width - 1, -1, -1, dtype=np.int64)
+
+    def word(self, index):
+        """The word for an index."""
+        return f"{self.prefix}{int(index):0{self.width}d}"
+
+    def tokens(self, indices):
+        """(n, token_length) uint8 rows: each word followed by a space."""
+        flat = np.ravel(indices)
+        p = len(self.prefix_bytes)
+        tokens = np.empty((flat.size, self.token_length), dtype=np.uint8)
+        tokens[:, :p] = self.prefix_bytes
+        tokens[:, p:-1] = (flat[:, None] // self.powers) % 10 + ord('0')
+        tokens[:, -1] = ord(' ')
+        return tokens
+
+    def rows(self, indices):
+        """(n, width) uint8 rows of the given words and their byte lengths; same as Vocabulary.rows."""
+        flat = np.ravel(indices)
+        return self.tokens(flat), np.full(flat.size, self.token_length - 1, dtype=np.int64)
+
+    def hash_codes(self, indices=None):
+        """Hadoop Text.hashCode() of the given word indices (default: every word)."""
+        if indices is None:
+            indices = np.arange(self.size, dtype=np.int64)
+        lengths = np.full(np.size(indices), self.token_length - 1, dtype=np.int64)
+        return text_hash_codes(self.tokens(indices), lengths)
+
+    def render(self, indices, words_per_line=WORDS_PER_LINE):
+        """Render word indices into text bytes; same contract as Vocabulary.render."""
+        flat = np.ravel(indices)
+        tokens = self.tokens(flat)
+
+        line_ends = np.arange(words_per_line, flat.size + 1, words_per_line) * self.token_length
+        if flat.size % words_per_line:
+            line_ends = np.append(line_ends, flat.size * self.token_length)
+        buffer = tokens.reshape(-1)
+        buffer[line_ends - 1] = ord('\n')
+        return buffer, line_ends
+
+
+class TopKVocabulary:
+    """
+    A few named hot words followed by a NumberedVocabulary background.
+
+    Index i < k is hot word i, index k + j is background word j, matching
+    TopKProfile.sample. Only the hot words are Python strings, so top-k
+    profiles over millions of background keys render in bounded memory.
+    """
+
+    def __init__(self, hot_words, background):
+        self.head = Vocabulary(hot_words)
+        self.background = background
+        self.hot = self.head.size
+        self.size = self.hot + background.size
+        self.width = max(self.head.table.shape[1], background.token_length)
+        self.table = None
+        if self.size <= TOPK_TABLE_LIMIT:
+            self.table, lengths = self.rows(np.arange(self.size))
+            self.lengths = lengths + 1
+            self.mask = np.arange(self.width) < self.lengths[:, None]
+
+    def word(self, index):
+        """The word for an index."""
+        if index < self.hot:
+            return self.head.word(index)
+        return self.background.word(index - self.hot)
+
+    def rows(self, indices):
+        """(n, width) uint8 rows of the given words and their byte lengths; same as Vocabulary.rows."""
+        flat = np.ravel(indices)
+        if self.table is not None:
+            return self.table[flat], self.lengths[flat] - 1
+        rows = np.zeros((flat.size, self.width), dtype=np.uint8)
+        lengths = np.full(flat.size, self.background.token_length - 1, dtype=np.int64)
+        hot = flat < self.hot
+        head, head_lengths = self.head.rows(flat[hot])
+        rows[hot, :head.shape[1]] = head
+        lengths[hot] = head_lengths
+        rows[~hot, :self.background.token_length] = self.background.tokens(flat[~hot] - self.hot)
+        return rows, lengths
+
+    def hash_codes(self, indices=None):
+        """Hadoop Text.hashCode() of the given word indices (default: every word)."""
+        if indices is None:
+            indices = np.arange(self.size, dtype=np.int64)
+        return text_hash_codes(*self.rows(indices))
+
+    def render(self, indices, words_per_line=WORDS_PER_LINE):
+        """Render word indices into text bytes; same contract as Vocabulary.render."""
+        flat = np.ravel(indices)
+        if self.table is not None:
+            lengths = self.lengths[flat]
+            buffer = self.table[flat][self.mask[flat]]
+        else:
+            rows, lengths = self.rows(flat)
+            lengths += 1
+            # Both row kinds carry their separator right after the word
+            buffer = rows[np.arange(self.width) < lengths[:, None]]
+        word_ends = np.cumsum(lengths)
+        line_ends = word_ends[words_per_line - 1::words_per_line]
+        if flat.size % words_per_line:
+            line_ends = np.append(line_ends, word_ends[-1])
+        buffer[line_ends - 1] = ord('\n')
+        return buffer, line_ends
+
+
+def text_hash_codes(rows, lengths):
+    """
+    Vectorised Hadoop Text.hashCode() (WritableComparator.hashBytes).
+
+    Java computes h = 31 * h + b over the signed UTF-8 bytes starting from
+    h = 1 with 32-bit overflow; uint32 arithmetic wraps identically.
+
+    Args:
+        rows: (n, width) uint8 array holding each word's bytes left-aligned
+        lengths: Byte length of each word (bytes beyond it are ignored)
+
+    Returns:
+        int32 array of hash codes, equal to Text.hashCode() in Java.
+    """
+    # Sign-extend like Java's (int) cast of a byte before reinterpreting
+    values = rows.view(np.int8).astype(np.int32).view(np.uint32)
+    codes = np.ones(len(rows), dtype=np.uint32)
+    for j in range(rows.shape[1]):
+        codes = np.where(j < lengths, codes * np.uint32(31) + values[:, j], codes)
+    return codes.view(np.int32)
+
+
+def hash_partitions(codes, num_reducers):
+    """Reducer chosen by HashPartitioner: (hashCode & Integer.MAX_VALUE) % numReduceTasks."""
+    return (codes.astype(np.int64) & 0x7FFFFFFF) % num_reducers
+
+
+def partition_keys(targets, num_reducers, prefix='hotkey'):
+    """
+    Find key names that HashPartitioner sends to the given reducers.
+
+    Candidates prefix0, prefix1, ... are hashed in batches and assigned in
+    order, so the same targets always yield the same keys.
+
+    Args:
+        targets: Reducer index for every key wanted (repeat an index to make
+            several keys collide on one reducer)
+        num_reducers: Number of reduce tasks of the job
+        prefix: Name prefix of the generated keys
+
+    Returns:
+        List of key names, one per target.
+    """
+    if any(not 0 <= t < num_reducers for t in targets):
+        raise ValueError(f"Target reducers must lie in [0, {num_reducers})")
+    wanted = {}
+    for i, target in enumerate(targets):
+        wanted.setdefault(target, []).append(i)
+    keys = [None] * len(targets)
+    start = 0
+    while wanted:
+        names = [f"{prefix}{i}" for i in range(start, start + PARTITION_SEARCH_BATCH)]
+        partitions = hash_partitions(Vocabulary(names).hash_codes(), num_reducers)
+        for name, partition in zip(names, partitions.tolist()):
+            slots = wanted.get(partition)
+            if slots:
+                keys[slots.pop(0)] = name
+                if not slots:
+                    del wanted[partition]
+        start += PARTITION_SEARCH_BATCH
+    return keys
+
+
+class UniformProfile:
+    """Every word of a fixed vocabulary is equally likely (the original generators)."""
+
+    def __init__(self, words=None, keys=DEFAULT_KEYS):
+        self.words = list(words) if words is not None else None
+        self.keys = len(self.words) if self.words is not None else int(keys)
+        self._vocab = None
+
+    @property
+    def label(self):
+        return 'uniform' if self.keys == DEFAULT_KEYS else f"uniform_k{self.keys}"
+
+    def vocabulary(self):
+        if self._vocab is None:
+            self._vocab = Vocabulary(self.words) if self.words is not None else NumberedVocabulary(self.keys)
+        return self._vocab
+
+    def sample(self, rng, n):
+        return rng.integers(0, self.keys, size=n, dtype=np.int64)
+
+    def vocabulary_size(self):
+        return self.keys
+
+    def describe(self):
+        return {'profile': 'uniform', 'keys': self.keys}
+
+    def expected_distinct(self, words):
+        """Expected number of distinct keys among `words` uniform draws."""
+        if self.keys == 1:
+            return min(words, 1)
+        return float(-self.keys * np.expm1(words * np.log1p(-1 / self.keys)))
+
+    def __getstate__(self):
+        # Vocabularies are rebuilt inside each worker instead of being pickled
+        return {**self.__dict__, '_vocab': None}
+
+
+class ZipfProfile(UniformProfile):
+    """
+    Finite Zipf law: key of rank r (1-based) has probability proportional to r^-alpha.
+
+    word00000 is the hottest key. Key spaces up to ZIPF_CDF_LIMIT are sampled
+    by inverse CDF for any alpha > 0; larger ones by rejection from
+    numpy's unbounded Zipf sampler, which requires alpha > 1.
+    """
+
+    def __init__(self, alpha=1.0, keys=DEFAULT_KEYS):
+        super().__init__(keys=keys)
+        self.alpha = float(alpha)
+        if self.alpha <= 0:
+            raise ValueError("Zipf alpha must be positive")
+        if self.keys > ZIPF_CDF_LIMIT and self.alpha <= 1:
+            raise ValueError(f"Zipf over more than {ZIPF_CDF_LIMIT:,} keys requires alpha > 1")
+        self._cdf = None
+
+    @property
+    def label(self):
+        return f"zipf_a{self.alpha:g}_k{self.keys}"
+
+    def probabilities(self, top):
+        """Probabilities of the `top` hottest keys."""
+        ranks = np.arange(1, min(top, self.keys) + 1, dtype=np.float64)
+        if self.keys <= ZIPF_CDF_LIMIT:
+            norm = np.sum(np.arange(1, self.keys + 1, dtype=np.float64) ** -self.alpha)
+        else:
+            # Tail of the generalised harmonic number by its integral approximation
+            head = np.arange(1, 1000001, dtype=np.float64)
+            norm = np.sum(head ** -self.alpha) + (
+                (self.keys ** (1 - self.alpha) - 1000000.5 ** (1 - self.alpha)) / (1 - self.alpha))
+        return ranks ** -self.alpha / norm
+
+    def sample(self, rng, n):
+        if self.keys <= ZIPF_CDF_LIMIT:
+            if self._cdf is None:
+                weights = np.arange(1, self.keys + 1, dtype=np.float64) ** -self.alpha
+                self._cdf = np.cumsum(weights)
+                self._cdf /= self._cdf[-1]
+            indices = np.searchsorted(self._cdf, rng.random(n), side='right')
+            return np.minimum(indices, self.keys - 1)
+
+        indices = rng.zipf(self.alpha, size=n) - 1
+        rejected = np.flatnonzero(indices >= self.keys)
+        while rejected.size:
+            redraw = rng.zipf(self.alpha, size=rejected.size) - 1
+            indices[rejected] = redraw
+            rejected = rejected[redraw >= self.keys]
+        return indices
+
+    def describe(self):
+        return {
+            'profile': 'zipf',
+            'alpha': self.alpha,
+            'keys': self.keys,
+            'top1_share': round(float(self.probabilities(1)[0]), 6),
+            'top10_share': round(float(self.probabilities(10).sum()), 6),
+        }
+
+    def __getstate__(self):
+        return {**super().__getstate__(), '_cdf': None}
+
+
+class TopKProfile(UniformProfile):
+    """
+    k hot keys with fixed probabilities over a uniform background.
+
+    A single weight reproduces the classic task4 "hotkey" layout (as a
+    probability rather than an exact count); several weights model a few
+    hot tenants, e.g. weights=(0.3, 0.2, 0.1).
+    """
+
+    def __init__(self, weights, keys=DEFAULT_KEYS):
+        super().__init__(keys=keys)
+        self.weights = [float(w) for w in weights]
+        if not self.weights or any(w <= 0 for w in self.weights) or sum(self.weights) >= 1:
+            raise ValueError("Top-k weights must be positive and sum to less than 1")
+        self.cumulative = np.cumsum(self.weights)
+
+    @property
+    def hot_words(self):
+        if len(self.weights) == 1:
+            return ['hotkey']
+        return [f"hotkey{i}" for i in range(len(self.weights))]
+
+    @property
+    def label(self):
+        shares = '-'.join(f"{w * 100:g}" for w in self.weights)
+        return f"top{len(self.weights)}_{shares}" + ('' if self.keys == DEFAULT_KEYS else f"_k{self.keys}")
+
+    def vocabulary(self):
+        if self._vocab is None:
+            self._vocab = TopKVocabulary(self.hot_words, NumberedVocabulary(self.keys))
+        return self._vocab
+
+    def vocabulary_size(self):
+        return len(self.weights) + self.keys
+
+    def sample(self, rng, n):
+        k = len(self.weights)
+        slot = np.searchsorted(self.cumulative, rng.random(n), side='right')
+        background = rng.integers(k, k + self.keys, size=n, dtype=np.int64)
+        return np.where(slot < k, slot, background)
+
+    def describe(self):
+        return {
+            'profile': 'topk',
+            'hot_words': self.hot_words,
+            'weights': self.weights,
+            'keys': self.keys,
+        }
+
+
+class PartitionProfile(TopKProfile):
+    """
+    Top-k hot keys chosen so HashPartitioner sends them to specific reducers.
+
+    With every target equal, all hot keys collide on one reducer; with
+    distinct targets each hot key overloads its own reducer. describe()
+    reports the expected share of map output every reducer receives.
+    """
+
+    def __init__(self, weights, targets, num_reducers=DEFAULT_REDUCERS, keys=DEFAULT_KEYS):
+        super().__init__(weights, keys=keys)
+        if len(targets) != len(self.weights):
+            raise ValueError("One target reducer is needed per hot key weight")
+        self.num_reducers = int(num_reducers)
+        self.targets = [int(t) for t in targets]
+        # "hotkeyN" names never clash with the numbered "word" background
+        self._hot_words = partition_keys(self.targets, self.num_reducers)
+
+    @classmethod
+    def spread(cls, weights, num_reducers=DEFAULT_REDUCERS, keys=DEFAULT_KEYS):
+        """Place the hot keys on reducers as far apart as possible."""
+        k = len(weights)
+        targets = [i * num_reducers // k if k <= num_reducers else i % num_reducers
+                   for i in range(k)]
+        return cls(weights, targets, num_reducers=num_reducers, keys=keys)
+
+    @property
+    def hot_words(self):
+        return self._hot_words
+
+    @property
+    def label(self):
+        on = '-'.join(str(t) for t in self.targets)
+        return f"part_r{self.num_reducers}_on{on}_" + super().label
+
+    def reducer_shares(self):
+        """Expected fraction of all emitted words that reaches each reducer."""
+        background = hash_partitions(NumberedVocabulary(self.keys).hash_codes(), self.num_reducers)
+        shares = np.bincount(background, minlength=self.num_reducers) / self.keys
+        shares *= 1.0 - sum(self.weights)
+        for target, weight in zip(self.targets, self.weights):
+            shares[target] += weight
+        return shares
+
+    def describe(self):
+        return {
+            **super().describe(),
+            'profile': 'partition',
+            'num_reducers': self.num_reducers,
+            'target_reducers': self.targets,
+            'reducer_shares': [round(float(x), 6) for x in self.reducer_shares()],
+        }
+
+
+# Named presets accepted by parse_profile
+PROFILE_PRESETS = {
+    # Power-law tail over millions of distinct keys; alpha < 1 puts most of
+    # the mass in the tail rather than in the head
+    'heavytail': ('zipf', {'alpha': '0.9', 'keys': '5000000'}),
+}
+
+
+def parse_count(text):
+    """Positive integer from a command-line count; accepts 1e9-style notation."""
+    try:
+        count = float(text)
+    except ValueError:
+        raise ValueError(f"Invalid count '{text}'") from None
+    if count < 1 or count != int(count):
+        raise ValueError(f"Count must be a positive integer, got '{text}'")
+    return int(count)
+
+
+def parse_profile(spec):
+    """
+    Build a skew profile from a command-line spec.
+
+    Examples:
+        uniform                      10,000 equally likely keys
+        uniform:keys=1000000
+        zipf:alpha=1.2               Zipf over 10,000 keys
+        zipf:alpha=1.1,keys=50000000
+        topk:weights=0.3/0.2/0.1     three hot keys over a uniform background
+        partition:weights=0.2/0.2,on=3
+                                     two hot keys that both hash to reducer 3
+                                     of DEFAULT_REDUCERS (reducers=N to change)
+        partition:weights=0.1/0.1/0.1,on=spread,reducers=8
+                                     three hot keys on three different reducers
+        heavytail                    zipf:alpha=0.9,keys=5000000
+        heavytail:alpha=1.05         preset with overrides
+    """
+    name, _, arg_text = spec.partition(':')
+    params = {}
+    if name in PROFILE_PRESETS:
+        name, preset = PROFILE_PRESETS[name]
+        params.update(preset)
+    for item in filter(None, arg_text.split(',')):
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Malformed profile parameter '{item}' in '{spec}'")
+        params[key.strip()] = value.strip()
+
+    try:
+        keys = parse_count(params.pop('keys', DEFAULT_KEYS))
+        if name == 'uniform':
+            profile = UniformProfile(keys=keys)
+        elif name == 'zipf':
+            profile = ZipfProfile(alpha=float(params.pop('alpha', 1.0)), keys=keys)
+        elif name == 'topk':
+            weights = [float(w) for w in params.pop('weights').split('/')]
+            profile = TopKProfile(weights, keys=keys)
+        elif name == 'partition':
+            weights = [float(w) for w in params.pop('weights').split('/')]
+            num_reducers = int(params.pop('reducers', DEFAULT_REDUCERS))
+            on = params.pop('on', '0')
+            if on == 'spread':
+                profile = PartitionProfile.spread(weights, num_reducers=num_reducers, keys=keys)
+            else:
+                targets = [int(t) for t in on.split('/')]
+                if len(targets) == 1:
+                    targets *= len(weights)
+                profile = PartitionProfile(weights, targets, num_reducers=num_reducers, keys=keys)
+        else:
+            raise ValueError(f"Unknown skew profile '{name}'")
+    except KeyError as e:
+        raise ValueError(f"Profile '{spec}' is missing parameter {e}") from None
+    if params:
+        raise ValueError(f"Unknown parameters for profile '{name}': {', '.join(params)}")
+    return profile
+
+
+class FileSizeDistribution:
+    """
+    Relative file sizes of a small-files dataset (see generate_small_files).
+
+    Sizes are drawn around a mean of 1 and scaled so the files add up to the
+    dataset's target size; only the shape is configurable.
+    """
+
+    def __init__(self, shape='fixed', spread=0.0, sigma=1.0):
+        if shape not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown file size distribution '{shape}'")
+        if not 0.0 <= spread < 1.0:
+            raise ValueError("spread must be in [0, 1)")
+        if sigma <= 0:
+            raise ValueError("sigma must be positive")
+        self.shape = shape
+        self.spread = spread
+        self.sigma = sigma
+
+    def sample(self, rng, n):
+        """n relative sizes (float64)."""
+        if self.shape == 'uniform':
+            return rng.uniform(1.0 - self.spread, 1.0 + self.spread, n)
+        if self.shape == 'lognormal':
+            return rng.lognormal(-self.sigma ** 2 / 2, self.sigma, n)
+        return np.ones(n)
+
+    def describe(self):
+        """JSON-serialisable description for manifests."""
+        if self.shape == 'uniform':
+            return {'shape': 'uniform', 'spread': self.spread}
+        if self.shape == 'lognormal':
+            return {'shape': 'lognormal', 'sigma': self.sigma}
+        return {'shape': 'fixed'}
+
+
+def parse_file_sizes(spec):
+    """
+    Build a file size distribution from a command-line spec.
+
+    Examples:
+        fixed                    every file the same size
+        uniform:spread=0.8       uniform between 0.2x and 1.8x the mean size
+        lognormal:sigma=1.0      heavy-tailed, like real small-file corpora
+    """
+    name, _, arg_text = spec.partition(':')
+    params = {}
+    for item in filter(None, arg_text.split(',')):
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Malformed file size parameter '{item}' in '{spec}'")
+        params[key.strip()] = float(value)
+    unknown = set(params) - {'fixed': set(), 'uniform': {'spread'}, 'lognormal': {'sigma'}}.get(name, set())
+    if unknown:
+        raise ValueError(f"Unknown parameters for file sizes '{name}': {', '.join(sorted(unknown))}")
+    return FileSizeDistribution(name, spread=params.get('spread', 0.5), sigma=params.get('sigma', 1.0))
+
+
+class HdfsSink:
+    """
+    Binary file-like object that streams into `hdfs dfs -put -f - <path>`.
+
+    Bytes go straight from the generator into the HDFS client's stdin, so a
+    dataset is written once to HDFS instead of to local disk and again by
+    a later `hdfs dfs -put`. Like -put, the file only appears under its
+    final name once the stream is closed successfully.
+    """
+
+    def __init__(self, hdfs_path, command=HDFS_COMMAND):
+        self.path = hdfs_path
+        self.process = subprocess.Popen(
+            [command, 'dfs', '-put', '-f', '-', hdfs_path],
+            stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+    def write(self, data):
+        return self.process.stdin.write(data)
+
+    def close(self):
+        self.process.stdin.close()
+        stderr = self.process.stderr.read()
+        if self.process.wait() != 0:
+            raise OSError(f"hdfs dfs -put to {self.path} failed: "
+                          f"{stderr.decode('utf-8', 'replace').strip()}")
+
+    def abort(self):
+        self.process.kill()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class LocalHdfsSink:
+    """
+    Local stand-in for HdfsSink (see HDFS_STANDIN_ENV).
+
+    Mirrors the -put semantics: data is written to <path>._COPYING_ and only
+    renamed to its final name when the stream completes.
+    """
+
+    def __init__(self, local_path, size_hint=None):
+        self.path = local_path
+        self.temp_path = local_path + '._COPYING_'
+        self.file = BlockWriter(self.temp_path, size_hint)
+
+    def write(self, data):
+        return self.file.write(data)
+
+    def close(self):
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class BlockWriter:
+    """
+    Binary writer for generated files: preallocated and written in large slices.
+
+    Writes smaller than WRITE_BUFFER are copied into one reusable bytearray
+    and flushed as a single write(); larger ones go straight from the
+    caller's buffer (e.g. a rendered NumPy block) to the unbuffered file.
+    With a size hint the file is reserved up front with posix_fallocate, so
+    the filesystem allocates it in large extents instead of growing it
+    write by write; an unused tail is truncated on close.
+    """
+
+    def __init__(self, path, size_hint=None, buffer_size=WRITE_BUFFER):
+        self.path = path
+        self.file = open(path, 'wb', buffering=0)
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.fill = 0
+        self.position = 0
+        self.preallocated = 0
+        if size_hint and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(self.file.fileno(), 0, int(size_hint))
+                self.preallocated = int(size_hint)
+            except OSError:
+                # Not every filesystem supports it; the file then grows as written
+                pass
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        if self.fill + len(data) > len(self.buffer):
+            self.flush()
+        if len(data) >= len(self.buffer):
+            self._write_all(data)
+        else:
+            self.view[self.fill:self.fill + len(data)] = data
+            self.fill += len(data)
+        self.position += len(data)
+        return len(data)
+
+    def _write_all(self, data):
+        # Unbuffered FileIO.write may write only part of a large slice
+        while data:
+            data = data[self.file.write(data):]
+
+    def flush(self):
+        if self.fill:
+            self._write_all(self.view[:self.fill])
+            self.fill = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        if self.preallocated > self.position:
+            self.file.truncate(self.position)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class Progress:
+    """
+    Progress lines of a generator, checked once per written block.
+
+    A line is printed whenever the bytes written cross another PROGRESS_STEP;
+    a prefix of None keeps it quiet (process-pool workers).
+    """
+
+    def __init__(self, total, prefix=''):
+        self.total = total
+        self.prefix = prefix
+        self.bytes_written = 0
+
+    def update(self, bytes_written, done=None):
+        """Record the bytes written so far; done (in units of total) defaults to bytes_written."""
+        previous, self.bytes_written = self.bytes_written, bytes_written
+        if self.prefix is None or bytes_written // PROGRESS_STEP == previous // PROGRESS_STEP:
+            return
+        done = bytes_written if done is None else done
+        print(f"{self.prefix}Progress: {min(done / self.total * 100, 100.0):.1f}% "
+              f"({bytes_written / GB:.2f}GB)")
+
+
+def codec_for_path(path):
+    """Compression codec implied by a file name's extension, or None for plain text."""
+    for name, (ext, _) in CODECS.items():
+        if str(path).endswith(ext):
+            return name
+    return None
+
+
+def compressed_name(name, compression):
+    """File name with the extension of a compression codec appended (None: unchanged)."""
+    return name + CODECS[compression][0] if compression else name
+
+
+def _chunk_compressor(codec):
+    """Function compressing one chunk into a self-contained member/stream/frame."""
+    if codec == 'gzip':
+        # mtime=0 keeps the output reproducible for a given seed
+        return lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == 'bzip2':
+        return lambda data: bz2.compress(data, 9)
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd output requires the 'zstandard' package "
+                               "(pip install zstandard)") from None
+        # ZstdCompressor objects must not be shared between threads
+        local = threading.local()
+
+        def compress(data):
+            if not hasattr(local, 'compressor'):
+                local.compressor = zstandard.ZstdCompressor(level=3)
+            return local.compressor.compress(data)
+        return compress
+    raise ValueError(f"Unknown compression codec '{codec}'")
+
+
+class CompressedWriter:
+    """
+    Binary file-like object compressing into an underlying sink chunk by chunk.
+
+    Chunks of COMPRESS_CHUNK bytes are compressed on a thread pool (zlib, bz2
+    and zstd release the GIL) and written back in order, with a bounded number
+    in flight so memory use stays constant.
+    """
+
+    def __init__(self, sink, compress, chunk_size=COMPRESS_CHUNK, threads=COMPRESS_THREADS):
+        self.sink = sink
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+        self.pending = collections.deque()
+        self.max_pending = 2 * threads
+        self.compressed_bytes = 0
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.chunk_size:
+            self._submit(bytes(self.buffer[:self.chunk_size]))
+            del self.buffer[:self.chunk_size]
+        return len(data)
+
+    def _submit(self, chunk):
+        self.pending.append(self.pool.submit(self.compress, chunk))
+        while len(self.pending) > self.max_pending:
+            self._drain_one()
+
+    def _drain_one(self):
+        data = self.pending.popleft().result()
+        self.sink.write(data)
+        self.compressed_bytes += len(data)
+
+    def close(self):
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer = bytearray()
+        while self.pending:
+            self._drain_one()
+        self.pool.shutdown()
+        self.sink.close()
+
+    def abort(self):
+        self.pool.shutdown(cancel_futures=True)
+        if hasattr(self.sink, 'abort'):
+            self.sink.abort()
+        else:
+            self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def is_hdfs_path(path):
+    """True for hdfs:// output paths."""
+    return str(path).startswith(HDFS_SCHEME)
+
+
+def hdfs_uri(hdfs_path):
+    """hdfs:// URI for an absolute HDFS path (/user/root/...)."""
+    return HDFS_SCHEME + hdfs_path if hdfs_path.startswith('/') else hdfs_path
+
+
+def hdfs_path_of(uri):
+    """Absolute HDFS path of an hdfs:///... URI (other URIs are returned unchanged)."""
+    return uri[len(HDFS_SCHEME):] if uri.startswith(HDFS_SCHEME + '/') else uri
+
+
+def _standin_path(uri):
+    """Local path of an HDFS URI under the stand-in root, or None without one."""
+    root = os.environ.get(HDFS_STANDIN_ENV)
+    if not root:
+        return None
+    return os.path.join(root, hdfs_path_of(uri).lstrip('/'))
+
+
+def open_output(path, size_hint=None):
+    """
+    Open a dataset output for binary writing.
+
+    Local paths are written through a BlockWriter, preallocated to size_hint
+    bytes when the final size is known; hdfs:// paths are streamed through
+    `hdfs dfs -put`, or written below $DATAGEN_HDFS_ROOT when that is set.
+    Names ending in a codec extension (.gz, .bz2, .zst) are compressed (the
+    hint then does not apply).
+    """
+    codec = codec_for_path(path)
+    # Resolve the codec first so a missing optional package leaves no empty file
+    compress = _chunk_compressor(codec) if codec else None
+    if compress:
+        size_hint = None
+    if not is_hdfs_path(path):
+        sink = BlockWriter(path, size_hint)
+    else:
+        standin = _standin_path(path)
+        sink = (LocalHdfsSink(standin, size_hint) if standin is not None
+                else HdfsSink(hdfs_path_of(path)))
+    return CompressedWriter(sink, compress) if compress else sink
+
+
+def make_output_dir(path):
+    """Create an output directory, locally or in HDFS."""
+    if not path:
+        return
+    if not is_hdfs_path(path):
+        os.makedirs(path, exist_ok=True)
+        return
+    standin = _standin_path(path)
+    if standin is not None:
+        os.makedirs(standin, exist_ok=True)
+        return
+    subprocess.run([HDFS_COMMAND, 'dfs', '-mkdir', '-p', hdfs_path_of(path)], check=True)
+
+
+def join_output(directory, name):
+    """Join an output directory and a file name (HDFS URIs always use '/')."""
+    if is_hdfs_path(directory):
+        return posixpath.join(directory, name)
+    return os.path.join(directory, name)
+
+
+def vint_rows(values):
+    """
+    Vectorised Hadoop WritableUtils.writeVInt() of non-negative ints.
+
+    Values up to 127 take one byte; larger ones a length byte (-112 - n)
+    followed by the value's n big-endian bytes.
+
+    Returns:
+        ((n, 5) uint8 rows, byte size of each encoding)
+    """
+    values = np.asarray(values, dtype=np.int64)
+    big = values > 127
+    nbytes = sum(((values >> (8 * k)) > 0).astype(np.int64) for k in range(4))
+    rows = np.zeros((len(values), 5), dtype=np.uint8)
+    rows[:, 0] = np.where(big, -112 - nbytes, values) & 0xFF
+    for j in range(4):
+        shift = np.maximum(8 * (nbytes - 1 - j), 0)
+        rows[:, 1 + j] = np.where(big & (j < nbytes), (values >> shift) & 0xFF, 0)
+    return rows, np.where(big, 1 + nbytes, 1)
+
+
+def int32_rows(values):
+    """(n, 4) big-endian rows of ints, as DataOutput.writeInt() writes them."""
+    return np.asarray(values, dtype='>i4').reshape(-1, 1).view(np.uint8)
+
+
+def pack_fields(fields):
+    """
+    Concatenate variable-length fields record by record into one buffer.
+
+    Args:
+        fields: (rows, sizes) per field, in record order: rows is (n, width)
+            uint8 (possibly broadcast) and only its first sizes[i] bytes are
+            used for record i
+
+    Returns:
+        uint8 array holding the n records back to back
+    """
+    record_sizes = sum(np.asarray(sizes, dtype=np.int64) for _, sizes in fields)
+    ends = np.cumsum(record_sizes)
+    buffer = np.empty(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    positions = ends - record_sizes
+    for rows, sizes in fields:
+        columns = np.arange(rows.shape[1])
+        mask = columns < np.asarray(sizes)[:, None]
+        buffer[(positions[:, None] + columns)[mask]] = rows[mask]
+        positions = positions + sizes
+    return buffer
+
+
+def writable_string(text):
+    """Text.writeString(): VInt byte length followed by the UTF-8 bytes."""
+    data = text.encode('utf-8')
+    rows, sizes = vint_rows([len(data)])
+    return rows[0, :sizes[0]].tobytes() + data
+
+
+class SequenceFileEncoder:
+    """
+    Encodes word indices as an uncompressed Hadoop SequenceFile for WordCount.
+
+    Every word becomes one (key, IntWritable 1) record, so a map reads the
+    tokenized pairs instead of parsing text: with keys='text' the key is the
+    word as a Text, with keys='ids' its vocabulary index as a VIntWritable.
+    Like Vocabulary.render, a block is one gather from a table holding each
+    word's complete record (vocabularies up to SEQ_TABLE_LIMIT words), plus
+    the sync markers SequenceFileInputFormat splits on.
+    """
+
+    def __init__(self, vocab, keys='text'):
+        if keys not in SEQ_KEY_CLASSES:
+            raise ValueError(f"Unknown SequenceFile keys '{keys}' "
+                             f"(expected one of {', '.join(SEQ_KEY_CLASSES)})")
+        self.vocab = vocab
+        self.keys = keys
+        # Record bytes written, and the start of the last record, for sync placement
+        self.offset = 0
+        self.last_start = 0
+        self.table = None
+        if vocab.size <= SEQ_TABLE_LIMIT:
+            records, self.sizes = self.records(np.arange(vocab.size))
+            self.mask = np.arange(self.sizes.max()) < self.sizes[:, None]
+            self.table = np.zeros(self.mask.shape, dtype=np.uint8)
+            # Row-major boolean assignment lays the records out row by row
+            self.table[self.mask] = records
+
+    def header(self):
+        """File header: magic, key/value classes, no compression, empty metadata, sync marker."""
+        return (SEQ_MAGIC + writable_string(SEQ_KEY_CLASSES[self.keys])
+                + writable_string(SEQ_VALUE_CLASS) + b'\x00\x00' + b'\x00\x00\x00\x00' + SEQ_SYNC)
+
+    def records(self, flat):
+        """(buffer, record sizes) of the (key, 1) records of word indices, back to back."""
+        if self.keys == 'text':
+            words, lengths = self.vocab.rows(flat)
+            prefix, prefix_sizes = vint_rows(lengths)
+            key_fields = [(prefix, prefix_sizes), (words, lengths)]
+            key_sizes = prefix_sizes + lengths
+        else:
+            ids, key_sizes = vint_rows(flat)
+            key_fields = [(ids, key_sizes)]
+        n = len(flat)
+        one = np.frombuffer(b'\x00\x00\x00\x01', dtype=np.uint8)
+        buffer = pack_fields([
+            (int32_rows(key_sizes + 4), np.full(n, 4)),  # record length: key + value
+            (int32_rows(key_sizes), np.full(n, 4)),
+            *key_fields,
+            (np.broadcast_to(one, (n, 4)), np.full(n, 4)),
+        ])
+        return buffer, 8 + key_sizes + 4
+
+    def encode(self, indices):
+        """Records of the given word indices, with a sync marker every SEQ_SYNC_INTERVAL bytes."""
+        flat = np.ravel(indices)
+        if self.table is not None:
+            buffer, record_sizes = self.table[flat][self.mask[flat]], self.sizes[flat]
+        else:
+            buffer, record_sizes = self.records(flat)
+
+        # A marker goes before the first record starting past each interval boundary
+        ends = np.cumsum(record_sizes)
+        starts = self.offset + ends - record_sizes
+        previous = np.concatenate(([self.last_start], starts[:-1]))
+        synced = np.flatnonzero(starts // SEQ_SYNC_INTERVAL > previous // SEQ_SYNC_INTERVAL)
+        self.offset = int(starts[-1] + record_sizes[-1])
+        self.last_start = int(starts[-1])
+        if len(synced):
+            escape = np.frombuffer(b'\xff\xff\xff\xff' + SEQ_SYNC, dtype=np.uint8)
+            buffer = np.insert(buffer, np.repeat((ends - record_sizes)[synced], len(escape)),
+                               np.tile(escape, len(synced)))
+        return buffer
+
+
+def write_blocks(f, target_size, profile, rng, block_lines=BLOCK_LINES,
+                 progress_prefix='', overshoot=True, counts=None, sequence=None):
+    """
+    Write rendered blocks to an open binary file until target_size is reached.
+
+    Args:
+        f: File object opened in binary mode
+        target_size: Target size in bytes (whole lines; the last may overshoot)
+        profile: Key distribution (UniformProfile, ZipfProfile, TopKProfile)
+        rng: numpy.random.Generator
+        block_lines: Lines rendered per block
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        overshoot: If True the last line may cross target_size (original
+            behaviour); if False the output stops at the last whole line that
+            fits, so the file never spills into another HDFS block
+        counts: Optional int64 array (see new_counts) that every written
+            word index is added to
+        sequence: Write the words as SequenceFile records with these keys
+            ('text' or 'ids', see SequenceFileEncoder) instead of as text;
+            the words are exactly those the text file would hold, so
+            target_size still counts the text they would take
+
+    Returns:
+        (bytes_written, words_written): the uncompressed bytes written to
+        f (for a SequenceFile its own size, a few times the text's)
+    """
+    vocab = profile.vocabulary()
+    progress = Progress(target_size, progress_prefix)
+    encoder = SequenceFileEncoder(vocab, sequence) if sequence else None
+    bytes_written = 0
+    text_bytes = 0
+    words_written = 0
+    if encoder:
+        header = encoder.header()
+        f.write(header)
+        bytes_written += len(header)
+
+    while text_bytes < target_size:
+        indices = profile.sample(rng, block_lines * WORDS_PER_LINE).reshape(block_lines, WORDS_PER_LINE)
+        buffer, line_ends = vocab.render(indices)
+
+        remaining = target_size - text_bytes
+        done = line_ends[-1] >= remaining
+        if done:
+            if overshoot:
+                # Keep whole lines up to and including the one that crosses the target
+                kept_lines = int(np.searchsorted(line_ends, remaining)) + 1
+            else:
+                kept_lines = int(np.searchsorted(line_ends, remaining, side='right'))
+            buffer = buffer[:line_ends[kept_lines - 1]] if kept_lines else buffer[:0]
+            indices = indices[:kept_lines]
+        words_written += indices.size
+        if counts is not None:
+            add_counts(counts, indices)
+
+        if encoder is not None:
+            records = encoder.encode(indices)
+            f.write(records.data)
+            bytes_written += len(records)
+        else:
+            f.write(buffer.data)
+            bytes_written += len(buffer)
+        text_bytes += len(buffer)
+        progress.update(text_bytes)
+
+        if done:
+            break
+
+    return bytes_written, words_written
+
+
+def generate_text_file(file_path, target_size, words, seed=None, block_lines=BLOCK_LINES,
+                       progress_prefix='', counts_path=None):
+    """
+    Generate a random-text file drawn uniformly from `words`.
+
+    Args:
+        file_path: Path to output file
+        target_size: Target size in bytes
+        words: Vocabulary (list of str)
+        seed: Seed for numpy.random.default_rng (None for fresh entropy)
+        block_lines: Lines rendered per block
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        counts_path: Local path for the ground-truth count manifest (see
+            write_count_manifest), or None to skip counting
+
+    Returns:
+        (bytes_written, words_written)
+    """
+    return generate_profile_file(file_path, target_size, UniformProfile(words), seed=seed,
+                                 block_lines=block_lines, progress_prefix=progress_prefix,
+                                 counts_path=counts_path)
+
+
+def generate_profile_file(file_path, target_size, profile, seed=None, block_lines=BLOCK_LINES,
+                          progress_prefix='', counts_path=None, sequence=None):
+    """
+    Generate a random-text file whose words follow a skew profile.
+
+    Args:
+        file_path: Path to output file
+        target_size: Target size in bytes
+        profile: Key distribution (see parse_profile)
+        seed: Seed for numpy.random.default_rng (None for fresh entropy)
+        block_lines: Lines rendered per block
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        counts_path: Local path for the ground-truth count manifest (see
+            write_count_manifest), or None to skip counting
+        sequence: Write a SequenceFile with these keys instead of text
+            (see write_blocks)
+
+    Returns:
+        (bytes_written, words_written)
+    """
+    rng = np.random.default_rng(seed)
+    counts = new_counts(profile.vocabulary_size()) if counts_path else None
+
+    make_output_dir(posixpath.dirname(file_path))
+
+    with open_output(file_path, size_hint=None if sequence else target_size) as f:
+        result = write_blocks(f, int(target_size), profile, rng, block_lines=block_lines,
+                              progress_prefix=progress_prefix, counts=counts, sequence=sequence)
+    if counts_path:
+        write_count_manifest(counts_path, profile.vocabulary(), counts)
+    return result
+
+
+def shard_rng(seed, shard_index):
+    """
+    Independent random stream for one shard.
+
+    Every shard jumps the same PCG64 stream ahead by shard_index * 2^127 steps,
+    so shard k can be regenerated on its own from (seed, k).
+    """
+    return np.random.Generator(np.random.PCG64(seed).jumped(shard_index))
+
+
+def shard_sizes(target_size, num_shards, align_blocks=False, block_size=HDFS_BLOCK_SIZE):
+    """
+    Split target_size bytes across num_shards part files.
+
+    With align_blocks every part file is sized as a whole number of HDFS blocks
+    (the last one takes the remainder), so no part file ends in a small partial
+    block that would become an extra, tiny map task.
+    """
+    target_size = int(target_size)
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+
+    if not align_blocks:
+        return split_counts(target_size, num_shards)
+
+    num_blocks = -(-target_size // block_size)
+    num_shards = min(num_shards, num_blocks)
+    base, extra = divmod(num_blocks, num_shards)
+    sizes = [(base + (1 if i < extra else 0)) * block_size for i in range(num_shards)]
+    sizes[-1] -= sum(sizes) - target_size
+    return sizes
+
+
+def shard_file_name(shard_index, compression=None):
+    """Part file name for a shard (Hadoop-style part numbering, plus a codec extension)."""
+    return compressed_name(f"part-{shard_index:05d}", compression)
+
+
+def run_shard_pool(worker, shard_args, workers=None, progress_prefix='', unit='Shard'):
+    """
+    Run worker(*args) for every shard in a process pool.
+
+    shard_args[i][0] must be the part file path (the first one for workers
+    that write several, named by unit in progress lines); every worker
+    returns a tuple whose first element is the number of bytes written.
+
+    Returns:
+        List of worker results, in shard order
+    """
+    results = [None] * len(shard_args)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(worker, *args) for args in shard_args]
+        for index, future in enumerate(futures):
+            results[index] = future.result()
+            if progress_prefix is not None:
+                print(f"{progress_prefix}{unit} {index + 1}/{len(shard_args)}: "
+                      f"{os.path.basename(shard_args[index][0])} ({results[index][0] / MB:.1f}MB)")
+    return results
+
+
+def write_shard_manifest(output_dir, manifest):
+    """Write the _SHARDS.json sidecar describing how a shard directory was built."""
+    with open_output(join_output(output_dir, SHARD_MANIFEST)) as f:
+        f.write(json.dumps(manifest, indent=2).encode('utf-8'))
+
+
+def _generate_shard(file_path, target_size, profile, seed, shard_index, overshoot, count=False,
+                    sequence=None):
+    """Process-pool worker: write one part file from its own jumped stream."""
+    rng = shard_rng(seed, shard_index)
+    counts = new_counts(profile.vocabulary_size()) if count else None
+    with open_output(file_path, size_hint=None if sequence else target_size) as f:
+        result = write_blocks(f, target_size, profile, rng, progress_prefix=None,
+                              overshoot=overshoot, counts=counts, sequence=sequence)
+    return result + (counts,)
+
+
+def generate_text_shards(output_dir, target_size, words, num_shards, seed=None, workers=None,
+                         align_blocks=False, block_size=HDFS_BLOCK_SIZE, progress_prefix='',
+                         compression=None, counts_path=None):
+    """
+    Generate a sharded random-text dataset drawn uniformly from `words`.
+
+    See generate_profile_shards for the arguments and the shard layout.
+    """
+    return generate_profile_shards(output_dir, target_size, UniformProfile(words), num_shards,
+                                   seed=seed, workers=workers, align_blocks=align_blocks,
+                                   block_size=block_size, progress_prefix=progress_prefix,
+                                   compression=compression, counts_path=counts_path)
+
+
+def generate_profile_shards(output_dir, target_size, profile, num_shards, seed=None, workers=None,
+                            align_blocks=False, block_size=HDFS_BLOCK_SIZE, progress_prefix='',
+                            compression=None, counts_path=None, sequence=None):
+    """
+    Generate a sharded dataset with a process pool.
+
+    Each shard is written by its own worker to output_dir/part-NNNNN from an
+    independent jump-ahead stream of the same seed. A _SHARDS.json manifest
+    records the seed and shard layout so any single shard can be rebuilt.
+
+    Args:
+        output_dir: Directory for the part files (uploaded as-is to HDFS), or an
+            hdfs:// directory the shards are streamed into in parallel
+        target_size: Total target size in bytes
+        profile: Key distribution (see parse_profile)
+        num_shards: Number of part files
+        seed: Base seed (None draws one from OS entropy and records it)
+        workers: Process pool size (default: os.cpu_count())
+        align_blocks: Size part files as whole HDFS blocks (ignored for
+            compressed output, whose size does not follow the text size)
+        block_size: HDFS block size used for alignment
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        compression: Codec name from CODECS for compressed part files
+        counts_path: Local path for the ground-truth count manifest of the
+            whole dataset (see write_count_manifest), or None to skip counting
+        sequence: Write SequenceFile part files with these keys instead of
+            text (see write_blocks; like compression, this disables alignment)
+
+    Returns:
+        (bytes_written, words_written), counting uncompressed bytes as written
+        (SequenceFile bytes with sequence)
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    align_blocks = align_blocks and not compression and not sequence
+    sizes = shard_sizes(target_size, num_shards, align_blocks, block_size)
+    make_output_dir(output_dir)
+
+    # Aligned shards must not spill a few bytes into an extra block
+    overshoot = not align_blocks
+
+    shard_args = [
+        (join_output(output_dir, shard_file_name(i, compression)), size, profile, seed, i, overshoot,
+         bool(counts_path), sequence)
+        for i, size in enumerate(sizes)
+    ]
+    results = run_shard_pool(_generate_shard, shard_args, workers, progress_prefix)
+    if counts_path:
+        write_count_manifest(counts_path, profile.vocabulary(), merge_counts(r[2] for r in results))
+
+    manifest = {
+        'seed': int(seed),
+        'rng': 'PCG64.jumped(shard_index)',
+        'target_size': int(target_size),
+        'align_blocks': bool(align_blocks),
+        'block_size': int(block_size),
+        'compression': compression,
+        'sequence': sequence,
+        'profile': profile.describe(),
+        'shards': [
+            {'file': shard_file_name(i, compression), 'target_size': size, 'bytes': b, 'words': w}
+            for i, (size, (b, w, _)) in enumerate(zip(sizes, results))
+        ],
+    }
+    write_shard_manifest(output_dir, manifest)
+
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def generate_nested_shards(output_dirs, target_sizes, profile, shards_per_step=1, seed=None,
+                           workers=None, progress_prefix='', compression=None, counts_paths=None):
+    """
+    Generate datasets of increasing size in which each one extends the previous.
+
+    Step k only writes the target_sizes[k] - target_sizes[k - 1] bytes it
+    adds, as its own part files in output_dirs[k], from the jump-ahead
+    streams that follow those of the earlier steps; locally the earlier
+    steps' part files are linked in beside them. Every dataset is thus
+    exactly the previous one plus a deterministic continuation, and each
+    part file is written (and uploaded) once. The _SHARDS.json of a step
+    names the directory it extends ('extends'), so run_experiment.py can
+    pass the directories of all steps as the job input instead of
+    re-uploading the shared parts.
+
+    Args:
+        output_dirs: One directory per dataset (local or hdfs://), smallest first
+        target_sizes: Cumulative target size in bytes of every dataset
+        profile: Key distribution (see parse_profile)
+        shards_per_step: Part files written in parallel for every step
+        seed: Base seed (None draws one from OS entropy and records it)
+        workers: Process pool size (default: os.cpu_count())
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        compression: Codec name from CODECS for compressed part files
+        counts_paths: Local count manifest path of every dataset (see
+            write_count_manifest), or None to skip counting
+
+    Returns:
+        List of (bytes_written, words_written) per dataset, cumulative
+    """
+    if any(b <= a for a, b in zip(target_sizes, target_sizes[1:])):
+        raise ValueError("Nested dataset sizes must be strictly increasing")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    steps = []
+    previous = 0
+    for step, target_size in enumerate(target_sizes):
+        first = step * shards_per_step
+        steps.append([(first + i, size) for i, size in
+                      enumerate(shard_sizes(target_size - previous, shards_per_step))])
+        previous = target_size
+        make_output_dir(output_dirs[step])
+
+    # All steps share one pool; shard g always draws from stream g
+    shard_args = [
+        (join_output(output_dirs[step], shard_file_name(g, compression)), size, profile, seed, g,
+         True, bool(counts_paths))
+        for step, shards in enumerate(steps) for g, size in shards
+    ]
+    results = run_shard_pool(_generate_shard, shard_args, workers, progress_prefix)
+
+    totals = []
+    entries = []
+    counts = None
+    for step, shards in enumerate(steps):
+        output_dir = output_dirs[step]
+        step_results = results[len(entries):len(entries) + len(shards)]
+        # Earlier parts are linked, not copied (HDFS inputs list the directories instead)
+        if not is_hdfs_path(output_dir):
+            for entry in entries:
+                link = os.path.join(output_dir, entry['file'])
+                if os.path.lexists(link):
+                    os.remove(link)
+                os.symlink(os.path.join('..', entry['step_dir'], entry['file']), link)
+        entries += [
+            {'file': shard_file_name(g, compression), 'step_dir': posixpath.basename(output_dir),
+             'target_size': size, 'bytes': r[0], 'words': r[1]}
+            for (g, size), r in zip(shards, step_results)
+        ]
+        if counts_paths:
+            step_counts = merge_counts(r[2] for r in step_results)
+            counts = step_counts if step == 0 else merge_counts([counts, step_counts])
+            write_count_manifest(counts_paths[step], profile.vocabulary(), counts)
+
+        write_shard_manifest(output_dir, {
+            'seed': int(seed),
+            'rng': 'PCG64.jumped(shard_index)',
+            'target_size': int(target_sizes[step]),
+            'extends': posixpath.basename(output_dirs[step - 1]) if step else None,
+            'compression': compression,
+            'profile': profile.describe(),
+            'shards': entries,
+        })
+        totals.append((sum(e['bytes'] for e in entries), sum(e['words'] for e in entries)))
+
+    return totals
+
+
+def small_file_sizes(target_size, num_files, distribution, rng):
+    """
+    Target size in bytes of every file of a small-files dataset.
+
+    Relative sizes from distribution are scaled to add up to target_size;
+    every file gets at least one byte (so at least one line).
+    """
+    if num_files < 1:
+        raise ValueError("num_files must be at least 1")
+    weights = distribution.sample(rng, num_files)
+    sizes = np.floor(weights / weights.sum() * target_size).astype(np.int64)
+    sizes[:int(target_size - sizes.sum())] += 1
+    return np.maximum(sizes, 1)
+
+
+def _generate_small_files(first_path, output_dir, first_index, sizes, profile, seed, compression,
+                          count=False):
+    """Process-pool worker: write a run of consecutive small files, each from its own stream."""
+    counts = new_counts(profile.vocabulary_size()) if count else None
+    files = []
+    for index, size in enumerate(sizes, first_index):
+        with open_output(join_output(output_dir, shard_file_name(index, compression)),
+                         size_hint=size) as f:
+            files.append(write_blocks(f, int(size), profile, shard_rng(seed, index),
+                                      block_lines=max(1, min(BLOCK_LINES, int(size) // 32)),
+                                      progress_prefix=None, counts=counts))
+    return sum(b for b, _ in files), sum(w for _, w in files), counts, files
+
+
+def generate_small_files(output_dir, target_size, num_files, profile, file_sizes=None, seed=None,
+                         workers=None, progress_prefix='', compression=None, counts_path=None):
+    """
+    Generate a dataset split over many small part files.
+
+    Every file is smaller than an HDFS block for all but tiny num_files, so
+    the job runs one map task per file instead of one per 64MB block: the
+    workload for measuring container start-up cost and how the AM schedules
+    reducers among thousands of short maps. File i is written from jumped
+    stream i of seed (as a shard would be), runs of files are written by
+    each pool task, and the file sizes come from a separate stream of the
+    same seed. Write to a local directory and upload it in one
+    `hdfs dfs -put`; streaming every file into HDFS separately would start
+    one client JVM per file.
+
+    Args:
+        output_dir: Directory for the part files
+        target_size: Total target size in bytes
+        num_files: Number of part files
+        profile: Key distribution (see parse_profile)
+        file_sizes: FileSizeDistribution (default: DEFAULT_FILE_SIZES)
+        seed: Base seed (None draws one from OS entropy and records it)
+        workers: Process pool size (default: os.cpu_count())
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        compression: Codec name from CODECS for compressed part files
+        counts_path: Local path for the ground-truth count manifest of the
+            whole dataset (see write_count_manifest), or None to skip counting
+
+    Returns:
+        (bytes_written, words_written), counting uncompressed text bytes
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    file_sizes = file_sizes or parse_file_sizes(DEFAULT_FILE_SIZES)
+    size_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    sizes = small_file_sizes(int(target_size), num_files, file_sizes, size_rng)
+    make_output_dir(output_dir)
+
+    # Enough tasks to keep every worker busy, but never one per file
+    pool_size = workers or os.cpu_count() or 1
+    per_task = max(1, min(SMALL_FILES_PER_TASK, -(-num_files // (pool_size * 4))))
+    task_args = [
+        (join_output(output_dir, shard_file_name(first, compression)), output_dir, first,
+         sizes[first:first + per_task].tolist(), profile, seed, compression, bool(counts_path))
+        for first in range(0, num_files, per_task)
+    ]
+    results = run_shard_pool(_generate_small_files, task_args, workers, progress_prefix,
+                             unit='Batch')
+    if counts_path:
+        write_count_manifest(counts_path, profile.vocabulary(), merge_counts(r[2] for r in results))
+
+    files = [f for r in results for f in r[3]]
+    write_shard_manifest(output_dir, {
+        'seed': int(seed),
+        'rng': 'PCG64.jumped(shard_index)',
+        'target_size': int(target_size),
+        'small_files': num_files,
+        'file_sizes': file_sizes.describe(),
+        'compression': compression,
+        'profile': profile.describe(),
+        'shards': [
+            {'file': shard_file_name(i, compression), 'target_size': int(size), 'bytes': b, 'words': w}
+            for i, (size, (b, w)) in enumerate(zip(sizes, files))
+        ],
+    })
+
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def draw_hot_count(rng, hot_left, words_left, n):
+    """
+    Number of hot words among the next n of words_left remaining words.
+
+    This is the hypergeometric draw that a full shuffle of the remaining words
+    would produce. Past numpy's population limit the binomial with the same
+    mean is used instead; the clamp keeps the overall total exact either way.
+    """
+    normal_left = words_left - hot_left
+    if n == 0 or hot_left == 0:
+        return 0
+    if normal_left == 0:
+        return n
+    if hot_left < HYPERGEOMETRIC_LIMIT and normal_left < HYPERGEOMETRIC_LIMIT:
+        return int(rng.hypergeometric(hot_left, normal_left, n))
+    k = int(rng.binomial(n, hot_left / words_left))
+    return min(max(k, n - normal_left), hot_left)
+
+
+def write_hotkey_stream(f, total_words, hot_words, hot_index, num_normal, vocab, rng,
+                        block_lines=BLOCK_LINES, progress_prefix='', counts=None):
+    """
+    Stream a skewed word sequence block by block in bounded memory.
+
+    Exactly hot_words of the total_words words are hot_index; the rest are
+    uniform over [0, num_normal). Each block's hot count is drawn from what
+    remains (see draw_hot_count) and scattered over random positions, which
+    is distributed like shuffling the whole word list at once, but needs only
+    one block in memory regardless of the dataset size. Written indices are
+    added to counts (see new_counts) when it is given.
+
+    Returns:
+        (bytes_written, words_written, hot_written)
+    """
+    block_words = block_lines * WORDS_PER_LINE
+    progress = Progress(total_words, progress_prefix)
+    words_left = total_words
+    hot_left = hot_words
+    bytes_written = 0
+
+    while words_left > 0:
+        n = min(block_words, words_left)
+        k = draw_hot_count(rng, hot_left, words_left, n)
+
+        indices = rng.integers(0, num_normal, size=n, dtype=np.int64)
+        if k:
+            indices[rng.choice(n, size=k, replace=False)] = hot_index
+        if counts is not None:
+            add_counts(counts, indices)
+        buffer, _ = vocab.render(indices)
+        f.write(buffer.data)
+
+        bytes_written += len(buffer)
+        words_left -= n
+        hot_left -= k
+        progress.update(bytes_written, done=total_words - words_left)
+
+    return bytes_written, total_words, hot_words
+
+
+def split_counts(total, num_shards):
+    """Split total into num_shards near-equal integer parts."""
+    base, extra = divmod(int(total), num_shards)
+    return [base + (1 if i < extra else 0) for i in range(num_shards)]
+
+
+def split_hot_counts(rng, hot_words, shard_words):
+    """Distribute hot_words over shards of shard_words words, as a global shuffle would."""
+    words_left = sum(shard_words)
+    hot_left = hot_words
+    counts = []
+    for n in shard_words:
+        k = draw_hot_count(rng, hot_left, words_left, n)
+        counts.append(k)
+        words_left -= n
+        hot_left -= k
+    return counts
+
+
+def _generate_hotkey_shard(file_path, total_words, hot_words, words, seed, shard_index, count=False):
+    """Process-pool worker: stream one skewed part file from its own jumped stream."""
+    vocab = Vocabulary(words)
+    rng = shard_rng(seed, shard_index)
+    counts = new_counts(len(words)) if count else None
+    with open_output(file_path) as f:
+        result = write_hotkey_stream(f, total_words, hot_words, len(words) - 1, len(words) - 1,
+                                     vocab, rng, progress_prefix=None, counts=counts)
+    return result + (counts,)
+
+
+def generate_hotkey_file(file_path, total_words, hot_words, normal_words, hotkey, seed=None,
+                         shards=1, workers=None, progress_prefix='', compression=None,
+                         counts_path=None):
+    """
+    Generate a skewed dataset with an exact number of hotkey occurrences.
+
+    Args:
+        file_path: Output file, or output directory when shards > 1 (local
+            or hdfs://, see open_output)
+        total_words: Total number of words
+        hot_words: Exact number of hotkey occurrences
+        normal_words: Uniformly drawn background vocabulary (list of str)
+        hotkey: The hot word
+        seed: Base seed (None draws one from OS entropy)
+        shards: Number of part files written in parallel
+        workers: Process pool size for sharded generation
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        compression: Codec name from CODECS for compressed part files (a
+            single output file is compressed according to its extension)
+        counts_path: Local path for the ground-truth count manifest (see
+            write_count_manifest), or None to skip counting
+
+    Returns:
+        (bytes_written, words_written, hot_written), counting uncompressed bytes
+    """
+    words = list(normal_words) + [hotkey]
+
+    if shards <= 1:
+        counts = new_counts(len(words)) if counts_path else None
+        make_output_dir(posixpath.dirname(file_path))
+        with open_output(file_path) as f:
+            result = write_hotkey_stream(f, total_words, hot_words, len(normal_words),
+                                         len(normal_words), Vocabulary(words),
+                                         np.random.default_rng(seed),
+                                         progress_prefix=progress_prefix, counts=counts)
+        if counts_path:
+            write_count_manifest(counts_path, Vocabulary(words), counts)
+        return result
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    make_output_dir(file_path)
+
+    # Whole lines per shard, so only the final part ends in a partial line
+    shard_lines = split_counts(-(-total_words // WORDS_PER_LINE), shards)
+    shard_words = [lines * WORDS_PER_LINE for lines in shard_lines]
+    shard_words[-1] -= sum(shard_words) - total_words
+    # The split itself comes from a stream no shard uses (index == shards)
+    shard_hot = split_hot_counts(shard_rng(seed, shards), hot_words, shard_words)
+
+    shard_args = [
+        (join_output(file_path, shard_file_name(i, compression)), n, k, words, seed, i,
+         bool(counts_path))
+        for i, (n, k) in enumerate(zip(shard_words, shard_hot))
+    ]
+    results = run_shard_pool(_generate_hotkey_shard, shard_args, workers, progress_prefix)
+    if counts_path:
+        write_count_manifest(counts_path, Vocabulary(words), merge_counts(r[3] for r in results))
+
+    write_shard_manifest(file_path, {
+        'seed': int(seed),
+        'rng': 'PCG64.jumped(shard_index)',
+        'hotkey': hotkey,
+        'total_words': int(total_words),
+        'hot_words': int(hot_words),
+        'vocabulary_size': len(words),
+        'compression': compression,
+        'shards': [
+            {'file': shard_file_name(i, compression), 'words': n, 'hot_words': k, 'bytes': r[0]}
+            for i, (n, k, r) in enumerate(zip(shard_words, shard_hot, results))
+        ],
+    })
+
+    return sum(r[0] for r in results), total_words, hot_words
+
+
+def clustered_hot_blocks(num_blocks, hot_blocks, placement='spread'):
+    """
+    Indices of the blocks that carry the hot key in a clustered dataset.
+
+    'spread' places them evenly over the input, 'first' and 'last' at its
+    start or end (maps over early or late splits).
+    """
+    if not 0 < hot_blocks <= num_blocks:
+        raise ValueError(f"hot_blocks must be between 1 and the {num_blocks} blocks of the dataset")
+    if placement == 'first':
+        return list(range(hot_blocks))
+    if placement == 'last':
+        return list(range(num_blocks - hot_blocks, num_blocks))
+    if placement == 'spread':
+        return [i * num_blocks // hot_blocks for i in range(hot_blocks)]
+    raise ValueError(f"Unknown placement '{placement}' (expected one of {', '.join(CLUSTER_PLACEMENTS)})")
+
+
+def write_clustered_block(f, block_size, hot_fraction, hot_index, num_normal, vocab, rng,
+                          block_lines=BLOCK_LINES, counts=None):
+    """
+    Write exactly block_size bytes of whole lines in which each word is the
+    hot key with probability hot_fraction (uniform background otherwise).
+
+    The last few bytes that cannot hold another line become a line of spaces,
+    so the block ends on a newline at its exact boundary. That alone does not
+    keep a block's words in its own map: LineRecordReader skips the first
+    line of every split that does not start its file and lets the previous
+    split's map read it instead, even when the split starts on a line. Every
+    block therefore starts with an empty line, which is all the previous map
+    reads of it (in the first block of a file it is simply an empty line, so
+    blocks look the same whichever shard they land in). Whitespace adds no
+    words.
+
+    Returns:
+        (words_written, hot_written)
+    """
+    f.write(b'\n')
+    bytes_written, words_written, hot_written = 1, 0, 0
+    while bytes_written < block_size:
+        n = block_lines * WORDS_PER_LINE
+        indices = rng.integers(0, num_normal, size=n, dtype=np.int64)
+        if hot_fraction:
+            indices[rng.random(n) < hot_fraction] = hot_index
+        indices = indices.reshape(block_lines, WORDS_PER_LINE)
+        buffer, line_ends = vocab.render(indices)
+
+        remaining = block_size - bytes_written
+        kept_lines = int(np.searchsorted(line_ends, remaining, side='right'))
+        if kept_lines < block_lines:
+            buffer = buffer[:line_ends[kept_lines - 1]] if kept_lines else buffer[:0]
+            indices = indices[:kept_lines]
+        if counts is not None:
+            add_counts(counts, indices)
+        f.write(buffer.data)
+        bytes_written += len(buffer)
+        words_written += indices.size
+        hot_written += int(np.count_nonzero(indices == hot_index))
+
+        if kept_lines < block_lines:
+            padding = block_size - bytes_written
+            if padding:
+                f.write(b' ' * (padding - 1) + b'\n')
+                bytes_written += padding
+    return words_written, hot_written
+
+
+def _generate_clustered_shard(file_path, blocks, hot_fraction, words, seed, count=False):
+    """
+    Process-pool worker: write a run of blocks, each from its own jumped stream.
+
+    blocks is a list of (block_index, block_size, is_hot).
+    """
+    vocab = Vocabulary(words)
+    counts = new_counts(len(words)) if count else None
+    written = []
+    with open_output(file_path, size_hint=sum(size for _, size, _ in blocks)) as f:
+        for index, size, hot in blocks:
+            written.append(write_clustered_block(f, size, hot_fraction if hot else 0.0,
+                                                 len(words) - 1, len(words) - 1, vocab,
+                                                 shard_rng(seed, index), counts=counts))
+    return sum(size for _, size, _ in blocks), counts, written
+
+
+def generate_clustered_file(file_path, target_size, hot_blocks, hot_fraction, normal_words, hotkey,
+                            placement='spread', seed=None, shards=1, workers=None,
+                            block_size=HDFS_BLOCK_SIZE, progress_prefix='', counts_path=None):
+    """
+    Generate a dataset whose hot key is concentrated in a few HDFS blocks.
+
+    The dataset is cut into block_size blocks that end exactly on block
+    boundaries (see write_clustered_block), so each block is one map split.
+    In the hot_blocks blocks chosen by placement every word is the hot key
+    with probability hot_fraction; all other blocks are uniform background.
+    The maps over hot blocks see a different input than the rest (map-side
+    skew), while every other block looks like the uniform control. Block i
+    always draws from jumped stream i of seed, so the content does not
+    depend on the number of shards; shards hold whole runs of blocks.
+
+    Args:
+        file_path: Output file, or output directory when shards > 1 (local
+            or hdfs://, see open_output)
+        target_size: Total size in bytes (the last block takes the remainder)
+        hot_blocks: Number of blocks that carry the hot key
+        hot_fraction: Probability that a word of a hot block is the hot key
+        normal_words: Uniformly drawn background vocabulary (list of str)
+        hotkey: The hot word
+        placement: One of CLUSTER_PLACEMENTS (see clustered_hot_blocks)
+        seed: Base seed (None draws one from OS entropy and records it)
+        shards: Number of part files written in parallel
+        workers: Process pool size for sharded generation
+        block_size: HDFS block size the dataset is laid out for
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+        counts_path: Local path for the ground-truth count manifest (see
+            write_count_manifest), or None to skip counting
+
+    Returns:
+        (bytes_written, words_written, hot_written, hot_block_indices)
+    """
+    if not 0 < hot_fraction <= 1:
+        raise ValueError("hot_fraction must be in (0, 1]")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    words = list(normal_words) + [hotkey]
+    target_size = int(target_size)
+    num_blocks = -(-target_size // block_size)
+    hot = set(clustered_hot_blocks(num_blocks, hot_blocks, placement))
+    blocks = [(i, min(block_size, target_size - i * block_size), i in hot) for i in range(num_blocks)]
+
+    if shards <= 1:
+        make_output_dir(posixpath.dirname(file_path))
+        runs = [(file_path, blocks)]
+    else:
+        make_output_dir(file_path)
+        run_lengths = split_counts(num_blocks, min(shards, num_blocks))
+        starts = np.cumsum([0] + run_lengths[:-1])
+        runs = [(join_output(file_path, shard_file_name(i)), blocks[start:start + length])
+                for i, (start, length) in enumerate(zip(starts, run_lengths))]
+
+    shard_args = [(path, run, hot_fraction, words, seed, bool(counts_path)) for path, run in runs]
+    results = run_shard_pool(_generate_clustered_shard, shard_args, workers, progress_prefix)
+    if counts_path:
+        write_count_manifest(counts_path, Vocabulary(words), merge_counts(r[1] for r in results))
+
+    written = [w for r in results for w in r[2]]
+    if shards > 1:
+        files = [posixpath.basename(path) for path, run in runs for _ in run]
+        write_shard_manifest(file_path, {
+            'seed': int(seed),
+            'rng': 'PCG64.jumped(block_index)',
+            'hotkey': hotkey,
+            'hot_fraction': float(hot_fraction),
+            'placement': placement,
+            'block_size': int(block_size),
+            'vocabulary_size': len(words),
+            'shards': [{'file': posixpath.basename(path), 'blocks': len(run), 'bytes': r[0]}
+                       for (path, run), r in zip(runs, results)],
+            'blocks': [
+                {'block': i, 'file': name, 'hot': is_hot, 'words': w, 'hot_words': k}
+                for (i, _, is_hot), name, (w, k) in zip(blocks, files, written)
+            ],
+        })
+
+    return (sum(r[0] for r in results), sum(w for w, _ in written), sum(k for _, k in written),
+            sorted(hot))
+
+
+def new_counts(vocabulary_size):
+    """Zeroed per-key count array, or None when the vocabulary exceeds COUNT_LIMIT."""
+    if vocabulary_size > COUNT_LIMIT:
+        return None
+    return np.zeros(vocabulary_size, dtype=np.int64)
+
+
+def add_counts(counts, indices):
+    """Add the occurrences of every word index in a block to counts, in place."""
+    counts += np.bincount(np.ravel(indices), minlength=len(counts))
+
+
+def merge_counts(shard_counts):
+    """Sum per-shard count arrays (None if any shard kept none)."""
+    total = None
+    for counts in shard_counts:
+        if counts is None:
+            return None
+        total = counts if total is None else total + counts
+    return total
+
+
+def counts_path_for(file_path):
+    """Local count manifest of a dataset: next to its file, shard directory or HDFS pointer."""
+    return shard_dir_for(file_path) + COUNTS_EXT
+
+
+def write_count_manifest(path, vocab, counts):
+    """
+    Save the exact number of occurrences of every key of a generated dataset.
+
+    The .npz holds the int64 counts and the key set: the newline-joined words
+    of a Vocabulary, just prefix and width for a NumberedVocabulary, or the
+    hot words followed by the background's prefix and width for a
+    TopKVocabulary. With counts None (vocabulary above COUNT_LIMIT) a stale
+    manifest is removed.
+
+    Returns:
+        path, or None when no manifest was written
+    """
+    if counts is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    if isinstance(vocab, NumberedVocabulary):
+        keys = {'prefix': np.array(vocab.prefix), 'width': np.array(vocab.width)}
+    elif isinstance(vocab, TopKVocabulary):
+        keys = {'words': np.frombuffer('\n'.join(vocab.head.words).encode('utf-8'), dtype=np.uint8),
+                'prefix': np.array(vocab.background.prefix), 'width': np.array(vocab.background.width)}
+    else:
+        keys = {'words': np.frombuffer('\n'.join(vocab.words).encode('utf-8'), dtype=np.uint8)}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    partial = path + '.tmp'
+    with open(partial, 'wb') as f:
+        np.savez_compressed(f, counts=counts, **keys)
+    os.replace(partial, path)
+    return path
+
+
+def tera_skip(state, steps):
+    """Advance a Random16 state by steps LCG steps in O(log steps) (Random16.skipAhead)."""
+    mult, inc = 1, 0
+    step_mult, step_inc = TERA_LCG_A, TERA_LCG_C
+    while steps:
+        if steps & 1:
+            mult = mult * step_mult % TERA_MODULUS
+            inc = (inc * step_mult + step_inc) % TERA_MODULUS
+        step_inc = (step_mult + 1) * step_inc % TERA_MODULUS
+        step_mult = step_mult * step_mult % TERA_MODULUS
+        steps >>= 1
+    return (mult * state + inc) % TERA_MODULUS
+
+
+def _tera_limbs(values):
+    """(n, 4) uint64 array of the 32-bit limbs of 128-bit ints, least significant first."""
+    return np.array([[(v >> shift) & 0xFFFFFFFF for shift in (0, 32, 64, 96)] for v in values],
+                    dtype=np.uint64)
+
+
+class TeraStream:
+    """
+    Vectorised Random16 state sequence for blocks of consecutive TeraGen rows.
+
+    State k rows after s0 is A_k * s0 + C_k (mod 2^128) with fixed A_k, C_k,
+    so the affine coefficients are computed once per block length and every
+    block costs a handful of limb-wise numpy multiplies by its start state.
+    """
+
+    def __init__(self, block_rows=TERA_BLOCK_ROWS):
+        mults, incs = [], []
+        mult, inc = 1, 0
+        for _ in range(block_rows):
+            mults.append(mult)
+            incs.append(inc)
+            mult = mult * TERA_LCG_A % TERA_MODULUS
+            inc = (inc * TERA_LCG_A + TERA_LCG_C) % TERA_MODULUS
+        self.block_rows = block_rows
+        self.mults = _tera_limbs(mults)
+        self.incs = _tera_limbs(incs)
+
+    def states(self, first_row, n):
+        """
+        Random16 states of rows first_row .. first_row + n - 1.
+
+        Returns:
+            (n, 16) uint8 array of big-endian 128-bit states
+        """
+        start = tera_skip(0, first_row + 1)
+        start_limbs = [np.uint64((start >> shift) & 0xFFFFFFFF) for shift in (0, 32, 64, 96)]
+        mults = self.mults[:n]
+
+        # Schoolbook multiply keeping the low 128 bits; columns collect 32-bit
+        # halves of the partial products so the sums cannot overflow uint64
+        columns = self.incs[:n].copy()
+        low_mask = np.uint64(0xFFFFFFFF)
+        shift = np.uint64(32)
+        for i in range(4):
+            for j in range(4 - i):
+                product = mults[:, i] * start_limbs[j]
+                columns[:, i + j] += product & low_mask
+                if i + j < 3:
+                    columns[:, i + j + 1] += product >> shift
+
+        limbs = np.empty((n, 4), dtype='>u4')
+        carry = np.zeros(n, dtype=np.uint64)
+        for k in range(4):
+            total = columns[:, k] + carry
+            limbs[:, 3 - k] = total & low_mask
+            carry = total >> shift
+        return limbs.view(np.uint8).reshape(n, 16)
+
+
+def render_tera_records(states, first_row):
+    """
+    Render TeraGen records for consecutive rows from their Random16 states.
+
+    Layout per GenSort.generateRecord: the state's top 10 bytes as key,
+    00 11, the row id as 32 uppercase hex digits, 88 99 AA BB, hex digits
+    20..31 of the state each repeated 4 times, CC DD EE FF.
+    """
+    n = len(states)
+    hex_digits = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+    records = np.empty((n, TERA_RECORD), dtype=np.uint8)
+
+    records[:, :TERA_KEY] = states[:, :TERA_KEY]
+    records[:, 10:12] = (0x00, 0x11)
+
+    rows = np.arange(first_row, first_row + n, dtype=np.uint64)
+    shifts = np.arange(60, -4, -4, dtype=np.uint64)
+    records[:, 12:28] = ord('0')  # high 64 bits of the 128-bit row id
+    records[:, 28:44] = hex_digits[(rows[:, None] >> shifts) & np.uint64(0xF)]
+    records[:, 44:48] = (0x88, 0x99, 0xAA, 0xBB)
+
+    tail = states[:, 10:16]
+    nibbles = np.stack([tail >> 4, tail & 0xF], axis=2).reshape(n, 12)
+    records[:, 48:96] = np.repeat(hex_digits[nibbles], 4, axis=1)
+    records[:, 96:100] = (0xCC, 0xDD, 0xEE, 0xFF)
+    return records
+
+
+def write_tera_rows(f, first_row, num_rows, stream=None, progress_prefix=''):
+    """
+    Write num_rows TeraGen records starting at first_row to an open binary file.
+
+    Returns:
+        (bytes_written, rows_written)
+    """
+    stream = stream or TeraStream(max(1, min(TERA_BLOCK_ROWS, num_rows)))
+    progress = Progress(num_rows * TERA_RECORD, progress_prefix)
+    written = 0
+    while written < num_rows:
+        n = min(stream.block_rows, num_rows - written)
+        row = first_row + written
+        f.write(render_tera_records(stream.states(row, n), row).data)
+        written += n
+        progress.update(written * TERA_RECORD)
+
+    return written * TERA_RECORD, written
+
+
+def tera_row_ranges(num_rows, num_parts):
+    """(first_row, rows) per part, split like TeraGen's RangeInputFormat (remainder in the last part)."""
+    per_part = num_rows // num_parts
+    ranges = [(i * per_part, per_part) for i in range(num_parts)]
+    ranges[-1] = (ranges[-1][0], num_rows - ranges[-1][0])
+    return ranges
+
+
+def _generate_tera_shard(file_path, first_row, num_rows):
+    """Process-pool worker: write one TeraGen part file."""
+    with open_output(file_path, size_hint=num_rows * TERA_RECORD) as f:
+        return write_tera_rows(f, first_row, num_rows, progress_prefix=None)
+
+
+def generate_teragen(output_dir, num_rows, shards=1, workers=None, progress_prefix=''):
+    """
+    Generate TeraSort input byte-identical to `hadoop jar ... teragen`.
+
+    Rows are split into contiguous ranges exactly like TeraGen splits them
+    over map tasks, so with shards equal to its map count every
+    part-m-NNNNN file matches TeraGen's; the concatenated records are the
+    same for any shard count.
+
+    Args:
+        output_dir: Output directory (local or hdfs://, see open_output)
+        num_rows: Number of 100-byte records
+        shards: Number of part files written in parallel
+        workers: Process pool size for sharded generation
+        progress_prefix: Indentation for progress lines, or None to stay quiet
+
+    Returns:
+        (bytes_written, rows_written)
+    """
+    make_output_dir(output_dir)
+    ranges = tera_row_ranges(num_rows, max(shards, 1))
+    shard_args = [
+        (join_output(output_dir, TERA_PART_NAME.format(i)), first, n)
+        for i, (first, n) in enumerate(ranges)
+    ]
+
+    if len(shard_args) == 1:
+        with open_output(shard_args[0][0], size_hint=num_rows * TERA_RECORD) as f:
+            results = [write_tera_rows(f, 0, num_rows, progress_prefix=progress_prefix)]
+    else:
+        results = run_shard_pool(_generate_tera_shard, shard_args, workers, progress_prefix)
+
+    write_shard_manifest(output_dir, {
+        'generator': 'teragen',
+        'rng': 'Random16',
+        'rows': int(num_rows),
+        'record_bytes': TERA_RECORD,
+        'shards': [
+            {'file': posixpath.basename(args[0]), 'first_row': args[1], 'rows': args[2], 'bytes': r[0]}
+            for args, r in zip(shard_args, results)
+        ],
+    })
+
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def shard_dir_for(file_path):
+    """Directory that holds the sharded version of a single-file dataset path."""
+    codec = codec_for_path(file_path)
+    if codec:
+        file_path = file_path[:-len(CODECS[codec][0])]
+    return os.path.splitext(file_path)[0]
+
+
+def shard_output_dir(file_path, hdfs_dir=None):
+    """Directory of part files for a dataset named after file_path, locally or below hdfs_dir."""
+    if hdfs_dir:
+        return hdfs_uri(posixpath.join(hdfs_dir, os.path.basename(shard_dir_for(file_path))))
+    return shard_dir_for(file_path)
+
+
+def output_path(file_path, shards=1, hdfs_dir=None, compression=None):
+    """
+    Where generate_data.py writes a dataset named after file_path.
+
+    Locally this is the file itself (with the codec extension when
+    compressed), or its shard directory when shards > 1. With hdfs_dir the
+    dataset is streamed to hdfs://<hdfs_dir>/<name>/ as part files (a single
+    stream becomes part-00000).
+    """
+    if hdfs_dir:
+        target = shard_output_dir(file_path, hdfs_dir)
+        return target if shards > 1 else join_output(target, shard_file_name(0, compression))
+    return shard_dir_for(file_path) if shards > 1 else compressed_name(file_path, compression)
+
+
+def hdfs_pointer_for(file_path):
+    """Local pointer file recording where a streamed dataset lives in HDFS."""
+    return shard_dir_for(file_path) + HDFS_POINTER_EXT
+
+
+def local_output_path(file_path, shards=1, hdfs_dir=None, compression=None):
+    """What generate_data.py leaves locally: the dataset, or its HDFS pointer."""
+    if hdfs_dir:
+        return hdfs_pointer_for(file_path)
+    return output_path(file_path, shards, compression=compression)
+
+
+def write_hdfs_pointer(file_path, output, size, extends=()):
+    """
+    Record a dataset streamed into HDFS next to where its local copy would be.
+
+    run_experiment.py picks the pointer up and runs jobs directly on the
+    recorded HDFS directory instead of uploading a local file. A nested
+    dataset (see generate_nested_shards) records the directories it extends
+    first, comma-separated, as Hadoop accepts for a list of input paths.
+    """
+    single = posixpath.basename(output).startswith(shard_file_name(0))
+    hdfs_dir = posixpath.dirname(output) if single else output
+    hdfs_path = ','.join(hdfs_path_of(d) for d in [*extends, hdfs_dir])
+    pointer = hdfs_pointer_for(file_path)
+    os.makedirs(os.path.dirname(pointer) or '.', exist_ok=True)
+    with open(pointer, 'w') as f:
+        json.dump({'hdfs_path': hdfs_path, 'bytes': int(size)}, f, indent=2)
+    return pointer
+
+
+def dataset_size(path):
+    """Size in bytes of a dataset file, of all part files in a shard directory, or recorded in an HDFS pointer."""
+    if path.endswith(HDFS_POINTER_EXT):
+        with open(path) as f:
+            return json.load(f)['bytes']
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(path, name))
+            for name in os.listdir(path)
+            if not name.startswith(('_', '.'))
+        )
+    return os.path.getsize(path)
+
+
+def add_key_arguments(parser):
+    """Register the --keys option that swaps a script's word list for synthesised keys."""
+    def count(text):
+        try:
+            return parse_count(text)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    parser.add_argument('--keys', type=count, default=None,
+                        help='Draw uniformly from N distinct synthesised keys (word00000, word00001, '
+                             '...) instead of the built-in word list, e.g. 1e3 ... 1e9; keys are '
+                             'rendered from integer ids, so any cardinality costs no memory')
+    return parser
+
+
+def add_shard_arguments(parser):
+    """Register the common --seed/--shards/--workers/--align-blocks/--compression/--hdfs-dir options."""
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Base random seed (default: fresh entropy)')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Write N part files in parallel into a directory instead of one file')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Process pool size for sharded generation (default: CPU count)')
+    parser.add_argument('--align-blocks', action='store_true',
+                        help=f'Size part files as whole {HDFS_BLOCK_SIZE // MB}MB HDFS blocks '
+                             '(plain text only)')
+    parser.add_argument('--compression', choices=sorted(CODECS), default=None,
+                        help='Compress the output (bzip2 is splittable by Hadoop; gzip and zstd '
+                             'give one map task per file, so combine them with --shards)')
+    parser.add_argument('--hdfs-dir', default=None,
+                        help='Stream datasets into this HDFS directory via `hdfs dfs -put -` instead '
+                             'of writing local files (shards become parallel streams); set '
+                             f'${HDFS_STANDIN_ENV} to write to a local directory instead of the cluster')
+    return parser
+
+
+def add_small_files_arguments(parser):
+    """Register the --small-files/--file-sizes options of the many-splits workload."""
+    def file_sizes(text):
+        try:
+            return parse_file_sizes(text)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    parser.add_argument('--small-files', type=int, default=None, metavar='N',
+                        help='Split each dataset over N small part files (one map task per file) '
+                             'instead of 64MB blocks of a large file')
+    parser.add_argument('--file-sizes', type=file_sizes, default=None, metavar='SPEC',
+                        help='Shape of the --small-files sizes, scaled to the dataset size: fixed, '
+                             f'uniform:spread=0.8 or lognormal:sigma=1.0 (default: {DEFAULT_FILE_SIZES})')
+    return parser
+
+
+def check_small_files_arguments(parser, args):
+    """Reject option combinations the small-files layout does not support."""
+    if args.small_files is None:
+        if args.file_sizes is not None:
+            parser.error('--file-sizes requires --small-files')
+        return
+    if args.small_files < 2:
+        parser.error('--small-files must be at least 2')
+    for option in ('shards', 'align_blocks', 'hdfs_dir', 'cache', 'incremental'):
+        value = getattr(args, option, None)
+        if value and not (option == 'shards' and value == 1):
+            parser.error(f"--small-files cannot be combined with --{option.replace('_', '-')}")
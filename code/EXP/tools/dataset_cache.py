@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of generated datasets, shared by all tasks.
+
+A dataset is identified by a hash of the parameters that determine its bytes
+(vocabulary, size, seed, skew profile, shard layout, format). generate_data.py
+builds a dataset once under the cache directory and links it into the task's
+data directory; a later campaign, or another task asking for the same
+parameters, reuses it without regenerating.
+
+run_experiment.py uploads a cached dataset once to HDFS_CACHE_DIR/<key>/ and
+reuses that copy in later campaigns after checking that its `hdfs dfs
+-checksum` still matches the one recorded at upload time. HDFS copies are
+evicted least-recently-used first when the cache would exceed its HDFS quota.
+
+The manifest (manifest.json in the cache directory) lists every cached
+dataset. Inspect or trim it with:
+
+    python3 dataset_cache.py list
+    python3 dataset_cache.py evict --hdfs-limit-gb 10
+"""
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+
+import datagen
+
+GB = 1024 * 1024 * 1024
+
+# Local cache directory (override with $DATASET_CACHE_DIR)
+CACHE_DIR = os.environ.get('DATASET_CACHE_DIR', '/root/Exp-hadoop/EXP/cache')
+
+# HDFS directory holding uploaded cache entries
+HDFS_CACHE_DIR = os.environ.get('DATASET_CACHE_HDFS_DIR', '/user/root/dataset_cache')
+
+# HDFS space the cache may occupy before least-recently-used entries are evicted
+HDFS_LIMIT = int(float(os.environ.get('DATASET_CACHE_HDFS_LIMIT_GB', '20')) * GB)
+
+MANIFEST = 'manifest.json'
+
+# Hex digits of the parameter hash used as the cache key
+KEY_LENGTH = 16
+
+
+def dataset_key(params):
+    """Cache key: hash of the canonical JSON encoding of the generator parameters."""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:KEY_LENGTH]
+
+
+def vocabulary_digest(words):
+    """Short stable fingerprint of a word list, for use in cache parameters."""
+    return 'sha256:' + hashlib.sha256('\n'.join(words).encode('utf-8')).hexdigest()[:KEY_LENGTH]
+
+
+def _run_local(command):
+    """Run a shell command; same (stdout, stderr, returncode) contract as ExperimentRunner.run_command."""
+    result = subprocess.run(command, shell=True, capture_output=True, text=True)
+    return result.stdout, result.stderr, result.returncode
+
+
+class DatasetCache:
+    """Local + HDFS dataset cache backed by a JSON manifest."""
+
+    def __init__(self, root=CACHE_DIR, hdfs_dir=HDFS_CACHE_DIR, hdfs_limit=HDFS_LIMIT):
+        self.root = root
+        self.hdfs_dir = hdfs_dir.rstrip('/')
+        self.hdfs_limit = hdfs_limit
+        self.manifest_path = os.path.join(root, MANIFEST)
+
+    # -- manifest -----------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _manifest(self, write=False):
+        """Yield the manifest dict under an exclusive lock, saving it if write."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, MANIFEST + '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            manifest = {'datasets': {}}
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path) as f:
+                    manifest = json.load(f)
+            yield manifest
+            if write:
+                temp_path = self.manifest_path + '.tmp'
+                with open(temp_path, 'w') as f:
+                    json.dump(manifest, f, indent=2, sort_keys=True)
+                os.replace(temp_path, self.manifest_path)
+
+    def entries(self):
+        """All manifest entries, keyed by cache key."""
+        with self._manifest() as manifest:
+            return dict(manifest['datasets'])
+
+    # -- local copies -------------------------------------------------------
+
+    def entry_dir(self, key):
+        """Directory holding the local copy of a cache entry."""
+        return os.path.join(self.root, key)
+
+    def lookup(self, key):
+        """Manifest entry whose local copy exists, or None. Marks the entry as used."""
+        with self._manifest(write=True) as manifest:
+            entry = manifest['datasets'].get(key)
+            if entry is None or not os.path.exists(entry['local_path']):
+                return None
+            entry['last_used'] = time.time()
+            return dict(entry)
+
+    def add(self, key, params, local_path, size):
+        """Record a dataset generated at local_path (inside entry_dir(key))."""
+        now = time.time()
+        with self._manifest(write=True) as manifest:
+            manifest['datasets'][key] = {
+                'params': params,
+                'local_path': local_path,
+                'bytes': int(size),
+                'created': now,
+                'last_used': now,
+                'hdfs_path': None,
+                'hdfs_checksum': None,
+            }
+            return dict(manifest['datasets'][key])
+
+    def key_for_path(self, path):
+        """Cache key of a local dataset path that links into the cache, or None."""
+        real = os.path.realpath(path)
+        root = os.path.realpath(self.root) + os.sep
+        if not real.startswith(root):
+            return None
+        key = real[len(root):].split(os.sep, 1)[0]
+        with self._manifest() as manifest:
+            return key if key in manifest['datasets'] else None
+
+    def link(self, key, dest):
+        """Point dest (a task's data path) at the cached copy with a symlink."""
+        with self._manifest() as manifest:
+            source = manifest['datasets'][key]['local_path']
+        if os.path.islink(dest) or os.path.isfile(dest):
+            os.remove(dest)
+        elif os.path.isdir(dest):
+            shutil.rmtree(dest)
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        os.symlink(source, dest)
+
+    def materialize(self, key, params, dest, build):
+        """
+        Make dest a link to the cached dataset for key, building it on a miss.
+
+        Args:
+            key: Cache key (see dataset_key)
+            params: Parameters the key was computed from (stored in the manifest)
+            dest: Path the task expects the dataset at (file or shard directory)
+            build: Callable build(path) -> size that writes the dataset to path
+
+        Returns:
+            (entry, hit): the manifest entry and whether it was already cached
+        """
+        entry = self.lookup(key)
+        hit = entry is not None
+        if not hit:
+            local_path = os.path.join(self.entry_dir(key), os.path.basename(dest))
+            if os.path.isdir(self.entry_dir(key)):
+                shutil.rmtree(self.entry_dir(key))
+            os.makedirs(self.entry_dir(key))
+            size = build(local_path)
+            entry = self.add(key, params, local_path, size)
+        self.link(key, dest)
+        return entry, hit
+
+    # -- HDFS copies --------------------------------------------------------
+
+    def hdfs_checksum(self, hdfs_path, run):
+        """Combined `hdfs dfs -checksum` output of every file below hdfs_path, or None."""
+        stdout, stderr, code = run(f"hdfs dfs -checksum '{hdfs_path}/*'")
+        if code != 0 or not stdout.strip():
+            return None
+        lines = sorted(line.strip() for line in stdout.splitlines() if line.strip())
+        return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+    def ensure_hdfs(self, key, run=_run_local):
+        """
+        HDFS directory holding the dataset for key, uploading it if needed.
+
+        An existing copy is reused only if its checksum matches the one recorded
+        when it was uploaded; otherwise it is replaced. Least-recently-used
+        copies of other datasets are evicted first to stay within hdfs_limit.
+
+        Args:
+            key: Cache key of a dataset with a local copy
+            run: Shell runner returning (stdout, stderr, returncode), e.g.
+                ExperimentRunner.run_command
+
+        Returns:
+            (hdfs_path, uploaded)
+        """
+        with self._manifest() as manifest:
+            entry = dict(manifest['datasets'][key])
+
+        if entry['hdfs_path'] and entry['hdfs_checksum']:
+            if self.hdfs_checksum(entry['hdfs_path'], run) == entry['hdfs_checksum']:
+                self._touch(key)
+                return entry['hdfs_path'], False
+            print(f"  Cached HDFS copy {entry['hdfs_path']} is missing or changed; re-uploading")
+
+        self.evict_hdfs(entry['bytes'], run, keep=key)
+
+        # Keep the dataset name in the path: job names are derived from it
+        local_path = entry['local_path']
+        hdfs_path = f"{self.hdfs_dir}/{key}/{os.path.splitext(os.path.basename(local_path))[0]}"
+        source = f"{local_path}/*" if os.path.isdir(local_path) else local_path
+        run(f"hdfs dfs -rm -r -f {self.hdfs_dir}/{key}")
+        run(f"hdfs dfs -mkdir -p {hdfs_path}")
+        stdout, stderr, code = run(f"hdfs dfs -put {source} {hdfs_path}/")
+        if code != 0:
+            raise OSError(f"Upload of cached dataset {key} failed: {stderr}")
+        checksum = self.hdfs_checksum(hdfs_path, run)
+
+        with self._manifest(write=True) as manifest:
+            stored = manifest['datasets'][key]
+            stored['hdfs_path'] = hdfs_path
+            stored['hdfs_checksum'] = checksum
+            stored['last_used'] = time.time()
+        return hdfs_path, True
+
+    def _touch(self, key):
+        with self._manifest(write=True) as manifest:
+            manifest['datasets'][key]['last_used'] = time.time()
+
+    def hdfs_usage(self):
+        """Bytes of cached datasets currently held in HDFS."""
+        return sum(e['bytes'] for e in self.entries().values() if e['hdfs_path'])
+
+    def evict_hdfs(self, needed, run=_run_local, keep=None, limit=None):
+        """
+        Delete least-recently-used HDFS copies until `needed` more bytes fit.
+
+        Local copies are kept, so an evicted dataset is simply re-uploaded the
+        next time it is used.
+
+        Returns:
+            List of evicted cache keys
+        """
+        limit = self.hdfs_limit if limit is None else limit
+        evicted = []
+        with self._manifest(write=True) as manifest:
+            datasets = manifest['datasets']
+            usage = sum(e['bytes'] for e in datasets.values() if e['hdfs_path'])
+            candidates = sorted(
+                (k for k, e in datasets.items() if e['hdfs_path'] and k != keep),
+                key=lambda k: datasets[k]['last_used']
+            )
+            for k in candidates:
+                if usage + needed <= limit:
+                    break
+                run(f"hdfs dfs -rm -r -f -skipTrash {self.hdfs_dir}/{k}")
+                usage -= datasets[k]['bytes']
+                datasets[k]['hdfs_path'] = None
+                datasets[k]['hdfs_checksum'] = None
+                evicted.append(k)
+        return evicted
+
+
+def dataset_params(generator, target_size, seed, shards=1, align_blocks=False, compression=None,
+                   **extra):
+    """
+    Parameters that determine a generated dataset's bytes, for dataset_key.
+
+    The process pool size is deliberately absent: it does not change the output.
+    """
+    return {
+        'generator': generator,
+        'format': compression or 'text',
+        'format_version': datagen.FORMAT_VERSION,
+        'target_size': int(target_size),
+        'seed': int(seed),
+        'shards': int(shards),
+        'align_blocks': bool(align_blocks) and shards > 1 and not compression,
+        **extra,
+    }
+
+
+def generate_cached(file_path, params, shards, generate, cache=None):
+    """
+    Produce the dataset for file_path through the cache.
+
+    On a miss generate(path) is called with a path inside the cache entry; it
+    must write the dataset exactly as it would for file_path (single file or
+    shard directory) and return its size in bytes. file_path (or its shard
+    directory) then becomes a symlink to the cached copy.
+
+    Returns:
+        (key, hit)
+    """
+    cache = cache or DatasetCache()
+    key = dataset_key(params)
+    compression = None if params['format'] == 'text' else params['format']
+    dest = datagen.output_path(file_path, shards, compression=compression)
+    _, hit = cache.materialize(
+        key, params, dest,
+        lambda local_path: generate(os.path.join(os.path.dirname(local_path),
+                                                 os.path.basename(file_path)))
+    )
+    print(f"  Dataset cache {'hit' if hit else 'miss'}: {key} -> {dest}")
+    return key, hit
+
+
+def add_cache_arguments(parser):
+    """Register the --cache option of the generate_data.py scripts."""
+    parser.add_argument('--cache', action='store_true',
+                        help=f'Reuse (or build once) datasets from the shared cache in {CACHE_DIR}; '
+                             'requires --seed')
+    return parser
+
+
+def check_cache_arguments(parser, args):
+    """Reject --cache combinations that cannot be cached."""
+    if args.cache and args.seed is None:
+        parser.error('--cache requires --seed (unseeded datasets are not reproducible)')
+    if args.cache and getattr(args, 'hdfs_dir', None):
+        parser.error('--cache and --hdfs-dir are mutually exclusive')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and trim the shared dataset cache.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='List cached datasets, most recently used first')
+    evict = sub.add_parser('evict', help='Evict least-recently-used HDFS copies')
+    evict.add_argument('--hdfs-limit-gb', type=float, required=True,
+                       help='Evict until the HDFS copies fit in this many GB')
+    args = parser.parse_args()
+
+    cache = DatasetCache()
+    if args.command == 'list':
+        entries = sorted(cache.entries().items(), key=lambda kv: -kv[1]['last_used'])
+        print(f"Cache: {cache.root} ({len(entries)} datasets)")
+        print(f"HDFS:  {cache.hdfs_dir} ({cache.hdfs_usage() / GB:.2f}GB of {cache.hdfs_limit / GB:.2f}GB)")
+        for key, entry in entries:
+            used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+            where = 'local+hdfs' if entry['hdfs_path'] else 'local'
+            print(f"  {key}  {entry['bytes'] / GB:7.2f}GB  {where:10s}  {used}  "
+                  f"{os.path.basename(entry['local_path'])}")
+    else:
+        evicted = cache.evict_hdfs(0, limit=int(args.hdfs_limit_gb * GB))
+        print(f"Evicted {len(evicted)} HDFS copies: {', '.join(evicted) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
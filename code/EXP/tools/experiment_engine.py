@@ -0,0 +1,1663 @@
+#!/usr/bin/env python3
+"""
+Declarative experiment engine behind every task's run_experiment.py.
+
+An experiment matrix (JSON, one per task: taskN/experiments.json) declares
+workloads, datasets and sweeps; the engine expands it into a job plan and
+runs every job through a workload adapter:
+
+    python3 experiment_engine.py ../task1/experiments.json --plan
+    python3 ../task1/scripts/run_experiment.py --sweep terasort
+
+Matrix layout (local paths are relative to the matrix file):
+
+    {
+      "title": "Task 1: Slowstart Parameter Sensitivity Analysis",
+      "hdfs_base_dir": "/user/root/task1",
+      "data_dir": "data",
+      "results_dir": "results",
+      "dataset_field": "data_size",        result key holding the dataset label
+      "slowstart": [0.05, 0.50, 1.00],
+      "reducers": [4],
+      "runs": 3,
+      "properties": {"mapreduce.map.memory.mb": 2048},   extra -D properties
+      "repetition": {"policy": "adaptive", "max_runs": 8},   see below
+      "workloads": {
+        "wordcount": {"adapter": "wordcount", "jar": "wordcount.jar",
+                      "combiner": false, "record": {"task_type": "wordcount"}},
+        "terasort": {"adapter": "terasort", "record": {"task_type": "terasort"}}
+      },
+      "datasets": {
+        "wc_1gb": {"label": "1GB", "file": "input_1gb.txt", "hdfs_name": "input_wordcount_1GB"},
+        "ts_1gb": {"label": "1GB", "teragen_records": 10737418}
+      },
+      "sweeps": [
+        {"name": "wordcount", "workload": "wordcount", "datasets": ["wc_1gb"]},
+        {"name": "terasort", "workload": "terasort", "datasets": ["ts_1gb"],
+         "slowstart": [0.5, 1.0], "enabled": false}
+      ]
+    }
+
+A sweep runs its workload over each of its datasets for every reducer
+count, slowstart value and run; slowstart, reducers, runs, properties and
+repetition given on a sweep or workload override (properties, repetition:
+extend) the top-level ones. Disabled sweeps run only when named with
+--sweep. Datasets marked "optional" are skipped quietly when they have not
+been generated.
+
+With the "adaptive" repetition policy (or --adaptive) a configuration is
+not run a fixed `runs` times: it is repeated from min_runs up to max_runs
+times until the confidence interval of its mean job time is narrow enough
+(tools/repetition_policy.py); the runs each configuration took are
+reported and saved with the results.
+
+With --optimize (or "optimizer": {"enabled": true}) the slowstart grid is
+not swept at all: for every dataset and reducer count a Bayesian optimizer
+(tools/slowstart_optimizer.py), seeded from earlier results files, picks
+one slowstart after another until more runs are not expected to help, and
+reports the best value with its uncertainty.
+
+Adapters live in ADAPTERS; a workload may also name its own class as
+"module:Class" (importable from the matrix directory or EXP/tools).
+
+Jobs run one after another by default, each once the cluster has been
+idle for a moment (tools/cluster_quiescence.py; --no-quiescence sleeps the
+fixed pauses instead). With --concurrent (or
+"concurrency": {"enabled": true} in the matrix) every dataset is prepared
+first and independent jobs are then submitted side by side for as long as
+their estimated footprints fit the capacity the ResourceManager reports;
+each result records the capacity in use while it ran:
+
+    python3 ../task1/scripts/run_experiment.py --concurrent --queues exp_a,exp_b
+"""
+
+import argparse
+import glob
+import importlib
+import itertools
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import dataset_cache
+import datagen
+import hadoop_gateway
+import profile_input
+import repetition_policy
+import result_journal
+import slowstart_optimizer
+import validate_output
+
+HADOOP_HOME = os.environ.get('HADOOP_HOME', '/opt/hadoop')
+TERASORT_JAR = f'{HADOOP_HOME}/share/hadoop/mapreduce/hadoop-mapreduce-examples-*.jar'
+# TeraSort's Tool class, run by the resident job submitter
+TERASORT_CLASS = 'org.apache.hadoop.examples.terasort.TeraSort'
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Matrix defaults for keys a task may leave out
+MATRIX_DEFAULTS = {
+    'data_dir': 'data',
+    'results_dir': 'results',
+    'dataset_field': 'dataset',
+    'reducers': [4],
+    'runs': 3,
+    'properties': {},
+    'repetition': {},
+    'output': 'output_{workload}_{dataset}_r{reducers}_s{slowstart_pct:03d}_run{run}',
+    'job_name': None,
+    'pause_between_runs': 5,
+    'pause_between_configs': 10,
+    # Where TeraSort input comes from: 'local' streams TeraGen-identical records
+    # from this machine straight into HDFS (tools/teragen.py), 'mapreduce' runs
+    # the TeraGen job on the cluster
+    'teragen_mode': 'local',
+    'teragen_shards': 4,
+    'concurrency': {},
+    'quiescence': {},
+    'optimizer': {},
+}
+
+# Before each sequential job the engine waits until the cluster has been idle
+# for window_seconds (tools/cluster_quiescence.py) instead of sleeping
+# pause_between_runs / pause_between_configs, which remain the fallback when
+# the probe is disabled or the ResourceManager cannot be reached
+QUIESCENCE_DEFAULTS = {
+    'enabled': True,
+    'window_seconds': 3,
+    'poll_seconds': 1,
+    'timeout_seconds': 180,
+    'io_counters': False,
+    'io_threshold_mb_s': 1.0,
+}
+
+# Concurrent mode ("concurrency" in the matrix, or --concurrent): jobs are
+# submitted side by side while their footprints fit the cluster capacity the
+# ResourceManager reports (see tools/yarn_capacity.py). max_jobs 0 means
+# capacity alone limits them; queues pins every running job to its own queue
+CONCURRENCY_DEFAULTS = {
+    'enabled': False,
+    'max_jobs': 0,
+    'headroom': 0.9,
+    'queues': [],
+    'poll_seconds': 10,
+}
+
+# The optimizer moves on to the next configuration after this many failed runs
+OPTIMIZER_FAILURE_LIMIT = 3
+
+# Settings a sweep or workload may override
+SWEEP_SETTINGS = ('slowstart', 'reducers', 'runs', 'properties', 'repetition')
+
+
+def planned_runs(settings):
+    """Runs planned per configuration: `runs`, or max_runs under the adaptive policy."""
+    if settings['repetition']['policy'] == 'adaptive':
+        return settings['repetition']['max_runs']
+    return settings['runs']
+
+
+def config_key(job):
+    """Identity of a job's configuration: its job_key without the run number."""
+    return result_journal.job_key(job)[:-1]
+
+
+def resolve_local_input(data_dir, filename):
+    """
+    Locate a local dataset: the single file, the directory of part files
+    written by generate_data.py --shards (same name without the extension),
+    or the .hdfs pointer of a dataset streamed with --hdfs-dir. A compressed
+    file (name plus .gz/.bz2/.zst) is used when the plain file is absent.
+    """
+    local_file = os.path.join(data_dir, filename)
+    shard_dir = os.path.splitext(local_file)[0]
+    # generate_data.py --compression appends the codec extension
+    for ext, _ in datagen.CODECS.values():
+        if not os.path.exists(local_file) and os.path.exists(local_file + ext):
+            return local_file + ext
+    if not os.path.exists(local_file) and os.path.isdir(shard_dir):
+        return shard_dir
+    # Streamed with generate_data.py --hdfs-dir: only a pointer exists locally
+    if not os.path.exists(local_file) and os.path.exists(shard_dir + datagen.HDFS_POINTER_EXT):
+        return shard_dir + datagen.HDFS_POINTER_EXT
+    return local_file
+
+
+def read_hdfs_pointer(path):
+    """HDFS directory recorded by generate_data.py --hdfs-dir, or None for local data."""
+    if not path.endswith(datagen.HDFS_POINTER_EXT):
+        return None
+    with open(path) as f:
+        return json.load(f)['hdfs_path']
+
+
+def read_nested_base(path):
+    """
+    Local dataset that a generate_data.py --incremental dataset extends, or None.
+
+    Its _SHARDS.json names the sibling directory whose part files it links in.
+    """
+    manifest = os.path.join(path, datagen.SHARD_MANIFEST)
+    if not os.path.isdir(path) or not os.path.exists(manifest):
+        return None
+    with open(manifest) as f:
+        base = json.load(f).get('extends')
+    return os.path.join(os.path.dirname(path), base) if base else None
+
+
+def extract_job_info(output):
+    """Job ID and application ID from the output of `hadoop jar`."""
+    job_id = None
+    application_id = None
+    for line in output.split('\n'):
+        if 'Running job:' in line:
+            match = re.search(r'job_\d+_\d+', line)
+            if match:
+                job_id = match.group(0)
+        if 'Submitted application' in line:
+            match = re.search(r'application_\d+_\d+', line)
+            if match:
+                application_id = match.group(0)
+    return job_id, application_id
+
+
+def property_args(properties):
+    """-Dkey=value arguments for Hadoop's GenericOptionsParser."""
+    return ' '.join(f"-D{key}={shlex.quote(str(value))}" for key, value in properties.items())
+
+
+def property_list(properties):
+    """-Dkey=value arguments as a list, unquoted (for the job submitter)."""
+    return [f"-D{key}={value}" for key, value in properties.items()]
+
+
+class WorkloadAdapter:
+    """
+    How one kind of job is prepared, submitted and checked.
+
+    spec is the workload's entry in the matrix; its "record" fields are
+    copied into every result of the workload.
+    """
+
+    def __init__(self, engine, name, spec):
+        self.engine = engine
+        self.name = name
+        self.spec = spec
+
+    def preflight(self):
+        """Error message when the workload cannot run here, else None."""
+        return None
+
+    def prepare(self, dataset):
+        """Make a dataset available in HDFS; returns the job input path(s)."""
+        raise NotImplementedError
+
+    def command(self, job, hdfs_input):
+        """Shell command that runs one job of the plan."""
+        raise NotImplementedError
+
+    def submission(self, job, hdfs_input):
+        """
+        (jar, main class, arguments) for the resident job submitter, or None
+        to always run command() instead.
+        """
+        return None
+
+    def check_output(self, job, hdfs_input):
+        """True/False after checking the job output, or None when it is not checked."""
+        return None
+
+    def record(self):
+        """Fields recorded with every result of this workload."""
+        return dict(self.spec.get('record', {}))
+
+
+class WordCountAdapter(WorkloadAdapter):
+    """
+    The task's WordCount.jar over an uploaded dataset.
+
+    Options: "jar" (relative to the matrix), "input_format" (text, seq or
+    seqids; see task3), "combiner" (true/false; unset keeps the program's
+    default) and "verify" (check output against the count manifest).
+    """
+
+    def __init__(self, engine, name, spec):
+        super().__init__(engine, name, spec)
+        self.jar = engine.local_path(spec.get('jar', 'wordcount.jar'))
+        self.input_format = spec.get('input_format', 'text')
+
+    def preflight(self):
+        if not os.path.exists(self.jar):
+            return (f"WordCount JAR not found at {self.jar}\n"
+                    f"  Please compile WordCount.java first:\n"
+                    f"  cd {os.path.dirname(self.jar)} && ./compile.sh")
+        return None
+
+    def prepare(self, dataset):
+        return self.engine.upload_dataset(dataset)
+
+    def job_properties(self, job):
+        properties = dict(job['properties'])
+        if self.spec.get('combiner') is not None:
+            properties['wordcount.combiner'] = str(bool(self.spec['combiner'])).lower()
+        if job['job_name']:
+            properties['mapreduce.job.name'] = job['job_name']
+        return properties
+
+    def job_args(self, job, hdfs_input):
+        """WordCount's positional arguments: input, output, slowstart, reducers[, input format]."""
+        args = [hdfs_input, job['output_dir'], str(job['slowstart']), str(job['reducers'])]
+        if self.input_format != 'text':
+            args.append(self.input_format)
+        return args
+
+    def command(self, job, hdfs_input):
+        return (f"hadoop jar {self.jar} WordCount {property_args(self.job_properties(job))} "
+                f"{' '.join(self.job_args(job, hdfs_input))}")
+
+    def submission(self, job, hdfs_input):
+        return self.jar, 'WordCount', property_list(self.job_properties(job)) + self.job_args(job, hdfs_input)
+
+    def check_output(self, job, hdfs_input):
+        if not self.spec.get('verify', True):
+            return None
+        return self.engine.verify_output(hdfs_input, job['output_dir'],
+                                         ids=self.input_format == 'seqids')
+
+    def record(self):
+        fields = super().record()
+        if self.spec.get('combiner') is not None:
+            fields.setdefault('combiner', bool(self.spec['combiner']))
+        return fields
+
+
+class TeraSortAdapter(WorkloadAdapter):
+    """TeraSort from the Hadoop examples JAR over TeraGen records."""
+
+    def __init__(self, engine, name, spec):
+        super().__init__(engine, name, spec)
+        self.jar = None
+
+    def preflight(self):
+        self.jar = self.engine.get_terasort_jar()
+        if not self.jar:
+            return (f"TeraSort JAR not found\n"
+                    f"  Expected location: {TERASORT_JAR}\n"
+                    f"  Please check Hadoop installation and HADOOP_HOME environment variable")
+        return None
+
+    def prepare(self, dataset):
+        return self.engine.generate_teragen(dataset)
+
+    def job_properties(self, job):
+        properties = {
+            'mapreduce.job.reduce.slowstart.completedmaps': job['slowstart'],
+            'mapreduce.job.reduces': job['reducers'],
+        }
+        if job['job_name']:
+            properties['mapreduce.job.name'] = job['job_name']
+        properties.update(job['properties'])
+        return properties
+
+    def command(self, job, hdfs_input):
+        return (f"hadoop jar {self.jar} terasort {property_args(self.job_properties(job))} "
+                f"{hdfs_input} {job['output_dir']}")
+
+    def submission(self, job, hdfs_input):
+        return self.jar, TERASORT_CLASS, property_list(self.job_properties(job)) + [hdfs_input, job['output_dir']]
+
+
+ADAPTERS = {
+    'wordcount': WordCountAdapter,
+    'terasort': TeraSortAdapter,
+}
+
+
+def load_adapter(name, matrix_dir):
+    """Adapter class for a matrix "adapter" entry: a key of ADAPTERS or module:Class."""
+    if name in ADAPTERS:
+        return ADAPTERS[name]
+    module_name, sep, class_name = name.partition(':')
+    if not sep:
+        raise ValueError(f"Unknown workload adapter '{name}' (choose from {', '.join(ADAPTERS)} "
+                         f"or give module:Class)")
+    if matrix_dir not in sys.path:
+        sys.path.insert(0, matrix_dir)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def load_matrix(path):
+    """Read an experiment matrix and fill in the defaults; raises ValueError when malformed."""
+    with open(path) as f:
+        try:
+            matrix = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from None
+    for key, value in MATRIX_DEFAULTS.items():
+        matrix.setdefault(key, value)
+    for key in ('hdfs_base_dir', 'workloads', 'datasets', 'sweeps'):
+        if key not in matrix:
+            raise ValueError(f"{path}: missing '{key}'")
+
+    names = set()
+    for sweep in matrix['sweeps']:
+        sweep.setdefault('name', sweep.get('workload'))
+        if sweep['name'] in names:
+            raise ValueError(f"{path}: duplicate sweep '{sweep['name']}'")
+        names.add(sweep['name'])
+        if sweep.get('workload') not in matrix['workloads']:
+            raise ValueError(f"{path}: sweep '{sweep['name']}' names unknown workload "
+                             f"'{sweep.get('workload')}'")
+        for key in sweep.get('datasets', []):
+            if key not in matrix['datasets']:
+                raise ValueError(f"{path}: sweep '{sweep['name']}' names unknown dataset '{key}'")
+        settings = {key: matrix.get(key) for key in SWEEP_SETTINGS}
+        workload = matrix['workloads'][sweep['workload']]
+        for layer in (workload, sweep):
+            for key in SWEEP_SETTINGS:
+                if key in ('properties', 'repetition'):
+                    settings[key] = {**settings[key], **layer.get(key, {})}
+                elif key in layer:
+                    settings[key] = layer[key]
+        if not settings['slowstart']:
+            raise ValueError(f"{path}: sweep '{sweep['name']}' has no slowstart values")
+        settings['reducers'] = [settings['reducers']] if isinstance(settings['reducers'], int) \
+            else settings['reducers']
+        settings['repetition'] = {**repetition_policy.REPETITION_DEFAULTS, **settings['repetition']}
+        repetition_policy.validate(settings['repetition'], f"{path}: sweep '{sweep['name']}'")
+        sweep['settings'] = settings
+
+    for key, dataset in matrix['datasets'].items():
+        dataset.setdefault('label', key)
+        if ('file' in dataset) == ('teragen_records' in dataset):
+            raise ValueError(f"{path}: dataset '{key}' needs exactly one of 'file' or 'teragen_records'")
+    return matrix
+
+
+class ExperimentEngine:
+    def __init__(self, matrix_path, sweeps=None):
+        self.matrix_path = os.path.abspath(matrix_path)
+        self.matrix_dir = os.path.dirname(self.matrix_path)
+        self.matrix = load_matrix(self.matrix_path)
+        self.hdfs_base_dir = self.matrix['hdfs_base_dir']
+        self.data_dir = self.local_path(self.matrix['data_dir'])
+        self.results_dir = self.local_path(self.matrix['results_dir'])
+
+        known = [sweep['name'] for sweep in self.matrix['sweeps']]
+        unknown = [name for name in sweeps or [] if name not in known]
+        if unknown:
+            raise ValueError(f"Unknown sweep(s): {', '.join(unknown)} (matrix has {', '.join(known)})")
+        self.sweeps = [
+            sweep for sweep in self.matrix['sweeps']
+            if (sweep['name'] in sweeps if sweeps else sweep.get('enabled', True))
+        ]
+        self.adapters = {}
+        for sweep in self.sweeps:
+            name = sweep['workload']
+            if name not in self.adapters:
+                spec = self.matrix['workloads'][name]
+                self.adapters[name] = load_adapter(spec.get('adapter', name), self.matrix_dir)(self, name, spec)
+
+        concurrency = {**CONCURRENCY_DEFAULTS, **self.matrix['concurrency']}
+        self.concurrency = concurrency if concurrency['enabled'] else None
+        self.quiescence = {**QUIESCENCE_DEFAULTS, **self.matrix['quiescence']}
+        self._probe = None
+        self._log = threading.local()
+        # HDFS housekeeping over WebHDFS instead of an hdfs client JVM per call
+        self.gateway = hadoop_gateway.HadoopGateway(self.run_command)
+        # Jobs go through one resident client JVM instead of `hadoop jar` each
+        self.submitter = hadoop_gateway.JobSubmitter(
+            self.gateway, os.path.join(self.results_dir, 'job_submitter.log'))
+
+        # Slowstart search instead of the grid (see slowstart_optimizer.py)
+        optimizer = {**slowstart_optimizer.OPTIMIZER_DEFAULTS, **self.matrix['optimizer']}
+        self.optimizer = optimizer if optimizer['enabled'] else None
+        self.optimizer_results = []
+
+        # Finished jobs of an interrupted campaign are kept here and skipped
+        self.journal = self.open_journal()
+
+        self.results = []
+        # Runs and confidence interval of every configuration, by config_key
+        self.repetition = {}
+        self.input_formats = {}
+        self.count_manifests = {}
+        self.prepared_inputs = {}
+        self.experiment_start_time = datetime.now()
+
+    def local_path(self, path):
+        """A matrix path, relative to the matrix file."""
+        return os.path.normpath(os.path.join(self.matrix_dir, path))
+
+    def enable_concurrency(self, max_jobs=None, queues=None):
+        """Switch to concurrent submission, overriding the matrix's limit and queues when given."""
+        self.concurrency = {**CONCURRENCY_DEFAULTS, **self.matrix['concurrency'], 'enabled': True}
+        if max_jobs is not None:
+            self.concurrency['max_jobs'] = max_jobs
+        if queues:
+            self.concurrency['queues'] = queues
+
+    def open_journal(self):
+        """Journal of the selected sweeps; optimizer campaigns keep their own."""
+        sweeps = '+'.join(sweep['name'] for sweep in self.sweeps)
+        if self.optimizer:
+            sweeps += '.optimize'
+        return result_journal.ResultJournal(
+            os.path.join(self.results_dir, result_journal.JOURNAL_FILE.format(sweeps=sweeps)))
+
+    def enable_optimizer(self):
+        """Search slowstart with the optimizer instead of sweeping the grid."""
+        self.optimizer = {**slowstart_optimizer.OPTIMIZER_DEFAULTS, **self.matrix['optimizer'], 'enabled': True}
+        self.journal = self.open_journal()
+
+    def set_repetition_policy(self, policy):
+        """Use a repetition policy ('fixed' or 'adaptive') for every selected sweep."""
+        for sweep in self.sweeps:
+            sweep['settings']['repetition']['policy'] = policy
+
+    def log(self, message=''):
+        """Print a progress line; a job running in a worker thread keeps its lines until it finishes."""
+        lines = getattr(self._log, 'lines', None)
+        if lines is None:
+            print(message)
+        else:
+            lines.append(message)
+
+    def run_command(self, command, shell=True):
+        """Execute shell command and return output."""
+        try:
+            result = subprocess.run(
+                command,
+                shell=shell,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            return result.stdout, result.stderr, 0
+        except subprocess.CalledProcessError as e:
+            return e.stdout, e.stderr, e.returncode
+
+    def get_terasort_jar(self):
+        """Find the TeraSort example JAR file."""
+        jar_files = sorted(glob.glob(TERASORT_JAR))
+        return jar_files[0] if jar_files else None
+
+    def dataset_file(self, key):
+        """Local path of a file dataset (see resolve_local_input), or None for TeraGen datasets."""
+        dataset = self.matrix['datasets'][key]
+        if 'file' not in dataset:
+            return None
+        return resolve_local_input(self.data_dir, dataset['file'])
+
+    def dataset_available(self, key):
+        """Whether a dataset can be used: TeraGen datasets always, files once generated."""
+        local_file = self.dataset_file(key)
+        return local_file is None or os.path.exists(local_file)
+
+    def plan(self):
+        """
+        Expand the selected sweeps into the job plan.
+
+        Jobs of datasets that have not been generated are left out.
+
+        Returns:
+            List of job dicts, in run order
+        """
+        jobs = []
+        for sweep in self.sweeps:
+            settings = sweep['settings']
+            for key in sweep.get('datasets', []):
+                if not self.dataset_available(key):
+                    continue
+                runs = planned_runs(settings)
+                for reducers, slowstart, run in itertools.product(
+                        settings['reducers'], settings['slowstart'], range(1, runs + 1)):
+                    jobs.append(self.make_job(sweep, key, reducers, slowstart, run, runs))
+        return jobs
+
+    def make_job(self, sweep, key, reducers, slowstart, run, runs):
+        """One job of a sweep: dataset `key` with the given reducers, slowstart and run number."""
+        settings = sweep['settings']
+        fields = {
+            'sweep': sweep['name'],
+            'workload': sweep['workload'],
+            'dataset': self.matrix['datasets'][key]['label'],
+            'slowstart': slowstart,
+            'slowstart_pct': int(round(slowstart * 100)),
+            'reducers': reducers,
+            'run': run,
+        }
+        job_name = sweep.get('job_name', self.matrix['job_name'])
+        return {
+            **fields,
+            'dataset_key': key,
+            'runs': runs,
+            'properties': settings['properties'],
+            'repetition': settings['repetition'],
+            'output_dir': f"{self.hdfs_base_dir}/"
+                          f"{sweep.get('output', self.matrix['output']).format(**fields)}",
+            'job_name': job_name.format(**fields) if job_name else None,
+        }
+
+    def describe_input(self, hdfs_input_dir):
+        """
+        Codec and splittability of a job's input files (looked up once per directory).
+
+        'input_files' holds the files as profile_input.InputFiles, for counting
+        the job's map tasks split by split.
+        """
+        if hdfs_input_dir not in self.input_formats:
+            # Nested datasets are a comma-separated list of directories
+            files = [
+                profile_input.InputFile(f"{directory.rstrip('/')}/{name}", size, hdfs=True)
+                for directory in hdfs_input_dir.split(',')
+                for name, size in sorted(self.gateway.file_sizes(directory).items())
+                if not name.startswith(('_', '.'))
+            ]
+            codec, splittable = 'none', True
+            for name, (ext, can_split) in datagen.CODECS.items():
+                if any(f.path.endswith(ext) for f in files):
+                    codec, splittable = name, can_split
+            self.input_formats[hdfs_input_dir] = {
+                'codec': codec,
+                'splittable': splittable,
+                'files': len(files),
+                'input_files': files,
+            }
+        return self.input_formats[hdfs_input_dir]
+
+    def verify_output(self, hdfs_input_dir, output_dir, ids=False):
+        """
+        Compare a WordCount output with the exact key counts recorded by generate_data.py.
+
+        Returns True or False, or None when the input has no count manifest.
+        """
+        manifest = self.count_manifests.get(hdfs_input_dir)
+        if not manifest:
+            return None
+        try:
+            report = validate_output.validate_counts(manifest, output_dir, ids=ids)
+        except OSError as e:
+            self.log(f"    ⚠ Warning: Could not read job output for validation: {e}")
+            return None
+        self.log(f"    {'✓' if report['valid'] else '✗'} Output check: {validate_output.summarize(report)}")
+        for example in report['examples']:
+            self.log(f"      {example}")
+        return report['valid']
+
+    def upload_dataset(self, key):
+        """Upload a file dataset to HDFS (once per run); returns the job input."""
+        if key not in self.prepared_inputs:
+            local_file = self.dataset_file(key)
+            hdfs_input = self._upload_dataset(key, local_file)
+            self.count_manifests[hdfs_input] = validate_output.find_count_manifest(local_file)
+            self.prepared_inputs[key] = hdfs_input
+        return self.prepared_inputs[key]
+
+    def _upload_dataset(self, key, local_file):
+        """Upload one dataset; returns the job input (HDFS directories, comma-separated)."""
+        dataset = self.matrix['datasets'][key]
+        hdfs_input_dir = f"{self.hdfs_base_dir}/{dataset.get('hdfs_name', f'input_{key}')}"
+
+        print(f"\n  Uploading {dataset['label']} data to HDFS...")
+        print(f"  Local file: {local_file}")
+        print(f"  HDFS path: {hdfs_input_dir}")
+
+        # Data streamed straight into HDFS is used in place
+        streamed_dir = read_hdfs_pointer(local_file)
+        if streamed_dir:
+            print(f"  ✓ Using data streamed to HDFS: {streamed_dir}")
+            return streamed_dir
+
+        # Datasets linked from the shared cache are uploaded once and reused
+        cache = dataset_cache.DatasetCache()
+        cache_key = cache.key_for_path(local_file)
+        if cache_key:
+            start_time = time.time()
+            try:
+                cached_dir, uploaded = cache.ensure_hdfs(cache_key, self.run_command)
+            except OSError as e:
+                print(f"  ✗ Upload failed: {e}")
+                sys.exit(1)
+            if uploaded:
+                print(f"  ✓ Uploaded cached dataset {cache_key} in {time.time() - start_time:.2f} seconds")
+            else:
+                print(f"  ✓ Reusing cached dataset {cache_key} (checksum verified): {cached_dir}")
+            return cached_dir
+
+        # Remove existing directory
+        self.gateway.delete(hdfs_input_dir)
+
+        # Create input directory
+        self.gateway.mkdir(hdfs_input_dir)
+
+        # Upload file (a shard directory uploads its part files side by side)
+        source = f"{local_file}/part-*" if os.path.isdir(local_file) else local_file
+
+        # A nested dataset (generate_data.py --incremental) uploads only its own
+        # part files; the job reads them together with the dataset it extends
+        base_input = None
+        base_file = read_nested_base(local_file)
+        base_key = next((other for other in self.matrix['datasets']
+                         if base_file and self.dataset_file(other) == base_file), None)
+        if base_key:
+            print(f"  Extends {self.matrix['datasets'][base_key]['label']}: uploading the increment only")
+            base_input = self.upload_dataset(base_key)
+            source = ' '.join(
+                os.path.join(local_file, name) for name in sorted(os.listdir(local_file))
+                if name.startswith('part-') and not os.path.islink(os.path.join(local_file, name))
+            )
+        start_time = time.time()
+        stdout, stderr, code = self.run_command(
+            f"hdfs dfs -put {source} {hdfs_input_dir}/"
+        )
+        upload_time = time.time() - start_time
+
+        if code == 0:
+            print(f"  ✓ Upload completed in {upload_time:.2f} seconds")
+            return f"{base_input},{hdfs_input_dir}" if base_input else hdfs_input_dir
+        else:
+            print(f"  ✗ Upload failed: {stderr}")
+            sys.exit(1)
+
+    def generate_teragen(self, key):
+        """Generate a TeraGen dataset in HDFS (once per run); returns the job input."""
+        if key in self.prepared_inputs:
+            return self.prepared_inputs[key]
+        dataset = self.matrix['datasets'][key]
+        hdfs_input_dir = f"{self.hdfs_base_dir}/{dataset.get('hdfs_name', f'input_{key}')}"
+        num_records = dataset['teragen_records']
+
+        print(f"\n  Generating TeraSort {dataset['label']} data using TeraGen...")
+        print(f"  Records: {num_records:,} (~{dataset['label']})")
+        print(f"  HDFS path: {hdfs_input_dir}")
+
+        # Remove existing directory
+        self.gateway.delete(hdfs_input_dir)
+
+        start_time = time.time()
+        if self.matrix['teragen_mode'] == 'local':
+            print(f"  Mode: local ({self.matrix['teragen_shards']} parallel streams)")
+            try:
+                datagen.generate_teragen(datagen.hdfs_uri(hdfs_input_dir), num_records,
+                                         shards=self.matrix['teragen_shards'], progress_prefix='  ')
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"  ✗ Local TeraGen failed: {e}")
+                sys.exit(1)
+            print(f"  ✓ Local TeraGen completed in {time.time() - start_time:.2f} seconds")
+        else:
+            terasort_jar = self.get_terasort_jar()
+            if not terasort_jar:
+                print("  ✗ Error: TeraSort JAR not found")
+                sys.exit(1)
+            cmd = f"hadoop jar {terasort_jar} teragen {num_records} {hdfs_input_dir}"
+            print(f"  Command: {cmd}")
+            stdout, stderr, code = self.run_command(cmd)
+            if code != 0:
+                print(f"  ✗ TeraGen failed: {stderr[:500]}")
+                sys.exit(1)
+            print(f"  ✓ TeraGen completed in {time.time() - start_time:.2f} seconds")
+
+        self.prepared_inputs[key] = hdfs_input_dir
+        return hdfs_input_dir
+
+    def clean_output_dir(self, output_dir):
+        """Remove HDFS output directory if it exists."""
+        ok, error = self.gateway.delete(output_dir)
+        if not ok:
+            self.log(f"    ⚠ Warning: Failed to clean output directory")
+            self.log(f"    Error: {error[:200]}")
+            # Try to check if directory exists
+            if self.gateway.exists(output_dir):
+                self.log(f"    ✗ Error: Output directory exists and couldn't be removed!")
+                self.log(f"    Please manually remove: hdfs dfs -rm -r {output_dir}")
+                sys.exit(1)
+
+    def run_job(self, job, hdfs_input):
+        """Run one job of the plan; returns its result record, or None when it failed."""
+        adapter = self.adapters[job['workload']]
+
+        self.log(f"\n    Run #{job['run']}: slowstart={job['slowstart']}")
+        self.log(f"    Output: {job['output_dir']}")
+        if job['job_name']:
+            self.log(f"    Job Name: {job['job_name']}")
+
+        # Clean output directory
+        self.clean_output_dir(job['output_dir'])
+
+        outcome = None
+        submission = adapter.submission(job, hdfs_input) if self.submitter.start() else None
+        if submission:
+            self.log(f"    Submitted to resident client: {submission[1]} {' '.join(submission[2])}")
+            start_time = time.time()
+            submit_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                outcome = self.submitter.run(*submission)
+            except OSError as e:
+                self.log(f"    ⚠ Warning: Job submitter unreachable ({e}); running with hadoop jar")
+            total_time = time.time() - start_time
+
+        if outcome is not None:
+            job_id, application_id = outcome['job_id'], outcome['application_id']
+            code, error = outcome['exit_code'], outcome['error']
+        else:
+            cmd = adapter.command(job, hdfs_input)
+            self.log(f"    Command: {cmd}")
+
+            # Record start time
+            start_time = time.time()
+            submit_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            # Run the job
+            stdout, stderr, code = self.run_command(cmd)
+            total_time = time.time() - start_time
+
+            job_id, application_id = extract_job_info(stdout + stderr)
+            error = stderr
+
+        if code != 0:
+            self.log(f"    ✗ Job failed with exit code {code}")
+            self.log(f"    Error: {error[:500]}")
+            return None
+
+        # The RM's timestamps split the client's start-up (and exit) off the
+        # time the application spent on the cluster
+        app_times = self.gateway.application_times(application_id)
+        timing = {}
+        if app_times:
+            timing = {
+                'client_startup_time': max(app_times['started'] - start_time, 0.0),
+                'job_time': app_times['finished'] - app_times['started'],
+                'client_exit_time': max(start_time + total_time - app_times['finished'], 0.0),
+            }
+
+        self.log(f"    ✓ Job completed successfully in {total_time:.2f} seconds"
+                 + (f" ({timing['job_time']:.2f} on the cluster, client start-up "
+                    f"{timing['client_startup_time']:.2f})" if timing else ''))
+        if job_id:
+            self.log(f"    Job ID: {job_id}")
+        if application_id:
+            self.log(f"    Application ID: {application_id}")
+
+        # Codec and splittability set how many map tasks read the input
+        input_format = self.describe_input(hdfs_input)
+        self.log(f"    Input: {input_format['codec']} "
+                 f"({'splittable' if input_format['splittable'] else 'one map per file'}, "
+                 f"{input_format['files']} files)")
+
+        # Reject runs whose output disagrees with the generator's ground truth
+        verified = adapter.check_output(job, hdfs_input)
+        if verified is False:
+            return None
+
+        # Only record basic info, detailed timing will be extracted later
+        metrics = {
+            **adapter.record(),
+            self.matrix['dataset_field']: job['dataset'],
+            'slowstart': job['slowstart'],
+            'run_number': job['run'],
+            'job_id': job_id or 'unknown',
+            'application_id': application_id or 'unknown',
+            'submit_time': submit_time,
+            'total_time': total_time,
+            **timing,
+            'job_client': 'resident' if outcome is not None else 'hadoop_jar',
+            'num_reducers': job['reducers'],
+            'input_codec': input_format['codec'],
+            'input_splittable': input_format['splittable'],
+            'input_files': input_format['files'],
+        }
+        if isinstance(adapter, WordCountAdapter):
+            metrics['output_verified'] = verified
+        if job['properties']:
+            metrics['job_properties'] = job['properties']
+
+        # The adaptive policy and the optimizer judge the JobHistory job time as
+        # soon as the run is done, not only after enhance_results
+        if job_id and self.needs_api_time(job):
+            try:
+                import extract_job_timing
+            except ImportError as e:
+                self.log(f"    ⚠ Warning: No JobHistory job time ({e})")
+            else:
+                metrics['total_time_from_api'] = extract_job_timing.fetch_total_time(job_id)
+                if metrics['total_time_from_api'] is None:
+                    self.log(f"    ⚠ Warning: {job_id} not in JobHistory yet; judged on total_time only")
+                else:
+                    self.log(f"    JobHistory job time: {metrics['total_time_from_api']:.2f} seconds")
+
+        return metrics
+
+    def needs_api_time(self, job):
+        """Whether a job's total_time_from_api is wanted right after it finishes."""
+        repetition = job['repetition']
+        if repetition['policy'] == 'adaptive' and 'total_time_from_api' in repetition['metrics']:
+            return True
+        return bool(self.optimizer) and self.optimizer['metric'] == 'total_time_from_api'
+
+    def prepare_group(self, job):
+        """Announce a (sweep, dataset) group and prepare its input; returns the job input."""
+        field = self.matrix['dataset_field'].replace('_', ' ')
+        print(f"\n{'='*80}")
+        print(f"Testing {job['workload']} with {field}: {job['dataset']}")
+        print(f"{'='*80}")
+        local_file = self.dataset_file(job['dataset_key'])
+        if local_file:
+            print(f"File: {os.path.basename(local_file)} "
+                  f"({datagen.dataset_size(local_file) / datagen.GB:.2f}GB)")
+        return self.adapters[job['workload']].prepare(job['dataset_key'])
+
+    def run_plan(self, jobs):
+        """Run the job plan, preparing each dataset before its first job."""
+        current = None
+        for job in jobs:
+            if not self.needs_run(job):
+                continue
+            group = (job['sweep'], job['dataset_key'])
+            if group != current:
+                current = group
+                hdfs_input = self.prepare_group(job)
+                pause, following = None, None
+            elif job['run'] > 1:
+                pause, following = self.matrix['pause_between_runs'], 'run'
+            else:
+                pause, following = self.matrix['pause_between_configs'], 'configuration'
+
+            if job['run'] == 1:
+                print(f"\n  {'─'*76}")
+                print(f"  Testing slowstart = {job['slowstart']}"
+                      + (f", reducers = {job['reducers']}" if len(self.reducer_counts()) > 1 else ''))
+                print(f"  {'─'*76}")
+
+            settled = self.settle(pause, following)
+            metrics = self.run_job(job, hdfs_input)
+            if metrics:
+                metrics.update(settled)
+                self.record_result(job, metrics)
+            self.count_run(job, metrics)
+
+    def record_result(self, job, metrics):
+        """Keep a finished job's result, journaled to disk before the next job starts."""
+        self.results.append(self.journal.append(job, metrics))
+
+    def repetition_state(self, job):
+        """Runs so far of a job's configuration and whether the repetition policy stopped it."""
+        key = config_key(job)
+        if key not in self.repetition:
+            self.repetition[key] = {
+                'job': job,
+                'policy': repetition_policy.RepetitionPolicy(**job['repetition']),
+                'adaptive': job['repetition']['policy'] == 'adaptive',
+                'attempts': 0,
+                'results': [],
+                'assessment': None,
+                'stopped': None,
+            }
+        return self.repetition[key]
+
+    def needs_run(self, job):
+        """False once the adaptive policy has stopped the job's configuration."""
+        state = self.repetition.get(config_key(job))
+        return not (state and state['stopped'])
+
+    def count_run(self, job, metrics, quiet=False):
+        """
+        Count a run of a configuration (metrics None: it failed) and apply the policy.
+
+        An adaptive configuration stops once its intervals are narrow enough
+        or all of its planned runs are used up.
+        """
+        state = self.repetition_state(job)
+        state['attempts'] += 1
+        if metrics:
+            state['results'].append(metrics)
+        state['assessment'] = state['policy'].assess(state['results'])
+        if not state['adaptive'] or state['stopped']:
+            return
+        if state['assessment']['converged']:
+            state['stopped'] = 'converged'
+        elif state['attempts'] >= job['runs']:
+            state['stopped'] = 'max_runs'
+        else:
+            return
+        if quiet:
+            return
+        summary = repetition_policy.describe(state['assessment'])
+        if state['stopped'] == 'converged':
+            print(f"    ✓ Converged after {len(state['results'])} run(s): {summary}")
+        else:
+            print(f"    ⚠ Warning: Interval still wide after {state['attempts']} run(s): {summary}")
+
+    def settle(self, pause=None, following='run'):
+        """
+        Wait for the cluster to go idle before a job.
+
+        Without the quiescence probe (disabled, or the RM unreachable) this
+        sleeps the fixed pause instead; pause None is the first job of a
+        dataset, which the old fixed sleeps never delayed.
+
+        Returns:
+            Fields recorded with the job: quiescence_wait (seconds) and
+            quiescence_mode ('probe', 'timeout' or 'sleep')
+        """
+        if self.quiescence['enabled']:
+            try:
+                if self._probe is None:
+                    import cluster_quiescence
+                    self._probe = cluster_quiescence.QuiescenceProbe(
+                        window=self.quiescence['window_seconds'],
+                        poll=self.quiescence['poll_seconds'],
+                        timeout=self.quiescence['timeout_seconds'],
+                        io_counters=self.quiescence['io_counters'],
+                        io_threshold_mb_s=self.quiescence['io_threshold_mb_s'])
+                result = self._probe.wait()
+            except (ImportError, OSError) as e:
+                print(f"    ⚠ Warning: Quiescence probe unavailable ({e}); using fixed pauses")
+                self.quiescence['enabled'] = False
+            else:
+                if result['timed_out']:
+                    print(f"    ⚠ Warning: Cluster still busy after {result['waited']:.1f} seconds "
+                          f"({'; '.join(result['busy'])}); starting anyway")
+                else:
+                    print(f"    Cluster idle after {result['waited']:.1f} seconds"
+                          + (f" (waited for: {'; '.join(result['busy'])})" if result['busy'] else ''))
+                return {'quiescence_wait': round(result['waited'], 2),
+                        'quiescence_mode': 'timeout' if result['timed_out'] else 'probe'}
+
+        if not pause:
+            return {'quiescence_wait': 0.0, 'quiescence_mode': 'sleep'}
+        print(f"    Waiting {pause} seconds before next {following}...")
+        time.sleep(pause)
+        return {'quiescence_wait': float(pause), 'quiescence_mode': 'sleep'}
+
+    def _run_job_buffered(self, job, hdfs_input):
+        """run_job in a worker thread; returns (progress lines, result record or None)."""
+        self._log.lines = []
+        try:
+            return self._log.lines, self.run_job(job, hdfs_input)
+        finally:
+            self._log.lines = None
+
+    def run_plan_concurrent(self, jobs):
+        """
+        Run the job plan with independent jobs side by side.
+
+        Every dataset is prepared up front. A job is submitted when its
+        footprint fits next to the running ones (yarn_capacity.CapacityPlanner);
+        there are no pauses between jobs. Falls back to run_plan when the
+        ResourceManager cannot be reached.
+        """
+        settings = self.concurrency
+        try:
+            # requests is only needed when jobs run side by side
+            import yarn_capacity
+            planner = yarn_capacity.CapacityPlanner(headroom=settings['headroom'],
+                                                    max_jobs=settings['max_jobs'],
+                                                    queues=settings['queues'])
+        except (ImportError, OSError) as e:
+            print(f"\n⚠ Warning: {e}")
+            print("  Running jobs one after another instead")
+            return self.run_plan(jobs)
+
+        inputs = {}
+        for job in jobs:
+            group = (job['sweep'], job['dataset_key'])
+            if group not in inputs:
+                inputs[group] = self.prepare_group(job)
+
+        footprints = [
+            yarn_capacity.job_footprint(
+                self.describe_input(inputs[(job['sweep'], job['dataset_key'])])['input_files'],
+                job['reducers'], job['properties'])
+            for job in jobs
+        ]
+        largest = max(footprints, key=lambda footprint: footprint['memory_mb'])
+        print(f"\n{'='*80}")
+        print(f"Concurrent submission: {planner.metrics['total_mb']:,} MB cluster, "
+              f"{planner.others_mb:,} MB held by other applications, headroom {settings['headroom']:.0%}")
+        print(f"  Largest job: {largest['containers']} containers, {largest['memory_mb']:,} MB "
+              f"-> at least {planner.parallelism(largest)} job(s) side by side")
+        if settings['queues']:
+            print(f"  Queues: {', '.join(settings['queues'])}")
+        print(f"{'='*80}")
+
+        start_time = time.time()
+        job_seconds = 0.0
+        submitted = 0
+        pending = list(range(len(jobs)))
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(len(jobs), 1)) as pool:
+            while pending or running:
+                pending = [index for index in pending if self.needs_run(jobs[index])]
+                while pending:
+                    index = self.next_concurrent(jobs, pending, running)
+                    if index is None:
+                        break
+                    admitted, queue = planner.admit(index, footprints[index])
+                    if not admitted:
+                        break
+                    pending.remove(index)
+                    submitted += 1
+                    job = jobs[index]
+                    if queue:
+                        job = {**job, 'properties': {**job['properties'], 'mapreduce.job.queuename': queue}}
+                    capacity = {
+                        **planner.snapshot(),
+                        'footprint_mb': footprints[index]['memory_mb'],
+                        'queue': queue,
+                    }
+                    capacity['max_concurrent_jobs'] = capacity['concurrent_jobs']
+                    capacity['max_cluster_used_fraction'] = capacity['cluster_used_fraction']
+                    group = (job['sweep'], job['dataset_key'])
+                    running[pool.submit(self._run_job_buffered, job, inputs[group])] = (index, job, capacity)
+                    print(f"  → Submitted {job['sweep']} {job['dataset']} r={job['reducers']} "
+                          f"s={job['slowstart']} run {job['run']} "
+                          f"({capacity['concurrent_jobs']} running{f', queue {queue}' if queue else ''})")
+
+                done, _ = wait(running, timeout=settings['poll_seconds'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, job, capacity = running.pop(future)
+                    planner.release(index)
+                    lines, metrics = future.result()
+                    print(f"\n  [{job['sweep']}] {job['dataset']} r={job['reducers']} "
+                          f"s={job['slowstart']} run {job['run']}")
+                    print('\n'.join(lines))
+                    if metrics:
+                        metrics['cluster_capacity'] = capacity
+                        self.record_result(job, metrics)
+                        job_seconds += metrics['total_time']
+                    self.count_run(job, metrics)
+
+                try:
+                    planner.refresh()
+                except OSError as e:
+                    print(f"    ⚠ Warning: {e} (keeping the last capacity reading)")
+                snapshot = planner.snapshot()
+                for _, _, capacity in running.values():
+                    capacity['max_concurrent_jobs'] = max(capacity['max_concurrent_jobs'], len(running))
+                    capacity['max_cluster_used_fraction'] = max(capacity['max_cluster_used_fraction'],
+                                                                snapshot['cluster_used_fraction'])
+
+        wall_time = time.time() - start_time
+        print(f"\n✓ {submitted} job(s) in {wall_time:.0f} seconds wall-clock for {job_seconds:.0f} seconds "
+              f"of job time ({job_seconds / max(wall_time, 1e-9):.1f}x parallelism)")
+
+    def next_concurrent(self, jobs, pending, running):
+        """
+        First pending job that may start now, or None.
+
+        An adaptive configuration runs its first min_runs side by side; after
+        that one run at a time, so no run is spent once its interval is narrow.
+        """
+        in_flight = {}
+        for index, _, _ in running.values():
+            key = config_key(jobs[index])
+            in_flight[key] = in_flight.get(key, 0) + 1
+        for index in pending:
+            job = jobs[index]
+            if job['repetition']['policy'] != 'adaptive':
+                return index
+            state = self.repetition_state(job)
+            active = in_flight.get(config_key(job), 0)
+            if not active or state['attempts'] + active < state['policy'].min_runs:
+                return index
+        return None
+
+    def optimizer_groups(self):
+        """(sweep, dataset key, reducers) combinations the optimizer searches a slowstart for."""
+        return [(sweep, key, reducers)
+                for sweep in self.sweeps for key in sweep.get('datasets', []) if self.dataset_available(key)
+                for reducers in sweep['settings']['reducers']]
+
+    def slowstart_search(self, sweep, key, reducers):
+        """
+        Optimizer of one group, seeded from past results files and this campaign's journal.
+
+        Returns:
+            (optimizer, journaled records of the group)
+        """
+        settings = self.optimizer
+        label = self.matrix['datasets'][key]['label']
+        optimizer = slowstart_optimizer.SlowstartOptimizer(**settings)
+        match = {
+            **self.adapters[sweep['workload']].record(),
+            self.matrix['dataset_field']: label,
+            'num_reducers': reducers,
+            'job_properties': sweep['settings']['properties'],
+        }
+        optimizer.add_history(slowstart_optimizer.load_history(
+            [os.path.join(self.results_dir, pattern) for pattern in settings['history']], match, settings['metric']))
+        resumed = [record for record in self.journal.records
+                   if (record['job_key']['sweep'], record['job_key']['dataset'], record['job_key']['reducers'])
+                   == (sweep['name'], label, reducers)]
+        for record in resumed:
+            if record.get(settings['metric']) is not None:
+                optimizer.observe(record['slowstart'], record[settings['metric']])
+        return optimizer, resumed
+
+    def print_optimizer_plan(self):
+        """Print what the optimizer will search and where it starts."""
+        settings = self.optimizer
+        print(f"Configuration: {self.matrix_path}")
+        print(f"Slowstart optimizer: {settings['min_evaluations']}-{settings['max_evaluations']} jobs per "
+              f"dataset and reducer count, minimizing {settings['metric']}, until the expected improvement "
+              f"is below {settings['stop_improvement']:.1%}")
+        groups = self.optimizer_groups()
+        for sweep, key, reducers in groups:
+            optimizer, resumed = self.slowstart_search(sweep, key, reducers)
+            grid = len(sweep['settings']['slowstart']) * planned_runs(sweep['settings'])
+            print(f"  - {sweep['name']:<12} {self.matrix['datasets'][key]['label']:<10} r={reducers:<3} "
+                  f"{len(optimizer.history)} past result(s), {len(resumed)} journaled; "
+                  f"first slowstart {optimizer.suggest()} (grid: {grid} jobs)")
+        print(f"\nTotal experiments to run: at most {len(groups) * settings['max_evaluations']}")
+
+    def run_optimizer(self):
+        """Search the best slowstart of every dataset and reducer count, one job at a time."""
+        settings = self.optimizer
+        print("\n" + "="*80)
+        print(self.matrix.get('title', 'Experiments'))
+        print("="*80)
+        self.print_optimizer_plan()
+        print("="*80)
+        if self.concurrency:
+            print("⚠ Warning: The optimizer picks each slowstart from the previous results; "
+                  "jobs run one after another")
+        self.report_gateway()
+
+        for sweep, key, reducers in self.optimizer_groups():
+            optimizer, resumed = self.slowstart_search(sweep, key, reducers)
+            self.results.extend(resumed)
+            runs = {}
+            for record in resumed:
+                runs[record['slowstart']] = max(runs.get(record['slowstart'], 0), record['job_key']['run'])
+            hdfs_input = None
+            failures = 0
+            recorded = len(resumed)
+            while True:
+                # Recorded runs without the metric still use up the budget
+                if recorded >= settings['max_evaluations']:
+                    optimizer.stopped = optimizer.stopped or 'max_evaluations'
+                    break
+                slowstart = optimizer.suggest()
+                if slowstart is None:
+                    break
+                runs[slowstart] = runs.get(slowstart, 0) + 1
+                job = self.make_job(sweep, key, reducers, slowstart, runs[slowstart], settings['max_evaluations'])
+                if hdfs_input is None:
+                    hdfs_input = self.prepare_group(job)
+                    print(f"\n  Optimizing slowstart, reducers = {reducers}: {len(optimizer.history)} past "
+                          f"result(s), {len(optimizer.observations)} journaled run(s)")
+                    pause = None
+                else:
+                    pause = self.matrix['pause_between_runs']
+
+                settled = self.settle(pause, 'run')
+                metrics = self.run_job(job, hdfs_input)
+                if metrics is None:
+                    failures += 1
+                    if failures >= OPTIMIZER_FAILURE_LIMIT:
+                        print(f"    ✗ {failures} failed runs; giving up on this configuration")
+                        optimizer.stopped = 'failed'
+                        break
+                    continue
+                metrics.update(settled)
+                metrics['optimizer_step'] = len(optimizer.observations) + 1
+                self.record_result(job, metrics)
+                recorded += 1
+                # A finished job is kept even when its metric is missing (e.g.
+                # not in JobHistory yet); the model just does not learn from it
+                if metrics.get(settings['metric']) is None:
+                    print(f"    ⚠ Warning: No {settings['metric']} for this run; not used by the optimizer")
+                    continue
+                optimizer.observe(slowstart, metrics[settings['metric']])
+                if len(optimizer.history) + len(optimizer.observations) >= len(settings['initial']):
+                    print(f"    Best so far: {slowstart_optimizer.describe(optimizer.result())}")
+
+            if not optimizer.observations:
+                continue
+            result = {
+                'sweep': sweep['name'],
+                'workload': sweep['workload'],
+                'dataset': self.matrix['datasets'][key]['label'],
+                'reducers': reducers,
+                **optimizer.result(),
+            }
+            self.optimizer_results.append(result)
+            print(f"\n    {'✓' if result['stopped'] == 'converged' else '⚠'} {slowstart_optimizer.describe(result)} "
+                  f"after {result['evaluations']} run(s) ({result['stopped']})")
+
+        self.print_optimizer_results()
+
+    def print_optimizer_results(self):
+        """Print the best slowstart found per dataset and reducer count."""
+        if not self.optimizer_results:
+            return
+        print("\n" + "="*80)
+        print("Optimal Slowstart")
+        print("="*80)
+        grid = 0
+        for result in self.optimizer_results:
+            print(f"  {result['sweep']:<12} {result['dataset']:<10} r={result['reducers']:<3} "
+                  f"{slowstart_optimizer.describe(result)}, {result['evaluations']} run(s)")
+            sweep = next(sweep for sweep in self.sweeps if sweep['name'] == result['sweep'])
+            grid += len(sweep['settings']['slowstart']) * planned_runs(sweep['settings'])
+        spent = sum(result['evaluations'] for result in self.optimizer_results)
+        print(f"\n  {spent} job(s) instead of {grid} for the slowstart grid")
+
+    def report_gateway(self):
+        """Say how HDFS housekeeping and job submission are done."""
+        if self.gateway.connect() == 'webhdfs':
+            print("HDFS operations: WebHDFS (no client JVM per call)")
+        elif self.gateway.fallback_reason:
+            print(f"⚠ Warning: HDFS operations use the hdfs command line ({self.gateway.fallback_reason})")
+        if self.submitter.start():
+            print(f"Job submission: resident JobSubmitter JVM (port {self.submitter.port})")
+        else:
+            print(f"⚠ Warning: Jobs are submitted with hadoop jar ({self.submitter.fallback_reason})")
+
+    def reducer_counts(self):
+        """Every reducer count of the selected sweeps."""
+        return sorted({r for sweep in self.sweeps for r in sweep['settings']['reducers']})
+
+    def print_plan(self, jobs):
+        """Print the configuration and the expanded job plan per sweep."""
+        print(f"Configuration: {self.matrix_path}")
+        for sweep in self.sweeps:
+            settings = sweep['settings']
+            sweep_jobs = [job for job in jobs if job['sweep'] == sweep['name']]
+            labels = list(dict.fromkeys(job['dataset'] for job in sweep_jobs))
+            print(f"  - Sweep '{sweep['name']}': {sweep['workload']} "
+                  f"({self.adapters[sweep['workload']].__class__.__name__})")
+            print(f"      Datasets: {', '.join(labels) or 'none available'}")
+            print(f"      Slowstart Values: {settings['slowstart']}")
+            print(f"      Number of Reducers: {settings['reducers']}")
+            repetition = settings['repetition']
+            if repetition['policy'] == 'adaptive':
+                print(f"      Runs per Configuration: {repetition['min_runs']}-{repetition['max_runs']}, until the "
+                      f"{repetition['confidence']:.0%} interval of {' and '.join(repetition['metrics'])} is "
+                      f"within {repetition_policy.target_text(repetition)}")
+            else:
+                print(f"      Runs per Configuration: {settings['runs']}")
+            if settings['properties']:
+                print(f"      Properties: {property_args(settings['properties'])}")
+            print(f"      Jobs: {len(sweep_jobs)}")
+            for key in sweep.get('datasets', []):
+                if not self.dataset_available(key):
+                    dataset = self.matrix['datasets'][key]
+                    note = 'not generated, skipped' if dataset.get('optional') else 'missing'
+                    print(f"      ({dataset['label']}: {dataset['file']} {note})")
+        adaptive = any(job['repetition']['policy'] == 'adaptive' for job in jobs)
+        print(f"\nTotal experiments to run: {len(jobs)}" + (" at most" if adaptive else ''))
+
+    def resume(self, jobs):
+        """
+        Take over the journaled results of planned jobs.
+
+        Returns:
+            The jobs that still have to run
+        """
+        done = self.journal.completed()
+        planned = {result_journal.job_key(job): job for job in jobs}
+        for job in jobs:
+            self.repetition_state(job)
+        for record in self.journal.records:
+            key = result_journal.job_key(record['job_key'])
+            if key in planned:
+                self.results.append(record)
+                self.count_run(planned[key], record, quiet=True)
+        return [job for job in jobs if result_journal.job_key(job) not in done and self.needs_run(job)]
+
+    def print_repetition(self):
+        """Print the runs each configuration took and the interval of its mean."""
+        states = [state for state in self.repetition.values() if state['attempts']]
+        if not states:
+            return
+        print("\n" + "="*80)
+        print("Runs per Configuration")
+        print("="*80)
+        for state in states:
+            job = state['job']
+            note = {'converged': 'converged', 'max_runs': 'max runs'}.get(state['stopped'], '')
+            print(f"  {job['sweep']:<12} {job['dataset']:<10} r={job['reducers']:<3} s={job['slowstart']:<5} "
+                  f"{len(state['results']):>3} run(s) {note:<9}  {repetition_policy.describe(state['assessment'])}")
+        adaptive = [state for state in states if state['adaptive']]
+        if adaptive:
+            spent = sum(state['attempts'] for state in adaptive)
+            budget = sum(state['job']['runs'] for state in adaptive)
+            print(f"\n  Adaptive repetition: {spent} of at most {budget} runs, "
+                  f"{sum(1 for state in adaptive if state['stopped'] == 'converged')} of "
+                  f"{len(adaptive)} configuration(s) converged")
+
+    def repetition_summary(self):
+        """Runs and intervals per configuration, as saved with the results."""
+        return [
+            {
+                **{field: state['job'][field] for field in result_journal.KEY_FIELDS if field != 'run'},
+                'policy': state['job']['repetition']['policy'],
+                'runs': len(state['results']),
+                'attempts': state['attempts'],
+                'stopped': state['stopped'],
+                'metrics': state['assessment']['metrics'],
+            }
+            for state in self.repetition.values() if state['attempts']
+        ]
+
+    def start_fresh(self):
+        """Set an unfinished campaign's journal aside instead of resuming it."""
+        if self.journal.records:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            aside = self.journal.path.replace('.jsonl', f'_abandoned_{timestamp}.jsonl')
+            path = self.journal.path
+            self.journal.retire(aside)
+            print(f"Previous journal moved to {aside}")
+            self.journal = result_journal.ResultJournal(path)
+
+    def run_all_experiments(self):
+        """Run the job plan of every selected sweep, skipping jobs already in the journal."""
+        if self.optimizer:
+            return self.run_optimizer()
+        jobs = self.plan()
+        remaining = self.resume(jobs)
+        print("\n" + "="*80)
+        print(self.matrix.get('title', 'Experiments'))
+        print("="*80)
+        if self.results:
+            print(f"Resuming: {len(self.results)} of {len(jobs)} jobs already finished "
+                  f"({self.journal.path})")
+        converged = len(jobs) - len(remaining) - len(self.results)
+        if converged:
+            print(f"  {converged} more not needed: their configurations already converged")
+        jobs = remaining
+        self.print_plan(jobs)
+        if not jobs:
+            print("Nothing left to run")
+            return
+        print(f"Estimated time: {len(jobs) * 2}-{len(jobs) * 6} minutes"
+              + (" (less when jobs run concurrently)" if self.concurrency else ''))
+        print("="*80)
+        self.report_gateway()
+        if self.concurrency:
+            self.run_plan_concurrent(jobs)
+        else:
+            self.run_plan(jobs)
+        self.print_repetition()
+
+    def preflight(self):
+        """
+        Check JARs and datasets before running.
+
+        Returns:
+            (errors, missing): fatal messages, and required datasets not generated
+        """
+        errors = [error for error in (adapter.preflight() for adapter in self.adapters.values()) if error]
+        if self.concurrency and not self.optimizer:
+            outputs = [job['output_dir'] for job in self.plan()]
+            clashes = sorted({output for output in outputs if outputs.count(output) > 1})
+            if clashes:
+                errors.append(f"Jobs share output directories and cannot run concurrently: "
+                              f"{', '.join(clashes[:3])}\n"
+                              f"  Add the varying fields to the matrix's output template")
+        missing = []
+        for sweep in self.sweeps:
+            for key in sweep.get('datasets', []):
+                dataset = self.matrix['datasets'][key]
+                if not dataset.get('optional') and not self.dataset_available(key) and key not in missing:
+                    missing.append(key)
+        return errors, missing
+
+    def save_results(self):
+        """Save experimental results to JSON file with timestamp."""
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        print("\n" + "="*80)
+        print("Saving Results")
+        print("="*80)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        json_file = os.path.join(self.results_dir, f'raw_results_{timestamp}.json')
+
+        field = self.matrix['dataset_field']
+        reducers = self.reducer_counts()
+        with open(json_file, 'w') as f:
+            json.dump({
+                'experiment_start': self.experiment_start_time.isoformat(),
+                'experiment_end': datetime.now().isoformat(),
+                'configuration': {
+                    'matrix': self.matrix_path,
+                    'sweeps': [sweep['name'] for sweep in self.sweeps],
+                    'workloads': list(self.adapters),
+                    f'{field}s': list(dict.fromkeys(r[field] for r in self.results)),
+                    'slowstart_values': sorted({r['slowstart'] for r in self.results}) if self.optimizer else
+                                        sorted({s for sweep in self.sweeps for s in sweep['settings']['slowstart']}),
+                    'runs_per_config': max(planned_runs(sweep['settings']) for sweep in self.sweeps),
+                    'repetition': {sweep['name']: sweep['settings']['repetition'] for sweep in self.sweeps},
+                    'num_reducers': reducers[0] if len(reducers) == 1 else reducers,
+                    'teragen_mode': self.matrix['teragen_mode'],
+                    'concurrency': self.concurrency,
+                    'quiescence': self.quiescence if self.quiescence['enabled'] else None,
+                    'optimizer': self.optimizer,
+                },
+                'repetition': self.repetition_summary(),
+                'optimizer': self.optimizer_results,
+                'results': self.results
+            }, f, indent=2)
+
+        print(f"✓ Results saved to: {json_file}")
+        print(f"  Total successful experiments: {len(self.results)}")
+
+        return json_file
+
+    def enhance_results(self, results_file):
+        """Extract detailed timing info using extract_job_timing.py"""
+        print("\n" + "="*80)
+        print("Extracting Detailed Timing Information")
+        print("="*80)
+
+        extract_script = os.path.join(TOOLS_DIR, 'extract_job_timing.py')
+
+        print(f"Running: python3 {extract_script} --batch {results_file}")
+        stdout, stderr, code = self.run_command(
+            f"cd {TOOLS_DIR} && {sys.executable} extract_job_timing.py --batch {results_file}"
+        )
+
+        if code == 0:
+            enhanced_file = results_file.replace('.json', '_enhanced.json')
+            if os.path.exists(enhanced_file):
+                # Replace original with enhanced version
+                os.rename(enhanced_file, results_file)
+                print(f"✓ Detailed timing information added to results")
+        else:
+            print(f"⚠ Warning: Failed to extract timing information")
+            print(f"  You can manually run: cd {TOOLS_DIR} && python3 extract_job_timing.py --batch {results_file}")
+
+
+def main(matrix_path=None, description=None):
+    """Command line of the engine; a task's run_experiment.py passes its own matrix."""
+    parser = argparse.ArgumentParser(description=description or 'Run the experiments of a matrix file.')
+    if matrix_path:
+        parser.add_argument('--matrix', default=matrix_path,
+                            help=f'Experiment matrix (default: {os.path.relpath(matrix_path)})')
+    else:
+        parser.add_argument('matrix', help='Experiment matrix (JSON)')
+    parser.add_argument('--sweep', action='append', metavar='NAME',
+                        help='Run only this sweep (repeatable; also runs disabled sweeps)')
+    parser.add_argument('--plan', action='store_true',
+                        help='Print the expanded job plan and exit')
+    parser.add_argument('--yes', action='store_true',
+                        help='Continue without asking when datasets are missing')
+    parser.add_argument('--concurrent', nargs='?', type=int, const=0, metavar='MAX_JOBS',
+                        help='Submit independent jobs side by side as cluster capacity allows '
+                             '(optionally at most MAX_JOBS at once)')
+    parser.add_argument('--queues', type=lambda text: [q for q in text.split(',') if q],
+                        help='Comma-separated YARN queues; each concurrent job gets one of its own')
+    parser.add_argument('--no-quiescence', action='store_true',
+                        help='Sleep the fixed pauses between jobs instead of waiting for an idle cluster')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Repeat each configuration until its mean job time is known well enough '
+                             '(the matrix\'s "repetition" settings) instead of a fixed number of runs')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Search the best slowstart per dataset and reducer count instead of '
+                             'sweeping the slowstart grid')
+    parser.add_argument('--fresh', action='store_true',
+                        help='Start over instead of resuming the jobs already in the result journal')
+    args = parser.parse_args()
+
+    try:
+        engine = ExperimentEngine(args.matrix, sweeps=args.sweep)
+    except (OSError, ValueError, ImportError, AttributeError) as e:
+        print(f"✗ Error: {e}")
+        sys.exit(2)
+    if not engine.sweeps:
+        names = [sweep['name'] for sweep in engine.matrix['sweeps']]
+        print(f"✗ Error: No sweep selected: every sweep in {args.matrix} is disabled "
+              f"(name one with --sweep: {', '.join(names)})" if names else
+              f"✗ Error: {args.matrix} has no sweeps")
+        sys.exit(2)
+    if args.concurrent is not None or args.queues:
+        engine.enable_concurrency(max_jobs=args.concurrent, queues=args.queues)
+    if args.no_quiescence:
+        engine.quiescence['enabled'] = False
+    if args.adaptive:
+        engine.set_repetition_policy('adaptive')
+    if args.optimize:
+        engine.enable_optimizer()
+
+    print("="*80)
+    print(f"{engine.matrix.get('title', 'Experiments')} - Experiment Runner")
+    print("="*80)
+
+    if args.plan and engine.optimizer:
+        engine.print_optimizer_plan()
+        return
+    if args.plan:
+        jobs = engine.plan()
+        engine.print_plan(jobs)
+        done = set() if args.fresh else engine.journal.completed()
+        for job in jobs:
+            print(f"  {job['sweep']:<12} {job['dataset']:<12} r={job['reducers']:<3} "
+                  f"s={job['slowstart']:<5} run {job['run']}  {job['output_dir']}"
+                  + ('  (done)' if result_journal.job_key(job) in done else ''))
+        return
+
+    errors, missing = engine.preflight()
+    for error in errors:
+        print(f"\n✗ Error: {error}")
+    if errors:
+        sys.exit(1)
+    if missing:
+        print(f"\n⚠ Warning: Some data files are missing:")
+        for key in missing:
+            print(f"  - {engine.matrix['datasets'][key]['file']}")
+        print("\n  Please generate data first:")
+        print("  python3 scripts/generate_data.py")
+        if not args.yes:
+            user_input = input("\nContinue with available files? (y/N): ").strip().lower()
+            if user_input != 'y':
+                sys.exit(1)
+
+    if args.fresh:
+        engine.start_fresh()
+
+    try:
+        # Run all experiments (data preparation happens inside)
+        engine.run_all_experiments()
+
+        # Save results; the finished campaign's journal goes next to them
+        results_file = engine.save_results()
+        engine.journal.retire(results_file.replace('.json', '.jsonl'))
+
+        # Extract detailed timing information
+        engine.enhance_results(results_file)
+
+        print("\n" + "="*80)
+        print("✓ All experiments completed successfully!")
+        print("="*80)
+        print(f"\nResults saved to: {results_file}")
+        print("\nTo view results:")
+        print(f"  cat {results_file} | python3 -m json.tool")
+
+    except KeyboardInterrupt:
+        print("\n\n✗ Experiments interrupted by user")
+        if engine.results:
+            print("  Saving partial results...")
+            engine.save_results()
+            print(f"  Finished jobs are kept in {engine.journal.path}; run again to resume")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Error during experiments: {e}")
+        import traceback
+        traceback.print_exc()
+        if engine.journal.records:
+            print(f"  Finished jobs are kept in {engine.journal.path}; run again to resume")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,14 +18,20 @@
 import requests
 import json
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+import result_journal
+
 # JobHistory Server 配置
 JOBHISTORY_HOST = "172.31.12.133"
 JOBHISTORY_PORT = "19888"
 JOBHISTORY_API_BASE = f"http://{JOBHISTORY_HOST}:{JOBHISTORY_PORT}/ws/v1/history/mapreduce"
 
+# 估计 Map 启动开销时最多抽样的 Map 数（每个 Map 需要两次 API 请求）
+MAP_SAMPLE_LIMIT = 50
+
 
 class JobTimingExtractor:
     """作业时间信息提取器"""
@@ -78,6 +84,63 @@ class JobTimingExtractor:
         except Exception as e:
             return None
     
+    def fetch_task_counter(self, task_id, group_name, counter_name):
+        """获取单个task的某个 Counter 值"""
+        url = f"{JOBHISTORY_API_BASE}/jobs/{self.job_id}/tasks/{task_id}/counters"
+        try:
+            response = requests.get(url, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            groups = data.get('jobTaskCounters', {}).get('taskCounterGroup', [])
+            for group in groups:
+                if group_name in group.get('counterGroupName', ''):
+                    for counter in group.get('counter', []):
+                        if counter.get('name') == counter_name:
+                            return counter.get('value', 0)
+            return None
+        except Exception as e:
+            return None
+    
+    def estimate_map_startup(self, map_tasks):
+        """
+        估计每个 Map 与数据量无关的开销（小文件场景下 JVM 启动占主导）
+        
+        均匀抽样至多 MAP_SAMPLE_LIMIT 个 Map，读取成功 attempt 与其输入字节数：
+        - 启动延迟：attempt 开始时间 - task 调度时间（等待容器分配与启动）
+        - 固定开销：attempt 耗时对输入字节数做最小二乘拟合的截距，
+          即 JVM 启动、任务初始化与提交等每个 Map 都要付出的时间
+        """
+        import statistics
+        step = max(1, len(map_tasks) // MAP_SAMPLE_LIMIT)
+        sample = map_tasks[::step][:MAP_SAMPLE_LIMIT]
+        
+        launch_delays = []
+        attempt_elapsed = []
+        input_bytes = []
+        for t in sample:
+            task_id = t.get('id', '')
+            attempt = self.fetch_task_attempts(task_id)
+            if not attempt:
+                continue
+            if attempt.get('startTime') and t.get('startTime'):
+                launch_delays.append((attempt['startTime'] - t['startTime']) / 1000.0)
+            bytes_read = self.fetch_task_counter(task_id, 'FileInputFormatCounter', 'BYTES_READ')
+            if bytes_read is not None and attempt.get('elapsedTime'):
+                attempt_elapsed.append(attempt['elapsedTime'] / 1000.0)
+                input_bytes.append(bytes_read)
+        
+        # 所有 Map 输入一样大时截距无法确定
+        startup_overhead = None
+        if len(set(input_bytes)) > 1:
+            _, intercept = statistics.linear_regression(input_bytes, attempt_elapsed)
+            startup_overhead = max(intercept, 0.0)
+        
+        return {
+            'map_launch_delay': round(sum(launch_delays) / len(launch_delays), 2) if launch_delays else None,
+            'map_startup_overhead': round(startup_overhead, 2) if startup_overhead is not None else None,
+            'map_overhead_samples': len(attempt_elapsed),
+        }
+    
     def fetch_counters(self):
         """获取作业的 Counters 信息"""
         url = f"{JOBHISTORY_API_BASE}/jobs/{self.job_id}/counters"
@@ -131,6 +194,10 @@ class JobTimingExtractor:
         map_finish_times = [t.get('finishTime', 0) for t in map_tasks]
         map_completion_time = max(map_finish_times) if map_finish_times else 0
         
+        # Map 任务耗时统计（小文件场景下 Map 数量远多于块数）
+        map_elapsed_times = [t['elapsedTime'] / 1000.0 for t in map_tasks if t.get('elapsedTime')]
+        map_startup = self.estimate_map_startup(map_tasks)
+        
         # 2. 第一个 Reduce 启动时间点（如果有 reduce tasks）
         first_reduce_start_time = 0
         reduce_completion_time = 0
@@ -339,6 +406,14 @@ class JobTimingExtractor:
             'num_map_tasks': len(map_tasks),
             'num_reduce_tasks': len(reduce_tasks),
             
+            # Map 任务统计（小文件/大量切片场景）
+            'min_map_elapsed': round(min(map_elapsed_times), 2) if map_elapsed_times else None,
+            'max_map_elapsed': round(max(map_elapsed_times), 2) if map_elapsed_times else None,
+            'avg_map_elapsed': round(sum(map_elapsed_times) / len(map_elapsed_times), 2) if map_elapsed_times else None,
+            'map_launch_delay': map_startup['map_launch_delay'],
+            'map_startup_overhead': map_startup['map_startup_overhead'],
+            'map_overhead_samples': map_startup['map_overhead_samples'],
+            
             # Reduce 任务完成时间统计（用于数据倾斜分析）
             'min_reduce_finish_time': round(ms_to_seconds(min_reduce_finish_abs), 2) if min_reduce_finish_abs else None,
             'max_reduce_finish_time': round(ms_to_seconds(max_reduce_finish_abs), 2) if max_reduce_finish_abs else None,
@@ -426,6 +501,13 @@ class JobTimingExtractor:
         print(f"\n任务统计:")
         print(f"  Map Tasks:    {info['num_map_tasks']}")
         print(f"  Reduce Tasks: {info['num_reduce_tasks']}")
+        if info.get('avg_map_elapsed') is not None:
+            print(f"  Map 耗时:     最快={info['min_map_elapsed']:.2f}s, 最慢={info['max_map_elapsed']:.2f}s, "
+                  f"平均={info['avg_map_elapsed']:.2f}s")
+        if info.get('map_launch_delay') is not None:
+            print(f"  Map 启动延迟: {info['map_launch_delay']:.2f}s（抽样 {info['map_overhead_samples']} 个 Map）")
+        if info.get('map_startup_overhead') is not None:
+            print(f"  Map 固定开销: {info['map_startup_overhead']:.2f}s（耗时对输入字节数回归的截距）")
         print(f"\n平均时间:")
         print(f"  Average Map Time:     {info['avg_map_time']:.2f}sec")
         print(f"  Average Shuffle Time: {info['avg_shuffle_time']:.2f}sec")
@@ -481,15 +563,40 @@ def extract_single_job(job_id):
     return extractor.extract()
 
 
+def fetch_total_time(job_id, attempts=5, delay=2.0):
+    """
+    只取作业在 JobHistory 中的总耗时（finishTime - startTime，秒），不打印
+
+    作业刚结束时 JobHistory 可能还没有收录，按 delay 秒间隔重试 attempts 次；
+    仍取不到时返回 None。实验引擎的自适应重复策略逐个作业调用。
+    """
+    url = f"{JOBHISTORY_API_BASE}/jobs/{job_id}"
+    for attempt in range(attempts):
+        try:
+            response = requests.get(url, timeout=10)
+            if response.ok:
+                job = response.json().get('job', {})
+                if job.get('startTime') and job.get('finishTime'):
+                    return round((job['finishTime'] - job['startTime']) / 1000.0, 2)
+        except (requests.RequestException, ValueError):
+            pass
+        if attempt < attempts - 1:
+            time.sleep(delay)
+    return None
+
+
 def batch_process_results(results_file):
     """批量处理结果文件中的所有作业"""
     print(f"正在批量处理: {results_file}")
     print(f"{'='*80}\n")
     
-    # 读取结果文件
+    # 读取结果文件（.jsonl 为实验引擎逐行写入的结果日志）
     try:
-        with open(results_file, 'r') as f:
-            data = json.load(f)
+        if results_file.endswith('.jsonl'):
+            data = result_journal.read_journal(results_file)
+        else:
+            with open(results_file, 'r') as f:
+                data = json.load(f)
     except Exception as e:
         print(f"错误：无法读取结果文件 - {e}")
         return
@@ -574,6 +681,13 @@ def batch_process_results(results_file):
                 result['reduce_completion_time'] = timing_info['reduce_completion_time']
                 result['num_map_tasks'] = timing_info['num_map_tasks']
                 result['num_reduce_tasks'] = timing_info['num_reduce_tasks']
+                # Map 任务统计（小文件场景）
+                result['min_map_elapsed'] = timing_info.get('min_map_elapsed')
+                result['max_map_elapsed'] = timing_info.get('max_map_elapsed')
+                result['avg_map_elapsed'] = timing_info.get('avg_map_elapsed')
+                result['map_launch_delay'] = timing_info.get('map_launch_delay')
+                result['map_startup_overhead'] = timing_info.get('map_startup_overhead')
+                result['map_overhead_samples'] = timing_info.get('map_overhead_samples')
                 # Reduce 任务统计（使用API提供的elapsedTime）
                 result['min_reduce_finish_time'] = timing_info.get('min_reduce_finish_time')
                 result['max_reduce_finish_time'] = timing_info.get('max_reduce_finish_time')
@@ -600,6 +714,8 @@ def batch_process_results(results_file):
     
     # 保存增强后的结果
     output_file = results_file.replace('.json', '_enhanced.json')
+    if results_file.endswith('.jsonl'):
+        output_file = results_file.replace('.jsonl', '_enhanced.jsonl')
     
     if isinstance(data, dict):
         data['results'] = enhanced_results
@@ -609,7 +725,10 @@ def batch_process_results(results_file):
     
     try:
         with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
+            if output_file.endswith('.jsonl'):
+                f.writelines(json.dumps(result) + '\n' for result in output_data)
+            else:
+                json.dump(output_data, f, indent=2)
         print(f"\n{'='*80}")
         print(f"✓ 增强后的结果已保存到: {output_file}")
         print(f"{'='*80}\n")
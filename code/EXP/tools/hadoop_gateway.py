@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+HDFS housekeeping, job submission and job timing without a client JVM per call.
+
+Every `hdfs dfs -rm`, `-test` or `-ls` the experiment runner used to issue
+started a Java client that takes seconds before doing any work. The gateway
+sends the same operations to the NameNode's WebHDFS REST API over one
+kept-alive HTTP session, and asks the ResourceManager when each submitted
+application really started and finished:
+
+    python3 hadoop_gateway.py exists /user/root/task1/output_wordcount_1GB_r4_s050_run1
+    python3 hadoop_gateway.py ls /user/root/task1/input_wordcount_1GB
+    python3 hadoop_gateway.py app application_1764138085950_0002
+
+Jobs go to JobSubmitter, one resident Java job client (tools/submitter,
+built with its compile.sh) that the engine starts once and talks to over a
+loopback socket: building the splits and staging files of a job still
+happens in Java, but in a JVM that is already warm. The client start-up
+left is measured from the application's RM timestamps and recorded apart
+from the time the job spent on the cluster.
+
+Without WebHDFS (or the requests package) the gateway falls back to the hdfs
+command line, and without the submitter JAR jobs run with `hadoop jar`; with
+$DATAGEN_HDFS_ROOT set it works on the local stand-in.
+"""
+
+import argparse
+import atexit
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import datagen
+
+try:
+    import requests
+except ImportError:  # the hdfs command line still works
+    requests = None
+
+# NameNode WebHDFS configuration
+NAMENODE_HOST = "172.31.12.133"
+WEBHDFS_PORT = "9870"
+WEBHDFS_API_BASE = f"http://{NAMENODE_HOST}:{WEBHDFS_PORT}/webhdfs/v1"
+
+# ResourceManager configuration (see yarn_capacity.py)
+RM_API_BASE = "http://172.31.12.133:8088/ws/v1/cluster"
+
+# HDFS user the experiments run as (simple authentication)
+HDFS_USER = os.environ.get('HADOOP_USER_NAME', 'root')
+
+# Resident job client, built by tools/submitter/compile.sh
+SUBMITTER_JAR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'submitter', 'job-submitter.jar')
+SUBMITTER_CLASS = 'JobSubmitter'
+
+# Seconds the submitter JVM may take to start listening
+SUBMITTER_START_TIMEOUT = 60
+
+# YARN application tag that finds jobs whose program does not report their ID
+SUBMIT_TAG_PREFIX = 'exp_submit_'
+
+
+def run_shell(command):
+    """Run a shell command; same (stdout, stderr, returncode) contract as ExperimentEngine.run_command."""
+    result = subprocess.run(command, shell=True, capture_output=True, text=True)
+    return result.stdout, result.stderr, result.returncode
+
+
+class HadoopGateway:
+    """
+    HDFS operations over WebHDFS and application timing from the RM REST API.
+
+    The backend ('standin', 'webhdfs' or 'cli') is chosen on first use;
+    run_command runs the hdfs command line when WebHDFS cannot be reached.
+    """
+
+    def __init__(self, run_command=run_shell):
+        self.run_command = run_command
+        self.backend = None
+        self.fallback_reason = None
+        self._local = threading.local()
+
+    def session(self):
+        """HTTP session of the calling thread (sessions keep their connections alive)."""
+        if getattr(self._local, 'session', None) is None:
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _webhdfs(self, method, path, op, **params):
+        """One WebHDFS call; returns the response (404 included), raises OSError otherwise."""
+        try:
+            response = self.session().request(
+                method, f"{WEBHDFS_API_BASE}{path}",
+                params={'op': op, 'user.name': HDFS_USER, **params}, timeout=30)
+        except requests.RequestException as e:
+            raise OSError(f"WebHDFS {op} {path} failed: {e}") from None
+        if response.status_code != 404 and not response.ok:
+            raise OSError(f"WebHDFS {op} {path} failed: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    def connect(self):
+        """Pick the backend once; returns its name."""
+        if self.backend is None:
+            if os.environ.get(datagen.HDFS_STANDIN_ENV):
+                self.backend = 'standin'
+            elif requests is None:
+                self.backend, self.fallback_reason = 'cli', "the requests package is not installed"
+            else:
+                try:
+                    self._webhdfs('GET', '/', 'GETFILESTATUS')
+                    self.backend = 'webhdfs'
+                except OSError as e:
+                    self.backend, self.fallback_reason = 'cli', str(e)
+        return self.backend
+
+    def exists(self, path):
+        """Whether an HDFS file or directory exists."""
+        backend = self.connect()
+        if backend == 'standin':
+            return os.path.exists(datagen._standin_path(path))
+        if backend == 'webhdfs':
+            return self._webhdfs('GET', path, 'GETFILESTATUS').status_code != 404
+        return self.run_command(f"hdfs dfs -test -e {path}")[2] == 0
+
+    def delete(self, path):
+        """
+        Remove an HDFS path recursively (a missing path is fine).
+
+        Returns:
+            (ok, error message or '')
+        """
+        backend = self.connect()
+        if backend == 'standin':
+            local = datagen._standin_path(path)
+            try:
+                if os.path.isdir(local):
+                    shutil.rmtree(local)
+                else:
+                    os.remove(local)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                return False, str(e)
+            return True, ''
+        if backend == 'webhdfs':
+            try:
+                self._webhdfs('DELETE', path, 'DELETE', recursive='true')
+            except OSError as e:
+                return False, str(e)
+            return True, ''
+        stdout, stderr, code = self.run_command(f"hdfs dfs -rm -r -f {path}")
+        return code == 0, stderr
+
+    def mkdir(self, path):
+        """Create an HDFS directory and its parents; returns (ok, error message or '')."""
+        backend = self.connect()
+        if backend == 'standin':
+            os.makedirs(datagen._standin_path(path), exist_ok=True)
+            return True, ''
+        if backend == 'webhdfs':
+            try:
+                self._webhdfs('PUT', path, 'MKDIRS')
+            except OSError as e:
+                return False, str(e)
+            return True, ''
+        stdout, stderr, code = self.run_command(f"hdfs dfs -mkdir -p {path}")
+        return code == 0, stderr
+
+    def list_files(self, path):
+        """Names of the plain files directly below an HDFS directory."""
+        return sorted(self.file_sizes(path))
+
+    def file_sizes(self, path):
+        """Byte size of every plain file directly below an HDFS directory, by name."""
+        backend = self.connect()
+        if backend == 'standin':
+            local = datagen._standin_path(path)
+            if not os.path.isdir(local):
+                return {}
+            return {name: os.path.getsize(os.path.join(local, name)) for name in os.listdir(local)
+                    if os.path.isfile(os.path.join(local, name))}
+        if backend == 'webhdfs':
+            response = self._webhdfs('GET', path, 'LISTSTATUS')
+            if response.status_code == 404:
+                return {}
+            statuses = response.json()['FileStatuses']['FileStatus']
+            return {status['pathSuffix']: status['length'] for status in statuses if status['type'] == 'FILE'}
+        stdout, stderr, code = self.run_command(f"hdfs dfs -ls {path}")
+        return {line.split()[-1].rsplit('/', 1)[-1]: int(line.split()[4])
+                for line in stdout.splitlines() if line.startswith('-')}
+
+    def read_range(self, path, offset, length, chunk_size=8 * datagen.MB):
+        """
+        Bytes offset..offset+length of an HDFS file (fewer at its end), as
+        chunks of up to chunk_size. WebHDFS backend only: OPEN redirects to a
+        DataNode, which sends just that range. Raises OSError.
+        """
+        try:
+            response = self.session().get(
+                f"{WEBHDFS_API_BASE}{path}", timeout=30, stream=True,
+                params={'op': 'OPEN', 'user.name': HDFS_USER, 'offset': offset, 'length': length})
+            with response:
+                if not response.ok:
+                    raise OSError(f"WebHDFS OPEN {path} failed: "
+                                  f"HTTP {response.status_code} {response.text[:200]}")
+                yield from response.iter_content(chunk_size)
+        except requests.RequestException as e:
+            raise OSError(f"WebHDFS OPEN {path} failed: {e}") from None
+
+    def application_times(self, application_id):
+        """
+        When the RM accepted an application and when it finished (epoch seconds).
+
+        Returns:
+            Dict with started, launched (AM container; None when not reported)
+            and finished, or None when the RM cannot tell
+        """
+        if requests is None or not application_id:
+            return None
+        try:
+            response = self.session().get(f"{RM_API_BASE}/apps/{application_id}", timeout=10)
+            response.raise_for_status()
+            app = response.json()['app']
+        except (requests.RequestException, ValueError, KeyError):
+            return None
+        if not app.get('startedTime') or not app.get('finishedTime'):
+            return None
+        return {
+            'started': app['startedTime'] / 1000,
+            'launched': app['launchTime'] / 1000 if app.get('launchTime') else None,
+            'finished': app['finishedTime'] / 1000,
+        }
+
+    def tagged_application(self, tag):
+        """ID of the application submitted with a YARN application tag, or None."""
+        if requests is None:
+            return None
+        try:
+            response = self.session().get(f"{RM_API_BASE}/apps", params={'applicationTags': tag}, timeout=10)
+            response.raise_for_status()
+            apps = (response.json().get('apps') or {}).get('app', [])
+        except (requests.RequestException, ValueError):
+            return None
+        return apps[0]['id'] if apps else None
+
+
+class JobSubmitter:
+    """
+    Client of the resident JobSubmitter JVM (tools/submitter/JobSubmitter.java).
+
+    start launches the JVM once; run sends it one job per connection and
+    waits for the job to end. When the JAR is missing or the JVM does not
+    come up, start returns False and fallback_reason says why, and jobs are
+    run with `hadoop jar` instead.
+    """
+
+    def __init__(self, gateway, log_path, jar=SUBMITTER_JAR):
+        self.gateway = gateway
+        self.log_path = log_path
+        self.jar = jar
+        self.process = None
+        self.port = None
+        self.fallback_reason = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the JVM if needed; returns whether jobs can go through it."""
+        with self._lock:
+            if self.port is not None or self.fallback_reason:
+                return self.port is not None
+            if not os.path.exists(self.jar):
+                self.fallback_reason = f"{self.jar} not built (run tools/submitter/compile.sh)"
+                return False
+            port_file = os.path.join(tempfile.mkdtemp(prefix='job_submitter_'), 'port')
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            try:
+                with open(self.log_path, 'a') as log:
+                    # stdin stays open for the JVM's lifetime; it exits when the engine does
+                    self.process = subprocess.Popen(['hadoop', 'jar', self.jar, SUBMITTER_CLASS, port_file],
+                                                    stdin=subprocess.PIPE, stdout=log, stderr=subprocess.STDOUT)
+            except OSError as e:
+                self.fallback_reason = f"could not start the job submitter: {e}"
+                return False
+            atexit.register(self.stop)
+            deadline = time.time() + SUBMITTER_START_TIMEOUT
+            while not os.path.exists(port_file):
+                if self.process.poll() is not None or time.time() > deadline:
+                    self.fallback_reason = f"the job submitter did not start (see {self.log_path})"
+                    self.stop()
+                    return False
+                time.sleep(0.2)
+            with open(port_file) as f:
+                self.port = int(f.read())
+            shutil.rmtree(os.path.dirname(port_file), ignore_errors=True)
+            return True
+
+    def stop(self):
+        """Shut the JVM down."""
+        process, self.process, self.port = self.process, None, None
+        if process is None or process.poll() is not None:
+            return
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def run(self, jar, main_class, args):
+        """
+        Run one job in the resident JVM and wait until it ends.
+
+        Args:
+            jar: Local JAR holding main_class
+            main_class: Class with a static createJob(Configuration, String[]),
+                or a Tool
+            args: Its arguments, generic -D options first
+
+        Returns:
+            Dict with job_id and application_id (None when unknown),
+            exit_code, and error ('' unless the submitter reported one)
+
+        Raises:
+            OSError when the submitter cannot be reached
+        """
+        tag = f"{SUBMIT_TAG_PREFIX}{uuid.uuid4().hex[:12]}"
+        request = '\t'.join(['RUN', jar, main_class, f"-Dmapreduce.job.tags={tag}", *map(str, args)])
+        result = {'job_id': None, 'application_id': None, 'exit_code': None, 'error': ''}
+        with socket.create_connection(('127.0.0.1', self.port), timeout=10) as connection:
+            connection.settimeout(None)
+            connection.sendall((request + '\n').encode('utf-8'))
+            for line in connection.makefile('r', encoding='utf-8'):
+                event, _, value = line.rstrip('\n').partition(' ')
+                if event == 'SUBMITTED':
+                    result['job_id'] = value
+                    result['application_id'] = 'application_' + value[len('job_'):]
+                elif event == 'FINISHED':
+                    result['exit_code'] = int(value)
+                elif event == 'ERROR':
+                    result['error'] = value
+        if result['exit_code'] is None:
+            result['exit_code'] = 1
+            result['error'] = result['error'] or f"the job submitter stopped during the job (see {self.log_path})"
+        if result['application_id'] is None:
+            result['application_id'] = self.gateway.tagged_application(tag)
+            if result['application_id']:
+                result['job_id'] = 'job_' + result['application_id'][len('application_'):]
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HDFS operations and application timing without a client JVM.')
+    parser.add_argument('command', choices=['exists', 'ls', 'rm', 'app'])
+    parser.add_argument('target', help='HDFS path, or an application ID for app')
+    args = parser.parse_args()
+
+    gateway = HadoopGateway()
+    if args.command == 'app':
+        times = gateway.application_times(args.target)
+        if times is None:
+            print(f"✗ No timing for {args.target} from the ResourceManager")
+            sys.exit(1)
+        print(f"Started {times['started']:.3f}, finished {times['finished']:.3f} "
+              f"({times['finished'] - times['started']:.2f} seconds on the cluster)")
+        return
+
+    backend = gateway.connect()
+    if gateway.fallback_reason:
+        print(f"⚠ Warning: using the hdfs command line ({gateway.fallback_reason})")
+    if args.command == 'exists':
+        found = gateway.exists(args.target)
+        print(f"{'✓' if found else '✗'} {args.target} {'exists' if found else 'does not exist'} ({backend})")
+        sys.exit(0 if found else 1)
+    if args.command == 'ls':
+        for name in gateway.list_files(args.target):
+            print(name)
+        return
+    ok, error = gateway.delete(args.target)
+    print(f"✓ Removed {args.target} ({backend})" if ok else f"✗ Could not remove {args.target}: {error}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
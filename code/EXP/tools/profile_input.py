@@ -0,0 +1,707 @@
+#!/usr/bin/env python3
+"""
+Predict the per-reducer load of a WordCount input before running any job.
+
+The input is tokenized the way WordCount's StringTokenizer splits it, with
+NumPy over memory-mapped chunks, and every distinct token is hashed with
+Hadoop's Text.hashCode(). From one pass the profiler reports key-frequency
+statistics and, for any number of reducers, the records and bytes each
+reducer would receive from HashPartitioner, without a combiner (task4) and
+with one (task1-3: one record per key per map task):
+
+    python3 profile_input.py ../task4/data/input_skewed_1gb.txt --reducers 1-16
+    python3 profile_input.py hdfs:///user/root/task2/input_1500MB --sample 0.1
+
+The input may be a file, a shard directory, an .hdfs pointer or an HDFS
+path; compressed files are decompressed on the fly. Tokens are counted per
+64MB input split, so the combiner estimate follows the real map layout, and
+--sample reads only an evenly spaced fraction of the splits and scales the
+totals up, which keeps huge inputs to a few seconds per sampled GB.
+
+Sampling reads only the chosen splits of uncompressed files, on HDFS with
+ranged WebHDFS reads. Compressed files, and HDFS files when WebHDFS cannot
+be reached (`hdfs dfs -cat`), are still read through in full: there the
+sample saves tokenizing time but no I/O.
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import mmap
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import datagen
+import hadoop_gateway
+
+# Bytes tokenized at a time; chunks end at a newline
+CHUNK_SIZE = 8 * datagen.MB
+
+# Hadoop's FileInputFormat.SPLIT_SLOP: the last split may be up to 10% larger
+SPLIT_SLOP = 1.1
+
+# StringTokenizer's default delimiters: space, \t, \n, \r, \f
+DELIMITERS = np.zeros(256, dtype=bool)
+DELIMITERS[[0x20, 0x09, 0x0A, 0x0D, 0x0C]] = True
+
+# Tokens up to this length share one padded matrix; longer ones get their own
+SHORT_TOKEN = 32
+
+# Odd multiplier mixing the packed token bytes into a 64-bit key identity
+ID_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Keys listed in the report, and candidates kept per chunk to name them
+TOP_KEYS = 10
+
+# Reducer counts profiled by default
+DEFAULT_REDUCER_COUNTS = '1,2,4,8,16,32'
+
+# A layout counts as balanced when its busiest reducer gets at most this
+# multiple of the mean reducer load
+BALANCE_THRESHOLD = 1.2
+
+# Inputs larger than this are sampled down to it unless --sample is given
+AUTO_SAMPLE_BYTES = 4 * datagen.GB
+
+# Bytes fetched at a time past the end of a ranged split to finish its last line
+LINE_SLACK = 64 * 1024
+
+
+class InputFile:
+    """One input file of a dataset: where it lives, its size and how Hadoop splits it."""
+
+    def __init__(self, path, size, hdfs=False):
+        self.path = path
+        self.size = size
+        self.hdfs = hdfs
+        self.codec = datagen.codec_for_path(path)
+
+    @property
+    def splittable(self):
+        return self.codec is None or datagen.CODECS[self.codec][1]
+
+    def split_ranges(self, split_size):
+        """Byte ranges of the file's input splits, as FileInputFormat.getSplits computes them."""
+        if not self.splittable or self.size == 0:
+            return [(0, self.size)]
+        ranges = []
+        start = 0
+        while (self.size - start) / split_size > SPLIT_SLOP:
+            ranges.append((start, start + split_size))
+            start += split_size
+        ranges.append((start, self.size))
+        return ranges
+
+
+def list_hdfs_files(hdfs_path):
+    """InputFiles of an HDFS file or directory (names starting with _ or . are skipped)."""
+    standin = datagen._standin_path(datagen.hdfs_uri(hdfs_path))
+    if standin is not None:
+        return list_local_files(standin)
+    result = subprocess.run([datagen.HDFS_COMMAND, 'dfs', '-ls', datagen.hdfs_path_of(hdfs_path)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(f"hdfs dfs -ls {hdfs_path} failed: {result.stderr.strip()[:500]}")
+    files = []
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if len(fields) < 8 or line.startswith('d'):
+            continue
+        path = fields[-1]
+        if not os.path.basename(path).startswith(('_', '.')):
+            files.append(InputFile(path, int(fields[4]), hdfs=True))
+    return files
+
+
+def list_local_files(path):
+    """InputFiles of a local file or shard directory."""
+    if not os.path.isdir(path):
+        return [InputFile(path, os.path.getsize(path))]
+    return [InputFile(os.path.join(path, name), os.path.getsize(os.path.join(path, name)))
+            for name in sorted(os.listdir(path))
+            if not name.startswith(('_', '.'))]
+
+
+def list_input_files(dataset):
+    """InputFiles of a dataset: local file, shard directory, .hdfs pointer or HDFS path(s)."""
+    if dataset.endswith(datagen.HDFS_POINTER_EXT):
+        with open(dataset) as f:
+            dataset = json.load(f)['hdfs_path']
+    if datagen.is_hdfs_path(dataset) or not os.path.exists(dataset.split(',')[0]):
+        # Nested datasets list several comma-separated input directories
+        return [f for path in dataset.split(',') for f in list_hdfs_files(path)]
+    return list_local_files(dataset)
+
+
+def sample_splits(splits, fraction):
+    """Evenly spaced subset holding about fraction of the (file, range) splits."""
+    count = max(1, round(len(splits) * fraction))
+    chosen = np.unique(np.arange(count) * len(splits) // count)
+    return [splits[i] for i in chosen]
+
+
+def tokenize(buf):
+    """Start offsets and lengths of the delimiter-separated tokens in a uint8 array."""
+    inside = np.concatenate(([False], ~DELIMITERS[buf], [False])).view(np.int8)
+    edges = np.diff(inside)
+    starts = np.flatnonzero(edges == 1)
+    return starts, np.flatnonzero(edges == -1) - starts
+
+
+def token_rows(buf, starts, lengths):
+    """
+    Zero-padded (n, width) byte rows of tokens and a 64-bit identity for each.
+
+    The rows are packed into uint64 words and mixed with the length, which is
+    exact for tokens up to 8 bytes and collision-free in practice above that.
+    """
+    width = -(-int(lengths.max()) // 8) * 8
+    columns = np.arange(width)
+    rows = buf[np.minimum(starts[:, None] + columns, len(buf) - 1)]
+    rows[columns >= lengths[:, None]] = 0
+    words = rows.view(np.uint64)
+    ids = lengths.astype(np.uint64) * ID_MULTIPLIER
+    # Only a token's own words count, so its id does not depend on the
+    # widest token it shares a chunk with
+    used = -(-lengths // 8)
+    for j in range(words.shape[1]):
+        ids = np.where(j < used, (ids ^ words[:, j]) * ID_MULTIPLIER, ids)
+    return ids, rows
+
+
+def merge_keys(ids, codes, lengths, *weights):
+    """Collapse duplicate key ids, summing the weight arrays (arrays must be non-empty)."""
+    order = np.argsort(ids, kind='stable')
+    ids = ids[order]
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    return (ids[starts], codes[order][starts], lengths[order][starts],
+            *(np.add.reduceat(w[order], starts) for w in weights))
+
+
+class KeyProfile:
+    """
+    Distinct keys of an input: occurrence count, map splits containing the key,
+    Text.hashCode() and byte length, each as a NumPy array sorted by key id.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.uint64)
+        self.codes = np.empty(0, dtype=np.int32)
+        self.lengths = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.splits = np.empty(0, dtype=np.int64)
+        self.names = {}
+        self.bytes_read = 0
+        self.splits_read = 0
+        self._pending = []
+
+    def add_chunk(self, buf):
+        """Count the tokens of a chunk of complete lines into the current split."""
+        self.bytes_read += len(buf)
+        starts, lengths = tokenize(buf)
+        short = lengths <= SHORT_TOKEN
+        for group in (short, ~short):
+            if not group.any():
+                continue
+            ids, rows = token_rows(buf, starts[group], lengths[group])
+            keys, first, counts = np.unique(ids, return_index=True, return_counts=True)
+            key_lengths = lengths[group][first]
+            self._pending.append((keys, datagen.text_hash_codes(rows[first], key_lengths),
+                                  key_lengths, counts))
+            for i in np.argsort(counts)[-TOP_KEYS:]:
+                self.names.setdefault(int(keys[i]), rows[first[i], :key_lengths[i]].tobytes())
+
+    def end_split(self):
+        """Fold the current split into the totals; each key it contains counts one map."""
+        self.splits_read += 1
+        if not self._pending:
+            return
+        ids, codes, lengths, counts = (np.concatenate(parts) for parts in zip(*self._pending))
+        self._pending = []
+        ids, codes, lengths, counts = merge_keys(ids, codes, lengths, counts)
+        self.ids, self.codes, self.lengths, self.counts, self.splits = merge_keys(
+            np.concatenate((self.ids, ids)), np.concatenate((self.codes, codes)),
+            np.concatenate((self.lengths, lengths)), np.concatenate((self.counts, counts)),
+            np.concatenate((self.splits, np.ones(len(ids), dtype=np.int64)))
+        )
+
+    def top_keys(self):
+        """Indices of the TOP_KEYS most frequent keys, most frequent first."""
+        return np.argsort(self.counts, kind='stable')[::-1][:TOP_KEYS]
+
+    def name(self, index):
+        """Text of the key at an index (its id in hex if it was never a chunk's top key)."""
+        key = int(self.ids[index])
+        name = self.names.get(key)
+        return name.decode('utf-8', 'replace') if name is not None else f"<key {key:016x}>"
+
+
+
+
+def read_mapped(input_file, ranges, profile):
+    """Profile splits of a local uncompressed file through mmap, line-aligned like LineRecordReader."""
+    if input_file.size == 0:
+        for _ in ranges:
+            profile.end_split()
+        return
+    with open(input_file.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8)
+
+        def line_start(offset):
+            # A split starting mid-line leaves that line to the previous split
+            if offset == 0 or offset >= len(mm):
+                return min(offset, len(mm))
+            newline = mm.find(b'\n', offset - 1)
+            return len(mm) if newline < 0 else newline + 1
+
+        for start, end in ranges:
+            pos, end = line_start(start), line_start(end)
+            while pos < end:
+                stop = min(pos + CHUNK_SIZE, end)
+                if stop < end:
+                    newline = mm.rfind(b'\n', pos, stop)
+                    stop = newline + 1 if newline >= 0 else line_start(stop)
+                profile.add_chunk(data[pos:stop])
+                pos = stop
+            profile.end_split()
+        # The mmap cannot close while a NumPy view still exports its buffer
+        del data
+
+
+class KeyNames:
+    """
+    Reader sink recording the text of given key ids.
+
+    Takes the place of a KeyProfile in read_splits, to name the top keys
+    that never led a chunk of their own.
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.names = {}
+
+    def add_chunk(self, buf):
+        starts, lengths = tokenize(buf)
+        short = lengths <= SHORT_TOKEN
+        for group in (short, ~short):
+            if not group.any():
+                continue
+            ids, rows = token_rows(buf, starts[group], lengths[group])
+            keys, first = np.unique(ids, return_index=True)
+            for i in np.flatnonzero(np.isin(keys, self.ids)):
+                self.names[int(keys[i])] = rows[first[i], :lengths[group][first[i]]].tobytes()
+
+    def end_split(self):
+        pass
+
+
+class CountingReader:
+    """Binary stream wrapper counting the raw bytes read, e.g. below a decompressor."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.position += len(data)
+        return data
+
+    def readable(self):
+        return True
+
+    def close(self):
+        self.stream.close()
+
+
+def open_stream(input_file):
+    """Open an input file for sequential reading: (raw CountingReader, decoded stream, hdfs process)."""
+    process = None
+    if input_file.hdfs:
+        process = subprocess.Popen([datagen.HDFS_COMMAND, 'dfs', '-cat', input_file.path],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        raw = CountingReader(process.stdout)
+    else:
+        raw = CountingReader(open(input_file.path, 'rb'))
+    if input_file.codec == 'gzip':
+        return raw, gzip.GzipFile(fileobj=raw), process
+    if input_file.codec == 'bzip2':
+        return raw, bz2.BZ2File(raw), process
+    if input_file.codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd input requires the 'zstandard' package "
+                               "(pip install zstandard)") from None
+        return raw, zstandard.ZstdDecompressor().stream_reader(raw), process
+    return raw, raw, process
+
+
+def read_ranged(input_file, ranges, profile, gateway):
+    """
+    Profile splits of an uncompressed HDFS file, fetching only their bytes.
+
+    Each split is read over WebHDFS from one byte before its start (to tell
+    whether it starts on a line) to its end, then LINE_SLACK bytes at a time
+    to the end of its last line: the lines read_mapped gives the split.
+    """
+    for start, end in ranges:
+        offset = max(start - 1, 0)
+        skipping = start > 0
+        carry = b''
+        for data in gateway.read_range(input_file.path, offset, end - offset, CHUNK_SIZE):
+            if skipping:
+                # A split starting mid-line leaves that line to the previous split
+                newline = data.find(b'\n')
+                if newline < 0:
+                    continue
+                data, skipping = data[newline + 1:], False
+            cut = data.rfind(b'\n') + 1
+            if cut:
+                profile.add_chunk(np.frombuffer(carry + data[:cut], dtype=np.uint8))
+                carry = b''
+            carry += data[cut:]
+        pos = end
+        while carry and pos < input_file.size:
+            data = b''.join(gateway.read_range(input_file.path, pos, LINE_SLACK, LINE_SLACK))
+            if not data:
+                break
+            pos += len(data)
+            newline = data.find(b'\n')
+            carry += data if newline < 0 else data[:newline + 1]
+            if newline >= 0:
+                break
+        if carry:
+            profile.add_chunk(np.frombuffer(carry, dtype=np.uint8))
+        profile.end_split()
+
+
+def read_streamed(input_file, ranges, split_size, profile):
+    """
+    Profile splits of a compressed file, or an HDFS file without WebHDFS,
+    reading it front to back.
+
+    Text belongs to the split holding the raw (compressed) offset reached
+    when it was read; the text of splits not in ranges is read and dropped.
+    """
+    splits = input_file.split_ranges(split_size)
+    wanted = set(ranges)
+    raw, stream, process = open_stream(input_file)
+    current = 0
+    carry = b''
+    try:
+        while True:
+            size = CHUNK_SIZE
+            if input_file.codec is None:
+                # Plain text: stop reads exactly at split boundaries
+                size = min(size, max(splits[current][1] - raw.position, 1))
+            data = stream.read(size)
+            if not data:
+                break
+            cut = data.rfind(b'\n') + 1
+            lines, carry = (carry + data[:cut], data[cut:]) if cut else (b'', carry + data)
+            if lines and splits[current] in wanted:
+                profile.add_chunk(np.frombuffer(lines, dtype=np.uint8))
+            while current + 1 < len(splits) and raw.position >= splits[current][1]:
+                if splits[current] in wanted:
+                    profile.end_split()
+                current += 1
+        if carry and splits[current] in wanted:
+            profile.add_chunk(np.frombuffer(carry, dtype=np.uint8))
+        for split in splits[current:]:
+            if split in wanted:
+                profile.end_split()
+    finally:
+        stream.close()
+        if process is not None:
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise OSError(f"hdfs dfs -cat {input_file.path} failed: "
+                              f"{stderr.decode('utf-8', 'replace')[:500]}")
+
+
+_gateway = None
+
+
+def webhdfs_gateway():
+    """The shared HadoopGateway when it reaches WebHDFS, else None."""
+    global _gateway
+    if _gateway is None:
+        _gateway = hadoop_gateway.HadoopGateway()
+    return _gateway if _gateway.connect() == 'webhdfs' else None
+
+
+def read_splits(input_file, ranges, split_size, sink):
+    """
+    Feed the given splits of a file to a KeyProfile (or KeyNames).
+
+    Uncompressed files are read split by split (memory-mapped, or ranged
+    WebHDFS reads on HDFS); the rest are streamed whole, so sampling them
+    saves tokenizing but no I/O.
+    """
+    if input_file.codec is None and not input_file.hdfs:
+        read_mapped(input_file, ranges, sink)
+    elif input_file.codec is None and webhdfs_gateway() is not None:
+        read_ranged(input_file, ranges, sink, webhdfs_gateway())
+    else:
+        read_streamed(input_file, ranges, split_size, sink)
+
+
+def profile_input(dataset, split_size=datagen.HDFS_BLOCK_SIZE, sample=None, progress_prefix=''):
+    """
+    Tokenize a dataset (all splits, or an evenly spaced sample of them).
+
+    Args:
+        dataset: Local file, shard directory, .hdfs pointer or HDFS path
+        split_size: Input split size (the HDFS block size)
+        sample: Fraction of splits to read; None samples inputs above
+            AUTO_SAMPLE_BYTES down to that size
+
+    Returns:
+        (KeyProfile, info dict) where info holds the input files, bytes and
+        splits in total and read, and the scale factors from sample to input.
+    """
+    files = list_input_files(dataset)
+    if not files:
+        raise FileNotFoundError(f"No input files in {dataset}")
+    splits = [(f, r) for f in files for r in f.split_ranges(split_size)]
+    total_bytes = sum(f.size for f in files)
+    if sample is None:
+        sample = min(1.0, AUTO_SAMPLE_BYTES / total_bytes) if total_bytes else 1.0
+    chosen = sample_splits(splits, sample) if sample < 1 else splits
+    sampled_bytes = sum(end - start for _, (start, end) in chosen)
+
+    profile = KeyProfile()
+    for n, input_file in enumerate(files, 1):
+        ranges = [r for f, r in chosen if f is input_file]
+        if ranges:
+            read_splits(input_file, ranges, split_size, profile)
+        if len(files) > 1:
+            print(f"{progress_prefix}Files: {n}/{len(files)}, {profile.bytes_read / datagen.MB:,.0f}MB "
+                  f"tokenized", end='\r', flush=True)
+    if len(files) > 1:
+        print()
+
+    unnamed = [profile.ids[i] for i in profile.top_keys() if int(profile.ids[i]) not in profile.names]
+    if unnamed:
+        first_file, first_range = chosen[0]
+        finder = KeyNames(np.array(unnamed, dtype=np.uint64))
+        read_splits(first_file, [first_range], split_size, finder)
+        profile.names.update(finder.names)
+
+    info = {
+        'dataset': dataset,
+        'input_files': len(files),
+        'input_bytes': total_bytes,
+        'input_splits': len(splits),
+        'sampled_splits': len(chosen),
+        'sampled_bytes': sampled_bytes,
+        'bytes_tokenized': profile.bytes_read,
+        # Occurrence totals scale with the bytes read, per-map combiner output with the splits
+        'record_scale': total_bytes / sampled_bytes if sampled_bytes else 1.0,
+        'split_scale': len(splits) / len(chosen),
+    }
+    return profile, info
+
+
+def serialized_record_bytes(lengths):
+    """
+    Map output bytes of a (Text key, IntWritable value) record, as in MAP_OUTPUT_BYTES.
+
+    Text writes a VInt length before its bytes (1 byte up to 127, then 1 plus
+    the bytes of the length), IntWritable 4 bytes.
+    """
+    vint = np.where(lengths <= 127, 1, np.where(lengths <= 0xFF, 2, np.where(lengths <= 0xFFFF, 3, 4)))
+    return lengths + vint + 4
+
+
+def key_statistics(profile, info):
+    """Key-frequency statistics: totals, skew coefficients and the most frequent keys."""
+    counts = profile.counts
+    total = int(counts.sum())
+    ordered = np.sort(counts)
+    n = len(ordered)
+    # Gini coefficient of the key frequencies: 0 for equally frequent keys, -> 1 for one dominant key
+    gini = float(2 * np.dot(np.arange(1, n + 1), ordered) / (n * total) - (n + 1) / n) if total else 0.0
+    top = profile.top_keys()
+    return {
+        'tokens': int(round(total * info['record_scale'])),
+        'distinct_keys': n,
+        'distinct_keys_exact': info['sampled_splits'] == info['input_splits'],
+        'mean_key_count': total / n * info['record_scale'] if n else 0.0,
+        'max_key_count': int(round(ordered[-1] * info['record_scale'])) if n else 0,
+        'top_key_share': float(ordered[-1] / total) if total else 0.0,
+        'count_cv': float(counts.std() / counts.mean()) if n else 0.0,
+        'gini': gini,
+        'top_keys': [{'key': profile.name(i), 'count': int(round(counts[i] * info['record_scale'])),
+                      'share': float(counts[i] / total),
+                      'hash_code': int(profile.codes[i])} for i in top],
+    }
+
+
+def load_summary(loads):
+    """Skew of one per-reducer load vector: max/mean imbalance, CV and the busiest reducer."""
+    mean = loads.mean()
+    return {
+        'max': float(loads.max()),
+        'mean': float(mean),
+        'imbalance': float(loads.max() / mean) if mean else 1.0,
+        'cv': float(loads.std() / mean) if mean else 0.0,
+        'busiest': int(loads.argmax()),
+        'empty': int(np.count_nonzero(loads == 0)),
+    }
+
+
+def predict_reducer_loads(profile, info, num_reducers):
+    """
+    Predicted input of every reducer under HashPartitioner with num_reducers reduces.
+
+    Without a combiner each occurrence is one shuffled record; with one, each
+    map task emits one record per distinct key it saw.
+
+    Returns:
+        Dict with per-reducer 'records', 'bytes', 'combined_records' and
+        'combined_bytes' lists and a load_summary of each.
+    """
+    partitions = datagen.hash_partitions(profile.codes, num_reducers)
+    record_bytes = serialized_record_bytes(profile.lengths)
+    loads = {
+        'records': np.bincount(partitions, profile.counts, num_reducers) * info['record_scale'],
+        'bytes': np.bincount(partitions, profile.counts * record_bytes, num_reducers) * info['record_scale'],
+        'combined_records': np.bincount(partitions, profile.splits, num_reducers) * info['split_scale'],
+        'combined_bytes': np.bincount(partitions, profile.splits * record_bytes, num_reducers) * info['split_scale'],
+    }
+    prediction = {'num_reducers': num_reducers}
+    for name, values in loads.items():
+        prediction[name] = [int(round(v)) for v in values]
+        prediction[f"{name}_summary"] = load_summary(values)
+    return prediction
+
+
+def recommend_reducers(predictions, load='records'):
+    """
+    Largest reducer count whose busiest reducer stays within BALANCE_THRESHOLD
+    of the mean, or, if none above one reducer does, the count with the
+    lightest busiest reducer.
+
+    Returns:
+        (num_reducers, balanced)
+    """
+    candidates = [p for p in predictions if p['num_reducers'] > 1] or predictions
+    balanced = [p for p in candidates if p[f"{load}_summary"]['imbalance'] <= BALANCE_THRESHOLD]
+    if balanced:
+        return balanced[-1]['num_reducers'], True
+    best = min(candidates, key=lambda p: p[f"{load}_summary"]['max'])
+    return best['num_reducers'], False
+
+
+def parse_reducer_counts(text):
+    """Reducer counts from '8', '4,8,16' or '1-32' (ranges and lists may be mixed)."""
+    counts = set()
+    for part in text.split(','):
+        first, sep, last = part.strip().partition('-')
+        if not first.isdigit() or (sep and not last.isdigit()):
+            raise argparse.ArgumentTypeError(f"invalid reducer counts '{text}'")
+        counts.update(range(int(first), int(last if sep else first) + 1))
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError(f"reducer counts must be positive: '{text}'")
+    return sorted(counts)
+
+
+def parse_fraction(text):
+    """Sample fraction in (0, 1]."""
+    value = float(text)
+    if not 0 < value <= 1:
+        raise argparse.ArgumentTypeError(f"sample fraction must be in (0, 1]: '{text}'")
+    return value
+
+
+def print_report(stats, info, predictions, per_reducer=None):
+    """Print the key statistics, the reducer-count table and a recommendation."""
+    sampled = info['sampled_splits'] < info['input_splits']
+    print(f"Input: {info['input_bytes'] / datagen.MB:,.1f}MB in {info['input_files']:,} file(s), "
+          f"{info['input_splits']:,} map split(s)")
+    if sampled:
+        print(f"  Sampled {info['sampled_splits']:,} split(s) ({info['sampled_bytes'] / datagen.MB:,.1f}MB); "
+              f"totals scaled x{info['record_scale']:.2f}, distinct keys are a lower bound")
+    print(f"Tokens: {stats['tokens']:,}   Distinct keys: {stats['distinct_keys']:,}   "
+          f"Mean count per key: {stats['mean_key_count']:,.1f}")
+    print(f"Skew: top key {stats['top_key_share']:.2%} of tokens, Gini {stats['gini']:.3f}, "
+          f"count CV {stats['count_cv']:.2f}")
+    print("Top keys:")
+    for key in stats['top_keys']:
+        print(f"  {key['key'][:40]:<40} {key['count']:>15,} {key['share']:>8.2%}")
+    print()
+
+    print(f"{'Reducers':>8}  {'max/mean':>9} {'CV':>6} {'max records':>14} {'max MB':>10}   "
+          f"{'combiner: max/mean':>18} {'max records':>12}")
+    for p in predictions:
+        plain, combined = p['records_summary'], p['combined_records_summary']
+        print(f"{p['num_reducers']:>8}  {plain['imbalance']:>9.2f} {plain['cv']:>6.2f} "
+              f"{plain['max']:>14,.0f} {p['bytes_summary']['max'] / datagen.MB:>10,.1f}   "
+              f"{combined['imbalance']:>18.2f} {combined['max']:>12,.0f}")
+    print()
+
+    for load, label in (('records', 'without combiner'), ('combined_records', 'with combiner')):
+        count, balanced = recommend_reducers(predictions, load)
+        if balanced:
+            print(f"✓ {label}: {count} reducer(s) keep the busiest reducer within "
+                  f"{BALANCE_THRESHOLD:.1f}x of the mean")
+        else:
+            print(f"⚠ Warning: {label}: no reducer count is balanced; {count} reducer(s) give the "
+                  f"lightest busiest reducer")
+    if stats['top_key_share'] * max(p['num_reducers'] for p in predictions) > BALANCE_THRESHOLD:
+        print(f"  The top key alone is {stats['top_key_share']:.1%} of the records: HashPartitioner "
+              f"sends it to a single reducer, so without a combiner that reducer straggles")
+
+    if per_reducer is not None:
+        p = next(p for p in predictions if p['num_reducers'] == per_reducer)
+        print()
+        print(f"Per-reducer load with {per_reducer} reducer(s):")
+        print(f"{'Reducer':>8} {'records':>15} {'MB':>10} {'combined records':>17} {'combined MB':>12}")
+        for r in range(per_reducer):
+            print(f"{r:>8} {p['records'][r]:>15,} {p['bytes'][r] / datagen.MB:>10,.1f} "
+                  f"{p['combined_records'][r]:>17,} {p['combined_bytes'][r] / datagen.MB:>12,.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Predict per-reducer WordCount load from an input dataset.')
+    parser.add_argument('dataset', help='Local file, shard directory, .hdfs pointer or HDFS path')
+    parser.add_argument('--reducers', type=parse_reducer_counts, default=DEFAULT_REDUCER_COUNTS,
+                        help=f'Reducer counts to predict, e.g. 8, 4,8,16 or 1-32 '
+                             f'(default: {DEFAULT_REDUCER_COUNTS})')
+    parser.add_argument('--sample', type=parse_fraction, default=None,
+                        help=f'Fraction of input splits to read (default: all, or '
+                             f'{AUTO_SAMPLE_BYTES // datagen.GB}GB worth for larger inputs); '
+                             f'compressed files and HDFS without WebHDFS are still read in full')
+    parser.add_argument('--split-mb', type=int, default=datagen.HDFS_BLOCK_SIZE // datagen.MB,
+                        help='Input split size in MB (default: the HDFS block size)')
+    parser.add_argument('--per-reducer', type=int, metavar='N',
+                        help='Also list every reducer\'s predicted load for N reducers')
+    parser.add_argument('--json', metavar='PATH', help='Write the full report as JSON')
+    args = parser.parse_args()
+    if args.per_reducer is not None:
+        args.reducers = sorted(set(args.reducers) | {args.per_reducer})
+
+    try:
+        profile, info = profile_input(args.dataset, split_size=args.split_mb * datagen.MB,
+                                      sample=args.sample)
+    except (OSError, RuntimeError) as e:
+        print(f"✗ {e}")
+        sys.exit(2)
+    stats = key_statistics(profile, info)
+    predictions = [predict_reducer_loads(profile, info, r) for r in args.reducers]
+    print_report(stats, info, predictions, args.per_reducer)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'input': info, 'keys': stats, 'reducers': predictions}, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
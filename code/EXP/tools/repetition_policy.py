@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+How many times to repeat a configuration: a fixed count or until its mean is known well enough.
+
+With the adaptive policy a configuration is run at least min_runs times and
+then again until the Student-t confidence interval of the mean job time is
+narrow enough for every metric (by default the script's wall time,
+total_time, and the JobHistory job time, total_time_from_api), or
+max_runs is reached. Quiet configurations stop early; noisy ones get the
+runs they need to be told apart.
+
+    python3 repetition_policy.py 61.2 63.0 60.8 --target 0.02
+"""
+
+import argparse
+import math
+import statistics
+
+POLICIES = ('fixed', 'adaptive')
+
+DEFAULT_METRICS = ('total_time', 'total_time_from_api')
+
+# Two-sided Student-t critical values by confidence level and degrees of
+# freedom; larger df use the next smaller tabulated df (slightly wider)
+T_TABLE_DF = list(range(1, 31)) + [40, 60, 120]
+T_TABLE = {
+    0.90: [6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+           1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+           1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697,
+           1.684, 1.671, 1.658],
+    0.95: [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+           2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+           2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+           2.021, 2.000, 1.980],
+    0.99: [63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+           3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+           2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750,
+           2.704, 2.660, 2.617],
+}
+
+# Policy settings a matrix, workload or sweep may give under "repetition"
+REPETITION_DEFAULTS = {
+    'policy': 'fixed',
+    'min_runs': 3,
+    'max_runs': 10,
+    'confidence': 0.95,
+    # Half-width of the interval relative to the mean, and/or in seconds
+    'target_relative': 0.05,
+    'target_seconds': None,
+    'metrics': list(DEFAULT_METRICS),
+}
+
+
+def t_quantile(confidence, df):
+    """Two-sided Student-t critical value for a confidence level in T_TABLE."""
+    if confidence not in T_TABLE:
+        raise ValueError(f"Confidence must be one of {', '.join(map(str, T_TABLE))}, got {confidence}")
+    index = max(i for i, tabulated in enumerate(T_TABLE_DF) if tabulated <= max(df, 1))
+    return T_TABLE[confidence][index]
+
+
+def confidence_interval(values, confidence=0.95):
+    """
+    Mean of the values and the half-width of its confidence interval.
+
+    Returns:
+        (mean, half_width); half_width is None for fewer than two values
+    """
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, None
+    return mean, t_quantile(confidence, len(values) - 1) * statistics.stdev(values) / math.sqrt(len(values))
+
+
+def validate(settings, where):
+    """Check merged repetition settings; raises ValueError naming `where`."""
+    if settings['policy'] not in POLICIES:
+        raise ValueError(f"{where}: repetition policy must be one of {', '.join(POLICIES)}")
+    if settings['confidence'] not in T_TABLE:
+        raise ValueError(f"{where}: repetition confidence must be one of {', '.join(map(str, T_TABLE))}")
+    if not 2 <= settings['min_runs'] <= settings['max_runs']:
+        raise ValueError(f"{where}: repetition needs 2 <= min_runs <= max_runs")
+    if settings['target_relative'] is None and settings['target_seconds'] is None:
+        raise ValueError(f"{where}: repetition needs target_relative or target_seconds")
+
+
+class RepetitionPolicy:
+    """Decides whether a configuration's results so far pin down its mean job time."""
+
+    def __init__(self, min_runs=3, max_runs=10, confidence=0.95, target_relative=0.05,
+                 target_seconds=None, metrics=DEFAULT_METRICS, **_):
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.confidence = confidence
+        self.target_relative = target_relative
+        self.target_seconds = target_seconds
+        self.metrics = list(metrics)
+
+    def narrow_enough(self, mean, half_width):
+        """Whether an interval meets one of the targets."""
+        if half_width is None:
+            return False
+        if self.target_seconds is not None and half_width <= self.target_seconds:
+            return True
+        return self.target_relative is not None and mean > 0 and half_width / mean <= self.target_relative
+
+    def assess(self, results):
+        """
+        Interval of every metric over a configuration's successful runs.
+
+        Metrics missing from all results (e.g. JobHistory unreachable) are
+        left out; the others must each have min_runs values.
+
+        Returns:
+            Dict with runs, converged and per-metric mean, half_width and
+            relative half-width
+        """
+        summary = {}
+        for metric in self.metrics:
+            values = [result[metric] for result in results if result.get(metric) is not None]
+            if not values:
+                continue
+            mean, half_width = confidence_interval(values, self.confidence)
+            summary[metric] = {
+                'runs': len(values),
+                'mean': round(mean, 3),
+                'half_width': round(half_width, 3) if half_width is not None else None,
+                'relative': round(half_width / mean, 4) if half_width is not None and mean > 0 else None,
+                'narrow': len(values) >= self.min_runs and self.narrow_enough(mean, half_width),
+            }
+        return {
+            'runs': len(results),
+            'converged': bool(summary) and len(results) >= self.min_runs
+                         and all(entry['narrow'] for entry in summary.values()),
+            'metrics': summary,
+        }
+
+
+def target_text(settings):
+    """The interval target of repetition settings, e.g. ±5% of the mean or ±2.0s."""
+    targets = []
+    if settings['target_relative'] is not None:
+        targets.append(f"±{settings['target_relative']:.0%} of the mean")
+    if settings['target_seconds'] is not None:
+        targets.append(f"±{settings['target_seconds']:.1f}s")
+    return ' or '.join(targets)
+
+
+def describe(assessment):
+    """One-line summary of an assessment, e.g. total_time 61.7 ± 1.2s (1.9%)."""
+    parts = []
+    for metric, entry in assessment['metrics'].items():
+        text = f"{metric} {entry['mean']:.1f}"
+        if entry['half_width'] is not None:
+            text += f" ± {entry['half_width']:.1f}"
+        text += 's'
+        if entry['relative'] is not None:
+            text += f" ({entry['relative']:.1%})"
+        parts.append(text)
+    return ', '.join(parts) or 'no timings'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Confidence interval of a mean job time.')
+    parser.add_argument('times', type=float, nargs='+', help='Job times of one configuration (seconds)')
+    parser.add_argument('--confidence', type=float, default=0.95, choices=sorted(T_TABLE))
+    parser.add_argument('--target', type=float, default=0.05,
+                        help='Target half-width relative to the mean (default: 0.05)')
+    args = parser.parse_args()
+
+    policy = RepetitionPolicy(min_runs=2, confidence=args.confidence, target_relative=args.target,
+                              metrics=['total_time'])
+    assessment = policy.assess([{'total_time': t} for t in args.times])
+    print(f"{len(args.times)} runs: {describe(assessment)}")
+    entry = assessment['metrics']['total_time']
+    if assessment['converged']:
+        print(f"✓ Interval within {args.target:.1%} of the mean")
+    elif entry['half_width'] is not None:
+        # Runs needed if the spread stays the same: half-width shrinks with 1/sqrt(n)
+        needed = math.ceil(len(args.times) * (entry['relative'] / args.target) ** 2)
+        print(f"✗ Interval wider than {args.target:.1%}; roughly {needed} runs needed at this spread")
+
+
+if __name__ == '__main__':
+    main()
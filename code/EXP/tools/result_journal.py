@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Append-only JSONL journal of finished experiment jobs.
+
+The engine appends every result as soon as its job has finished and fsyncs
+the file, so an interrupted or crashed campaign loses nothing it already
+measured; the next start reads the journal back and skips those jobs.
+Each line is one flat result record (as in raw_results_*.json) plus the
+job_key that identifies it in the plan, so tools can read the journal
+directly:
+
+    python3 result_journal.py ../task1/results/journal_wordcount.jsonl
+    pandas.read_json('../task1/results/journal_wordcount.jsonl', lines=True)
+
+A torn last line (the process died mid-write) is ignored when reading.
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+# Journal of the running campaign in the task's results directory, one per
+# selection of sweeps so campaigns over different sweeps resume separately
+JOURNAL_FILE = 'journal_{sweeps}.jsonl'
+
+# Job fields that identify a result within a campaign
+KEY_FIELDS = ('sweep', 'workload', 'dataset', 'slowstart', 'reducers', 'run')
+
+
+def job_key(job):
+    """Identity of a planned job (or of a journal record's job_key) as a hashable tuple."""
+    return tuple(job[field] for field in KEY_FIELDS)
+
+
+def read_journal(path):
+    """
+    Result records of a journal, in the order they were written.
+
+    A line that does not parse is skipped only when it is the last one
+    (an interrupted append); anywhere else it is an error (ValueError).
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        lines = [line for line in f.read().split('\n') if line.strip()]
+    records = []
+    for number, line in enumerate(lines, 1):
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            if number == len(lines):
+                break
+            raise ValueError(f"{path}:{number}: {e}") from None
+    return records
+
+
+class ResultJournal:
+    """The journal of one campaign; appends are durable once append returns."""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = read_journal(path)
+        self._drop_torn_tail()
+
+    def _drop_torn_tail(self):
+        """Cut an interrupted last append so the next record starts on a line of its own."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def completed(self):
+        """Keys of the jobs already in the journal."""
+        return {job_key(record['job_key']) for record in self.records if 'job_key' in record}
+
+    def append(self, job, result):
+        """Write one finished job's result and fsync it before returning."""
+        record = {
+            **result,
+            'job_key': {field: job[field] for field in KEY_FIELDS},
+            'journaled_at': datetime.now().isoformat(),
+        }
+        created = not os.path.exists(self.path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        if created:
+            # Make the new directory entry durable too
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.records.append(record)
+        return record
+
+    def retire(self, new_path):
+        """Move a finished campaign's journal aside so the next campaign starts empty."""
+        if os.path.exists(self.path):
+            os.replace(self.path, new_path)
+        self.path = new_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize an experiment result journal.')
+    parser.add_argument('journal', help='Journal file (results/journal_<sweeps>.jsonl)')
+    args = parser.parse_args()
+
+    try:
+        records = read_journal(args.journal)
+    except ValueError as e:
+        print(f"✗ {e}")
+        raise SystemExit(2)
+    print(f"{args.journal}: {len(records)} finished job(s)")
+    for record in records:
+        key = record.get('job_key', {})
+        print(f"  {key.get('sweep', '?'):<12} {key.get('dataset', '?'):<10} r={key.get('reducers', '?'):<3} "
+              f"s={key.get('slowstart', '?'):<5} run {key.get('run', '?')}  "
+              f"{record.get('total_time', 0):8.2f}s  {record.get('job_id', 'unknown')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Search the best slowstart of a configuration instead of sweeping the whole grid.
+
+Sweeping nine slowstart values three times costs 27 jobs per dataset when
+usually only the fastest value matters. The optimizer models job time as a
+function of slowstart in (0, 1] with a Gaussian process (squared-exponential
+kernel plus observation noise, hyperparameters chosen by marginal
+likelihood), so repeated and noisy runs are averaged rather than trusted
+one by one. The next slowstart to run is the one with the largest expected
+improvement; the search stops once that improvement is a negligible
+fraction of the predicted best time.
+
+Results of earlier campaigns (raw_results_*.json) seed the model as
+observations that count as noisier than new ones, since the cluster may
+have changed since. The best slowstart comes with the predicted time and a
+range: where the optimum falls in 90% of the posterior's sample curves.
+
+    python3 slowstart_optimizer.py ../task1/results/raw_results_*.json --match data_size=1GB num_reducers=4
+"""
+
+import argparse
+import glob
+import json
+import math
+
+import numpy as np
+
+import result_journal
+
+# Optimizer settings a matrix may give under "optimizer"
+OPTIMIZER_DEFAULTS = {
+    'enabled': False,
+    # Result field to minimize
+    'metric': 'total_time',
+    # Slowstart values tried first when the history covers fewer than three
+    'initial': [0.05, 0.5, 1.0],
+    # Resolution of the candidate slowstart values in (0, 1]
+    'step': 0.01,
+    'min_evaluations': 4,
+    'max_evaluations': 12,
+    # Stop when the expected improvement falls below this fraction of the best predicted time
+    'stop_improvement': 0.005,
+    # Past results files (globs relative to the results directory) and how
+    # many times noisier than a new run one of their observations counts
+    'history': ['raw_results_*.json'],
+    'history_noise': 4.0,
+    'seed': 0,
+}
+
+# Hyperparameter grid: kernel length scale in slowstart units, and noise
+# variance relative to the variance of the (standardized) job times
+LENGTH_SCALES = (0.05, 0.1, 0.2, 0.35, 0.6, 1.0)
+NOISE_RATIOS = (0.01, 0.03, 0.1, 0.3, 1.0)
+
+POSTERIOR_SAMPLES = 500
+
+# mapreduce.job.reduce.slowstart.completedmaps when a job does not set it
+HADOOP_DEFAULT_SLOWSTART = 0.05
+
+
+def normal_cdf(z):
+    return 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+
+
+def normal_pdf(z):
+    return np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+
+
+def kernel(a, b, length_scale):
+    """Squared-exponential covariance between two vectors of slowstart values."""
+    return np.exp(-0.5 * ((a[:, None] - b[None, :]) / length_scale) ** 2)
+
+
+def load_history(patterns, match, metric='total_time'):
+    """
+    (slowstart, metric) pairs of past results whose fields equal `match`.
+
+    patterns are file globs; .jsonl files are read as result journals.
+    Records seen in several files (a results file and its journal) count once.
+    """
+    points = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            try:
+                if path.endswith('.jsonl'):
+                    records = result_journal.read_journal(path)
+                else:
+                    with open(path) as f:
+                        data = json.load(f)
+                    records = data.get('results', []) if isinstance(data, dict) else data
+            except (OSError, ValueError):
+                continue
+            for record in records:
+                if record.get(metric) is None or record.get('slowstart') is None:
+                    continue
+                if any(record.get(field, {} if field == 'job_properties' else None) != value
+                       for field, value in match.items()):
+                    continue
+                points[(record.get('job_id'), record.get('submit_time'), record['slowstart'])] = \
+                    (float(record['slowstart']), float(record[metric]))
+    return list(points.values())
+
+
+class GaussianProcess:
+    """GP regression on slowstart with per-observation noise weights."""
+
+    def __init__(self, x, y, weights):
+        self.x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.offset = y.mean()
+        self.scale = y.std() or 1.0
+        self.y = (y - self.offset) / self.scale
+
+        best = None
+        for length_scale in LENGTH_SCALES:
+            for noise in NOISE_RATIOS:
+                factor = self._factor(length_scale, noise)
+                if factor is None:
+                    continue
+                alpha = np.linalg.solve(factor.T, np.linalg.solve(factor, self.y))
+                likelihood = -0.5 * self.y @ alpha - np.log(np.diag(factor)).sum()
+                if best is None or likelihood > best[0]:
+                    best = (likelihood, length_scale, noise, factor, alpha)
+        _, self.length_scale, self.noise, self.factor, self.alpha = best
+
+    def _factor(self, length_scale, noise):
+        covariance = kernel(self.x, self.x, length_scale) + np.diag(noise * self.weights + 1e-9)
+        try:
+            return np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            return None
+
+    def predict(self, points, full=False):
+        """
+        Posterior of the noise-free job time at slowstart values.
+
+        Returns:
+            (mean, std) in seconds; with full, (mean, covariance) instead
+        """
+        points = np.asarray(points, dtype=float)
+        cross = kernel(points, self.x, self.length_scale)
+        mean = cross @ self.alpha
+        v = np.linalg.solve(self.factor, cross.T)
+        if full:
+            covariance = kernel(points, points, self.length_scale) - v.T @ v
+            return self.offset + self.scale * mean, self.scale ** 2 * covariance
+        variance = np.clip(1.0 - (v ** 2).sum(axis=0), 1e-12, None)
+        return self.offset + self.scale * mean, self.scale * np.sqrt(variance)
+
+
+class SlowstartOptimizer:
+    """
+    Bayesian optimization of one configuration's job time over slowstart.
+
+    Feed it past results with add_history and every finished run with
+    observe; suggest returns the next slowstart, or None once the search
+    is done (see stopped).
+    """
+
+    def __init__(self, metric='total_time', initial=(0.05, 0.5, 1.0), step=0.01, min_evaluations=4,
+                 max_evaluations=12, stop_improvement=0.005, history_noise=4.0, seed=0, **_):
+        self.metric = metric
+        self.initial = [round(x, 2) for x in initial]
+        self.candidates = np.round(np.arange(1, int(round(1 / step)) + 1) * step, 4)
+        self.min_evaluations = min_evaluations
+        self.max_evaluations = max_evaluations
+        self.stop_improvement = stop_improvement
+        self.history_noise = history_noise
+        self.rng = np.random.default_rng(seed)
+        self.history = []
+        self.observations = []
+        self.stopped = None
+        self.expected_improvement = None
+
+    def add_history(self, points):
+        self.history.extend(points)
+
+    def observe(self, slowstart, value):
+        self.observations.append((float(slowstart), float(value)))
+
+    def model(self):
+        """GP over history and new observations, or None without any."""
+        points = self.history + self.observations
+        if not points:
+            return None
+        weights = [self.history_noise] * len(self.history) + [1.0] * len(self.observations)
+        return GaussianProcess([x for x, _ in points], [y for _, y in points], weights)
+
+    def suggest(self):
+        """Next slowstart to run, or None when the search has stopped."""
+        tried = {x for x, _ in self.history + self.observations}
+        if len({x for x, _ in self.history}) < len(self.initial):
+            for x in self.initial:
+                if x not in tried:
+                    return x
+        if len(self.observations) >= self.max_evaluations:
+            self.stopped = 'max_evaluations'
+            return None
+
+        gp = self.model()
+        if gp is None:
+            return HADOOP_DEFAULT_SLOWSTART
+        mean, std = gp.predict(self.candidates)
+        # Noisy expected improvement: against the best predicted time among the
+        # slowstarts already run, not the single luckiest observation
+        best = gp.predict(sorted(tried))[0].min()
+        z = (best - mean) / std
+        improvement = (best - mean) * normal_cdf(z) + std * normal_pdf(z)
+        index = int(np.argmax(improvement))
+        self.expected_improvement = float(improvement[index])
+        if len(self.observations) >= self.min_evaluations \
+                and self.expected_improvement < self.stop_improvement * best:
+            self.stopped = 'converged'
+            return None
+        return float(self.candidates[index])
+
+    def result(self):
+        """
+        The best slowstart the model predicts and how sure it is.
+
+        Returns:
+            Dict with slowstart, predicted time and its std, the 90% range of
+            the optimum's location, evaluation counts and why the search stopped
+        """
+        gp = self.model()
+        mean, covariance = gp.predict(self.candidates, full=True)
+        index = int(np.argmin(mean))
+        samples = self.rng.multivariate_normal(mean, covariance + 1e-9 * np.eye(len(mean)),
+                                               size=POSTERIOR_SAMPLES, method='eigh')
+        optima = self.candidates[np.argmin(samples, axis=1)]
+        return {
+            'slowstart': float(self.candidates[index]),
+            'predicted_time': round(float(mean[index]), 2),
+            'predicted_std': round(float(math.sqrt(max(covariance[index, index], 0.0))), 2),
+            'slowstart_range': [float(np.percentile(optima, 5)), float(np.percentile(optima, 95))],
+            'metric': self.metric,
+            'evaluations': len(self.observations),
+            'history_points': len(self.history),
+            'expected_improvement': round(self.expected_improvement, 3)
+                                    if self.expected_improvement is not None else None,
+            'stopped': self.stopped,
+            'length_scale': gp.length_scale,
+        }
+
+
+def describe(result):
+    """One-line summary of an optimizer result."""
+    low, high = result['slowstart_range']
+    return (f"slowstart {result['slowstart']:.2f} (90% range {low:.2f}-{high:.2f}), "
+            f"predicted {result['metric']} {result['predicted_time']:.1f} ± {result['predicted_std']:.1f}s")
+
+
+def parse_match(text):
+    """FIELD=VALUE, with the value read as JSON when it parses (numbers, booleans)."""
+    field, _, value = text.partition('=')
+    try:
+        return field, json.loads(value)
+    except ValueError:
+        return field, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Best slowstart predicted from past results.')
+    parser.add_argument('results', nargs='+', help='Results files (raw_results_*.json or journals)')
+    parser.add_argument('--match', nargs='*', type=parse_match, default=[], metavar='FIELD=VALUE',
+                        help='Only results with these fields, e.g. data_size=1GB num_reducers=4')
+    parser.add_argument('--metric', default='total_time', help='Result field to minimize (default: total_time)')
+    args = parser.parse_args()
+
+    points = load_history(args.results, dict(args.match), args.metric)
+    if len({x for x, _ in points}) < 2:
+        print(f"✗ Need results at two or more slowstart values, found {len(points)} result(s)")
+        raise SystemExit(1)
+    optimizer = SlowstartOptimizer(metric=args.metric, initial=[], min_evaluations=0)
+    optimizer.observations = points
+    result = optimizer.result()
+    print(f"{len(points)} results from {len(args.results)} file(s): {describe(result)}")
+    following = optimizer.suggest()
+    if following is not None:
+        print(f"  Next slowstart worth running: {following:.2f} "
+              f"(expected improvement {optimizer.expected_improvement:.2f}s)")
+    else:
+        print(f"  ✓ No slowstart expected to improve by more than "
+              f"{optimizer.stop_improvement:.1%} of the best time")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.io.PrintWriter;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.net.InetAddress;
+import java.net.MalformedURLException;
+import java.net.ServerSocket;
+import java.net.Socket;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
+import java.util.Arrays;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+
+import org.apache.hadoop.conf.Configuration;
+import org.apache.hadoop.mapreduce.Job;
+import org.apache.hadoop.util.Tool;
+import org.apache.hadoop.util.ToolRunner;
+
+/**
+ * Resident MapReduce job client for the experiment engine.
+ *
+ * `hadoop jar job-submitter.jar JobSubmitter PORT_FILE` starts one JVM that
+ * listens on a loopback port (written to PORT_FILE) and runs every job of
+ * an experiment, so no job pays for a client JVM of its own. One request
+ * per connection, a tab-separated line:
+ *
+ *   RUN  jar  class  arg...
+ *
+ * A class with a static createJob(Configuration, String[]) (the tasks'
+ * WordCount) is configured by it and started with Job.submit(); the reply
+ * is "SUBMITTED job_..." at once and "FINISHED <exit code>" when the job
+ * ends. Any other class must be a Tool (TeraSort) and runs through
+ * ToolRunner, replying only "FINISHED". Failures reply "ERROR <message>".
+ * The JVM exits when its standard input closes, i.e. with the engine.
+ */
+public class JobSubmitter {
+
+    // Completion poll of a submitted job; Hadoop's default is 5 seconds
+    private static final int COMPLETION_POLL_MS = 500;
+
+    // One class loader per job JAR, reused by every later job
+    private static final Map<String, ClassLoader> LOADERS = new ConcurrentHashMap<>();
+
+    public static void main(String[] args) throws Exception {
+        if (args.length != 1) {
+            System.err.println("Usage: JobSubmitter PORT_FILE");
+            System.exit(2);
+        }
+
+        Thread watcher = new Thread(() -> {
+            try {
+                while (System.in.read() != -1) {
+                    // Nothing is sent on stdin; it only closes
+                }
+            } catch (IOException e) {
+                // Treated like end of input
+            }
+            System.exit(0);
+        });
+        watcher.setDaemon(true);
+        watcher.start();
+
+        ServerSocket server = new ServerSocket(0, 50, InetAddress.getLoopbackAddress());
+        Path portFile = Paths.get(args[0]);
+        Path partial = Paths.get(args[0] + ".tmp");
+        Files.write(partial, String.valueOf(server.getLocalPort()).getBytes(StandardCharsets.UTF_8));
+        Files.move(partial, portFile, StandardCopyOption.ATOMIC_MOVE);
+        System.out.println("JobSubmitter listening on port " + server.getLocalPort());
+
+        while (true) {
+            Socket socket = server.accept();
+            Thread worker = new Thread(() -> serve(socket));
+            worker.setDaemon(true);
+            worker.start();
+        }
+    }
+
+    private static void serve(Socket socket) {
+        try (Socket connection = socket;
+             BufferedReader in = new BufferedReader(
+                 new InputStreamReader(connection.getInputStream(), StandardCharsets.UTF_8));
+             PrintWriter out = new PrintWriter(
+                 new OutputStreamWriter(connection.getOutputStream(), StandardCharsets.UTF_8), true)) {
+            String request = in.readLine();
+            if (request == null) {
+                return;
+            }
+            String[] fields = request.split("\t", -1);
+            if (fields.length < 3 || !fields[0].equals("RUN")) {
+                out.println("ERROR Malformed request (expected RUN, jar, class and arguments)");
+                return;
+            }
+            try {
+                int code = run(fields[1], fields[2], Arrays.copyOfRange(fields, 3, fields.length), out);
+                out.println("FINISHED " + code);
+            } catch (Throwable e) {
+                Throwable cause = e instanceof InvocationTargetException && e.getCause() != null ? e.getCause() : e;
+                cause.printStackTrace();
+                out.println("ERROR " + String.valueOf(cause).replace('\n', ' '));
+            }
+        } catch (IOException e) {
+            System.err.println("Connection failed: " + e);
+        }
+    }
+
+    private static int run(String jar, String className, String[] args, PrintWriter out) throws Exception {
+        ClassLoader loader = LOADERS.computeIfAbsent(jar, JobSubmitter::loaderFor);
+        Class<?> mainClass = Class.forName(className, true, loader);
+        Thread.currentThread().setContextClassLoader(loader);
+
+        Configuration conf = new Configuration();
+        conf.setClassLoader(loader);
+        conf.setInt("mapreduce.client.completion.pollinterval", COMPLETION_POLL_MS);
+
+        Method createJob = findCreateJob(mainClass);
+        if (createJob != null) {
+            Job job = (Job) createJob.invoke(null, conf, args);
+            job.submit();
+            out.println("SUBMITTED " + job.getJobID());
+            return job.waitForCompletion(false) ? 0 : 1;
+        }
+        if (Tool.class.isAssignableFrom(mainClass)) {
+            Tool tool = (Tool) mainClass.getDeclaredConstructor().newInstance();
+            return ToolRunner.run(conf, tool, args);
+        }
+        throw new IllegalArgumentException(
+            className + " neither has a static createJob(Configuration, String[]) nor implements Tool");
+    }
+
+    private static Method findCreateJob(Class<?> mainClass) {
+        try {
+            Method method = mainClass.getMethod("createJob", Configuration.class, String[].class);
+            if (Modifier.isStatic(method.getModifiers()) && Job.class.isAssignableFrom(method.getReturnType())) {
+                return method;
+            }
+        } catch (NoSuchMethodException e) {
+            // Not a createJob class
+        }
+        return null;
+    }
+
+    private static ClassLoader loaderFor(String jar) {
+        try {
+            return new URLClassLoader(new URL[] {new File(jar).toURI().toURL()},
+                                      JobSubmitter.class.getClassLoader());
+        } catch (MalformedURLException e) {
+            throw new IllegalArgumentException("Invalid JAR path " + jar, e);
+        }
+    }
+}
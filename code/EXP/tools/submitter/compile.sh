@@ -0,0 +1,55 @@
+#!/bin/bash
+# Compile JobSubmitter.java and create the resident job client's JAR file
+
+set -e
+
+echo "============================================================"
+echo "Compiling JobSubmitter.java"
+echo "============================================================"
+
+# Check if HADOOP_HOME is set
+if [ -z "$HADOOP_HOME" ]; then
+    export HADOOP_HOME=/opt/hadoop
+fi
+
+echo "HADOOP_HOME: $HADOOP_HOME"
+
+# Set Hadoop classpath
+export HADOOP_CLASSPATH=$($HADOOP_HOME/bin/hadoop classpath)
+
+# Build next to this script (EXP/tools/submitter)
+cd "$(dirname "$0")"
+mkdir -p build
+
+echo ""
+echo "Step 1: Compiling Java source..."
+javac -classpath $HADOOP_CLASSPATH -d build JobSubmitter.java
+
+if [ $? -eq 0 ]; then
+    echo "✓ Compilation successful"
+else
+    echo "✗ Compilation failed"
+    exit 1
+fi
+
+echo ""
+echo "Step 2: Creating JAR file..."
+cd build
+jar -cvf ../job-submitter.jar *.class
+
+if [ $? -eq 0 ]; then
+    echo "✓ JAR file created: job-submitter.jar"
+else
+    echo "✗ JAR creation failed"
+    exit 1
+fi
+
+cd ..
+
+echo ""
+echo "============================================================"
+echo "✓ Build Complete!"
+echo "============================================================"
+echo "JAR file location: $(pwd)/job-submitter.jar"
+echo ""
+ls -lh job-submitter.jar
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Check WordCount output against the ground-truth counts recorded at generation.
+
+generate_data.py counts every key it writes (numpy.bincount over the sampled
+word indices) and saves the totals as <dataset>.counts.npz next to the data.
+Validating a job then only streams its part-r-* files once and compares one
+number per key, instead of recounting the whole input:
+
+    python3 validate_output.py ../task1/data/input_500mb.txt /user/root/task1/output_wordcount_500MB_s050_run1
+
+The dataset may be a file, a shard directory, an .hdfs pointer or a link into
+the dataset cache; the output directory may be in HDFS or local. The exit
+status is non-zero when the output does not match.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import datagen
+
+# Mismatching keys listed in a report
+MAX_EXAMPLES = 5
+
+
+class CountManifest:
+    """
+    Per-key counts of a generated dataset, as written by datagen.write_count_manifest.
+
+    Keys are listed words, numbered prefix + id keys, or listed (hot) words
+    followed by numbered keys.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with np.load(path) as data:
+            self.counts = data['counts']
+            self.words = data['words'].tobytes().split(b'\n') if 'words' in data else []
+            self._index = {word: i for i, word in enumerate(self.words)}
+            self.prefix = None
+            if 'prefix' in data:
+                self.prefix = str(data['prefix']).encode('utf-8')
+                self.width = int(data['width'])
+
+    def index(self, word):
+        """Index of a key (bytes) in the manifest, or None for a key that was never generated."""
+        index = self._index.get(word)
+        if index is not None or self.prefix is None:
+            return index
+        digits = word[len(self.prefix):]
+        if not word.startswith(self.prefix) or len(digits) != self.width or not digits.isdigit():
+            return None
+        index = len(self.words) + int(digits)
+        return index if index < len(self.counts) else None
+
+    def id_index(self, key):
+        """Index of a numeric key (bytes) as written by a job over VIntWritable ids, or None."""
+        if not key.isdigit():
+            return None
+        index = int(key)
+        return index if index < len(self.counts) else None
+
+    def word(self, index):
+        """Key of an index, as text."""
+        if index < len(self.words):
+            return self.words[index].decode('utf-8')
+        return f"{self.prefix.decode('utf-8')}{index - len(self.words):0{self.width}d}"
+
+
+def find_count_manifest(dataset_path):
+    """
+    Count manifest of a local dataset, or None if it was generated without one.
+
+    Datasets linked from the cache keep their manifest next to the cached copy.
+    """
+    for path in (dataset_path, os.path.realpath(dataset_path)):
+        candidate = datagen.counts_path_for(path)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def output_lines(output_dir):
+    """Stream the lines of a job's part-r-* files, from a local directory or HDFS."""
+    local_dir = output_dir if os.path.isdir(output_dir) else datagen._standin_path(
+        datagen.hdfs_uri(output_dir))
+    if local_dir is not None:
+        for name in sorted(os.listdir(local_dir)):
+            if name.startswith('part-r-'):
+                with open(os.path.join(local_dir, name), 'rb') as f:
+                    yield from f
+        return
+
+    process = subprocess.Popen(
+        [datagen.HDFS_COMMAND, 'dfs', '-cat', f"{datagen.hdfs_path_of(output_dir)}/part-r-*"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    yield from process.stdout
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise OSError(f"hdfs dfs -cat {output_dir} failed: {stderr.decode('utf-8', 'replace')[:500]}")
+
+
+def validate_counts(manifest_path, output_dir, ids=False):
+    """
+    Compare a WordCount output directory with a count manifest.
+
+    With ids the output keys are vocabulary indices (WordCount over a
+    generate_data.py --sequence-file ids dataset) instead of the words.
+
+    Returns:
+        Report dict: 'valid', key and word totals on both sides, the number
+        of missing, unexpected, duplicated and miscounted keys, and a few
+        example mismatches.
+    """
+    manifest = CountManifest(manifest_path)
+    lookup = manifest.id_index if ids else manifest.index
+    expected = manifest.counts
+    observed = np.zeros_like(expected)
+    seen = np.zeros(len(expected), dtype=bool)
+    unexpected = duplicates = 0
+    words_output = 0
+    examples = []
+
+    for line in output_lines(output_dir):
+        word, sep, value = line.rstrip(b'\r\n').rpartition(b'\t')
+        index = lookup(word) if sep else None
+        count = int(value) if sep and value.isdigit() else 0
+        words_output += count
+        if index is None:
+            unexpected += 1
+            if len(examples) < MAX_EXAMPLES:
+                examples.append(f"unexpected key {line.rstrip().decode('utf-8', 'replace')!r}")
+            continue
+        if seen[index]:
+            duplicates += 1
+        seen[index] = True
+        observed[index] += count
+
+    miscounted = np.flatnonzero(seen & (observed != expected))
+    missing = np.flatnonzero(~seen & (expected > 0))
+    for index in miscounted[:MAX_EXAMPLES - len(examples)]:
+        examples.append(f"{manifest.word(index)}: {observed[index]} (expected {expected[index]})")
+    for index in missing[:MAX_EXAMPLES - len(examples)]:
+        examples.append(f"{manifest.word(index)}: missing (expected {expected[index]})")
+
+    return {
+        'valid': not (unexpected or duplicates or len(miscounted) or len(missing)),
+        'keys_expected': int(np.count_nonzero(expected)),
+        'keys_output': int(np.count_nonzero(seen)) + unexpected,
+        'words_expected': int(expected.sum()),
+        'words_output': int(words_output),
+        'missing': int(len(missing)),
+        'unexpected': unexpected,
+        'duplicates': duplicates,
+        'miscounted': int(len(miscounted)),
+        'examples': examples,
+    }
+
+
+def summarize(report):
+    """One-line description of a validation report."""
+    if report['valid']:
+        return f"{report['keys_output']:,} keys, {report['words_output']:,} words match"
+    problems = [f"{report[name]:,} {name}" for name in ('missing', 'unexpected', 'duplicates', 'miscounted')
+                if report[name]]
+    return (f"{', '.join(problems)} keys; {report['words_output']:,} of "
+            f"{report['words_expected']:,} words")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate WordCount output against generated counts.')
+    parser.add_argument('dataset', help='Local dataset (file, shard directory, .hdfs pointer) or its .counts.npz')
+    parser.add_argument('output_dir', help='Job output directory (HDFS path or local directory)')
+    parser.add_argument('--ids', action='store_true',
+                        help='Output keys are vocabulary indices (SequenceFile input with id keys)')
+    args = parser.parse_args()
+
+    manifest = args.dataset if args.dataset.endswith(datagen.COUNTS_EXT) else find_count_manifest(args.dataset)
+    if not manifest:
+        print(f"✗ No count manifest for {args.dataset} (regenerate it with generate_data.py)")
+        sys.exit(2)
+
+    report = validate_counts(manifest, args.output_dir, ids=args.ids)
+    print(f"{'✓' if report['valid'] else '✗'} {args.output_dir}: {summarize(report)}")
+    for example in report['examples']:
+        print(f"    {example}")
+    sys.exit(0 if report['valid'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Cluster capacity from the YARN ResourceManager REST API.
+
+Used by the experiment engine's concurrent mode to decide how many jobs
+fit on the cluster at once: /ws/v1/cluster/metrics gives the memory and
+vcores in use, /ws/v1/cluster/scheduler the queues and their guaranteed
+shares. A job's footprint is estimated from its input files, reducer count
+and container sizes, assuming every map and reduce runs in one wave.
+
+    python3 yarn_capacity.py                     # current usage and queues
+    python3 yarn_capacity.py --footprint 1GB 4   # containers one job asks for
+    python3 yarn_capacity.py --footprint ../task1/data/input_1gb 4
+"""
+
+import argparse
+
+import requests
+
+import datagen
+import profile_input
+
+# ResourceManager configuration
+RM_HOST = "172.31.12.133"
+RM_PORT = "8088"
+RM_API_BASE = f"http://{RM_HOST}:{RM_PORT}/ws/v1/cluster"
+
+# Container sizes when the job sets none (mapred-default.xml)
+DEFAULT_MAP_MB = 1024
+DEFAULT_REDUCE_MB = 1024
+DEFAULT_AM_MB = 1536
+
+# FileInputFormat's split.maxsize when the job sets none (Long.MAX_VALUE)
+DEFAULT_MAX_SPLIT = 2 ** 63 - 1
+
+
+def fetch(path):
+    """JSON document of a ResourceManager REST endpoint; raises OSError when unreachable."""
+    try:
+        response = requests.get(f"{RM_API_BASE}/{path}", timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise OSError(f"ResourceManager request {path} failed: {e}") from None
+
+
+def cluster_metrics():
+    """Memory and vcores of the cluster, and how much is in use, from /ws/v1/cluster/metrics."""
+    metrics = fetch('metrics')['clusterMetrics']
+    return {
+        'total_mb': metrics.get('totalMB', 0),
+        'allocated_mb': metrics.get('allocatedMB', 0),
+        'available_mb': metrics.get('availableMB', 0),
+        'total_vcores': metrics.get('totalVirtualCores', 0),
+        'allocated_vcores': metrics.get('allocatedVirtualCores', 0),
+        'apps_running': metrics.get('appsRunning', 0),
+        'apps_pending': metrics.get('appsPending', 0),
+        'containers_allocated': metrics.get('containersAllocated', 0),
+    }
+
+
+def running_nodes():
+    """NodeManagers in state RUNNING, as dicts with host and http_address, from /ws/v1/cluster/nodes."""
+    nodes = (fetch('nodes').get('nodes') or {}).get('node', [])
+    return [{'host': node['nodeHostName'], 'http_address': node['nodeHTTPAddress']}
+            for node in nodes if node.get('state') == 'RUNNING']
+
+
+def _capacity_leaves(queue, parent=''):
+    """Leaf queues below a CapacityScheduler queue entry."""
+    children = (queue.get('queues') or {}).get('queue', [])
+    if not children:
+        return [{
+            'name': queue['queueName'],
+            'path': f"{parent}.{queue['queueName']}" if parent else queue['queueName'],
+            'capacity': queue.get('absoluteCapacity', 0) / 100,
+            'max_capacity': queue.get('absoluteMaxCapacity', 100) / 100,
+            'used_capacity': queue.get('absoluteUsedCapacity', 0) / 100,
+            'state': queue.get('state', 'RUNNING'),
+        }]
+    path = f"{parent}.{queue['queueName']}" if parent else queue['queueName']
+    return [leaf for child in children for leaf in _capacity_leaves(child, path)]
+
+
+def leaf_queues():
+    """
+    Leaf queues of the scheduler with their guaranteed share of the cluster.
+
+    Returns:
+        List of dicts (name, path, capacity, max_capacity, used_capacity,
+        state; capacities as fractions of the cluster). The FIFO scheduler
+        has the single queue 'default'.
+    """
+    info = fetch('scheduler')['scheduler']['schedulerInfo']
+    kind = info.get('type')
+    if kind == 'capacityScheduler':
+        return [leaf for child in (info.get('queues') or {}).get('queue', [])
+                for leaf in _capacity_leaves(child, 'root')]
+    if kind == 'fairScheduler':
+        root = info['rootQueue']
+        total = max(root.get('clusterResources', {}).get('memory', 0), 1)
+        queues = []
+        pending = [root]
+        while pending:
+            queue = pending.pop()
+            children = (queue.get('childQueues') or {}).get('queue', [])
+            if children:
+                pending.extend(children)
+                continue
+            queues.append({
+                'name': queue['queueName'].rsplit('.', 1)[-1],
+                'path': queue['queueName'],
+                'capacity': queue.get('fairResources', {}).get('memory', 0) / total,
+                'max_capacity': min(queue.get('maxResources', {}).get('memory', total) / total, 1.0),
+                'used_capacity': queue.get('usedResources', {}).get('memory', 0) / total,
+                'state': 'RUNNING',
+            })
+        return queues
+    return [{'name': 'default', 'path': 'default', 'capacity': 1.0, 'max_capacity': 1.0,
+             'used_capacity': info.get('usedCapacity', 0), 'state': 'RUNNING'}]
+
+
+def job_footprint(input_files, reducers, properties=None, block_size=datagen.HDFS_BLOCK_SIZE):
+    """
+    Memory and vcores one job holds when all its tasks run in a single wave.
+
+    Maps are counted per input file the way FileInputFormat.getSplits cuts
+    them: a splittable file gets one map per split (the last one may run
+    10% over), a gzip or zstd file one map however large, so a dataset of
+    many small files asks for far more maps than its total size suggests.
+
+    Args:
+        input_files: profile_input.InputFiles of the job input
+        reducers: Number of reduce tasks
+        properties: The job's -D properties (container sizes, split sizes)
+        block_size: HDFS block size of the input files
+
+    Returns:
+        Dict with maps, containers, memory_mb and vcores
+    """
+    properties = properties or {}
+    # FileInputFormat.computeSplitSize: max(minSize, min(maxSize, blockSize))
+    min_split = int(properties.get('mapreduce.input.fileinputformat.split.minsize', 1))
+    max_split = int(properties.get('mapreduce.input.fileinputformat.split.maxsize', DEFAULT_MAX_SPLIT))
+    split_size = max(min_split, min(max_split, block_size))
+    maps = max(sum(len(f.split_ranges(split_size)) for f in input_files), 1)
+    map_mb = int(properties.get('mapreduce.map.memory.mb', DEFAULT_MAP_MB))
+    reduce_mb = int(properties.get('mapreduce.reduce.memory.mb', DEFAULT_REDUCE_MB))
+    am_mb = int(properties.get('yarn.app.mapreduce.am.resource.mb', DEFAULT_AM_MB))
+    map_vcores = int(properties.get('mapreduce.map.cpu.vcores', 1))
+    reduce_vcores = int(properties.get('mapreduce.reduce.cpu.vcores', 1))
+    return {
+        'maps': maps,
+        'containers': maps + reducers + 1,
+        'memory_mb': am_mb + maps * map_mb + reducers * reduce_mb,
+        'vcores': 1 + maps * map_vcores + reducers * reduce_vcores,
+    }
+
+
+class CapacityPlanner:
+    """
+    Admission control for jobs submitted side by side.
+
+    Memory already in use by other applications when the planner starts
+    (or whenever none of its own jobs is running) is left alone; the rest,
+    times headroom, is shared out to jobs by their footprints. With queues
+    every running job gets a queue of its own whose guaranteed share fits it.
+    """
+
+    def __init__(self, headroom=0.9, max_jobs=0, queues=None):
+        self.headroom = headroom
+        self.max_jobs = max_jobs
+        self.queue_names = list(queues or [])
+        self.metrics = None
+        self.queues = {}
+        self.others_mb = 0
+        self.others_vcores = 0
+        self.running = {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-read cluster metrics (and queue shares); raises OSError when the RM is unreachable."""
+        self.metrics = cluster_metrics()
+        if not self.running:
+            self.others_mb = self.metrics['allocated_mb']
+            self.others_vcores = self.metrics['allocated_vcores']
+        if self.queue_names:
+            known = {queue['name']: queue for queue in leaf_queues()}
+            missing = [name for name in self.queue_names if name not in known]
+            if missing:
+                raise OSError(f"Unknown YARN queue(s): {', '.join(missing)}")
+            self.queues = {name: known[name] for name in self.queue_names}
+
+    def reserved(self):
+        """Memory and vcores of the footprints of this planner's running jobs."""
+        return (sum(fp['memory_mb'] for fp, _ in self.running.values()),
+                sum(fp['vcores'] for fp, _ in self.running.values()))
+
+    def free_queue(self, footprint):
+        """Smallest configured queue with none of our jobs whose guaranteed share fits footprint."""
+        busy = {queue for _, queue in self.running.values()}
+        fitting = [
+            queue for name, queue in self.queues.items()
+            if name not in busy and queue['state'] == 'RUNNING'
+            and queue['capacity'] * self.metrics['total_mb'] >= footprint['memory_mb']
+        ]
+        return min(fitting, key=lambda queue: queue['capacity'])['name'] if fitting else None
+
+    def admit(self, key, footprint):
+        """
+        Reserve capacity for a job if it fits next to the running ones.
+
+        A job is always admitted when nothing of ours runs, so an oversized
+        job still runs (alone). Returns (admitted, queue name or None).
+        """
+        if self.running:
+            if self.max_jobs and len(self.running) >= self.max_jobs:
+                return False, None
+            if self.metrics['apps_pending'] > 0:
+                return False, None
+            reserved_mb, reserved_vcores = self.reserved()
+            budget_mb = self.metrics['total_mb'] * self.headroom - self.others_mb
+            budget_vcores = self.metrics['total_vcores'] * self.headroom - self.others_vcores
+            if reserved_mb + footprint['memory_mb'] > budget_mb:
+                return False, None
+            if self.metrics['total_vcores'] and reserved_vcores + footprint['vcores'] > budget_vcores:
+                return False, None
+        queue = None
+        if self.queues:
+            queue = self.free_queue(footprint)
+            if queue is None:
+                if self.running:
+                    return False, None
+                queue = min(self.queues, key=lambda name: self.queues[name]['capacity'])
+        self.running[key] = (footprint, queue)
+        return True, queue
+
+    def release(self, key):
+        """Return the capacity of a finished job."""
+        self.running.pop(key, None)
+
+    def parallelism(self, footprint):
+        """How many jobs of this footprint fit side by side."""
+        budget_mb = self.metrics['total_mb'] * self.headroom - self.others_mb
+        fit = max(int(budget_mb // max(footprint['memory_mb'], 1)), 1)
+        if self.queues:
+            fit = min(fit, len(self.queues))
+        return min(fit, self.max_jobs) if self.max_jobs else fit
+
+    def snapshot(self):
+        """Capacity in use right now, for recording next to a result."""
+        reserved_mb, _ = self.reserved()
+        total = max(self.metrics['total_mb'], 1)
+        return {
+            'cluster_total_mb': self.metrics['total_mb'],
+            'cluster_allocated_mb': self.metrics['allocated_mb'],
+            'cluster_used_fraction': round(self.metrics['allocated_mb'] / total, 4),
+            'reserved_fraction': round(reserved_mb / total, 4),
+            'apps_running': self.metrics['apps_running'],
+            'concurrent_jobs': len(self.running),
+        }
+
+
+def parse_size(text):
+    """Bytes from 500MB / 1GB / 1.5GB."""
+    text = text.strip().upper()
+    unit = datagen.GB if text.endswith('GB') else datagen.MB
+    return int(float(text.rstrip('GMB')) * unit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show YARN capacity and job footprints.')
+    parser.add_argument('--footprint', nargs=2, metavar=('INPUT', 'REDUCERS'),
+                        help='Estimate the footprint of a job with REDUCERS over INPUT: a size '
+                             '(e.g. 1GB, one file) or a dataset (file, shard directory, .hdfs pointer, HDFS path)')
+    args = parser.parse_args()
+
+    try:
+        metrics = cluster_metrics()
+        queues = leaf_queues()
+    except OSError as e:
+        print(f"✗ {e}")
+        raise SystemExit(2)
+    print(f"Cluster: {metrics['allocated_mb']:,}/{metrics['total_mb']:,} MB, "
+          f"{metrics['allocated_vcores']}/{metrics['total_vcores']} vcores in use, "
+          f"{metrics['apps_running']} running / {metrics['apps_pending']} pending apps")
+    for queue in queues:
+        print(f"  Queue {queue['path']:<24} guaranteed {queue['capacity']:>6.1%}, "
+              f"max {queue['max_capacity']:>6.1%}, used {queue['used_capacity']:>6.1%} ({queue['state']})")
+
+    if args.footprint:
+        try:
+            input_files = [profile_input.InputFile(args.footprint[0], parse_size(args.footprint[0]))]
+        except ValueError:
+            try:
+                input_files = profile_input.list_input_files(args.footprint[0])
+            except OSError as e:
+                print(f"✗ {e}")
+                raise SystemExit(2)
+        footprint = job_footprint(input_files, int(args.footprint[1]))
+        fit = max(int(metrics['total_mb'] * 0.9 // footprint['memory_mb']), 1)
+        print(f"\nJob footprint: {footprint['maps']} maps, {footprint['containers']} containers, "
+              f"{footprint['memory_mb']:,} MB, {footprint['vcores']} vcores "
+              f"(~{fit} side by side on an idle cluster)")
+
+
+if __name__ == '__main__':
+    main()